@@ -0,0 +1,51 @@
+"""add read cursors
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-01-05
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create read_cursors table (per reader, per followed Book)
+    op.create_table(
+        'read_cursors',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('reader_id', sa.Integer(), nullable=False),
+        sa.Column('book_id', sa.Integer(), nullable=False),
+        sa.Column('last_read_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['reader_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['book_id'], ['books.id'], ondelete='CASCADE'),
+        sa.UniqueConstraint('reader_id', 'book_id', name='uq_read_cursor_reader_book')
+    )
+    op.create_index('ix_read_cursors_id', 'read_cursors', ['id'])
+    op.create_index('ix_read_cursors_reader_id', 'read_cursors', ['reader_id'])
+
+    # Composite index so per-author "latest chapter" and "published since"
+    # lookups in the spines query avoid a sort
+    op.create_index(
+        'ix_chapters_author_id_published_at',
+        'chapters',
+        ['author_id', 'published_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chapters_author_id_published_at', table_name='chapters')
+    op.drop_index('ix_read_cursors_reader_id', table_name='read_cursors')
+    op.drop_index('ix_read_cursors_id', table_name='read_cursors')
+    op.drop_table('read_cursors')
@@ -0,0 +1,31 @@
+"""add chapters keyset index
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-01-06
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keyset pagination orders by (published_at, id) and seeks with a
+    # row-value comparison, which this index serves without a sort
+    op.create_index(
+        'ix_chapters_published_at_id',
+        'chapters',
+        ['published_at', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chapters_published_at_id', table_name='chapters')
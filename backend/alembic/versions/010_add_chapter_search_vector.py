@@ -0,0 +1,52 @@
+"""add chapter search vector
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-01-07
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Weighted full-text document per chapter (see services/search_index.py)
+    op.add_column('chapters', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    # Backfill existing chapters
+    op.execute("""
+        UPDATE chapters c SET search_vector =
+            setweight(to_tsvector('english', coalesce(c.title, '')), 'A') ||
+            setweight(to_tsvector('english',
+                coalesce(c.mood, '') || ' ' || coalesce(c.theme, '') || ' ' || coalesce((
+                    SELECT string_agg(t.name, ' ')
+                    FROM chapter_themes ct JOIN themes t ON t.id = ct.theme_id
+                    WHERE ct.chapter_id = c.id
+                ), '')), 'B') ||
+            setweight(to_tsvector('english', coalesce((
+                    SELECT string_agg(b.content->>'text', ' ' ORDER BY b.position)
+                    FROM chapter_blocks b
+                    WHERE b.chapter_id = c.id AND b.block_type::text IN ('TEXT', 'QUOTE')
+                ), '')), 'C')
+    """)
+
+    op.create_index(
+        'ix_chapters_search_vector',
+        'chapters',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chapters_search_vector', table_name='chapters')
+    op.drop_column('chapters', 'search_vector')
@@ -0,0 +1,25 @@
+"""add embedding content hash
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-01-09
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rows get NULL, so the backfill re-embeds them once
+    op.add_column('chapter_embeddings', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('chapter_embeddings', 'content_hash')
@@ -0,0 +1,49 @@
+"""add unread notification count
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-01-10
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Badge reads use this counter instead of counting notifications
+    op.add_column('users', sa.Column('unread_notification_count', sa.Integer(), nullable=False, server_default='0'))
+    op.execute("""
+        UPDATE users
+        SET unread_notification_count = unread.n
+        FROM (
+            SELECT user_id, count(*) AS n
+            FROM notifications
+            WHERE NOT read
+            GROUP BY user_id
+        ) AS unread
+        WHERE users.id = unread.user_id
+    """)
+
+    # Unread listings (and reconciliation) only touch unread rows; a
+    # plain index on the boolean is too unselective to be used
+    op.create_index(
+        'ix_notifications_user_id_created_at_unread',
+        'notifications',
+        ['user_id', 'created_at'],
+        unique=False,
+        postgresql_where=sa.text('NOT read')
+    )
+    op.drop_index('ix_notifications_read', table_name='notifications')
+
+
+def downgrade() -> None:
+    op.create_index('ix_notifications_read', 'notifications', ['read'])
+    op.drop_index('ix_notifications_user_id_created_at_unread', table_name='notifications')
+    op.drop_column('users', 'unread_notification_count')
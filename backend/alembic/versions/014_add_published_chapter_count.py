@@ -0,0 +1,35 @@
+"""add published chapter count
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-01-12
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '014'
+down_revision = '013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Between the Lines eligibility reads this counter instead of counting chapters
+    op.add_column('users', sa.Column('published_chapter_count', sa.Integer(), nullable=False, server_default='0'))
+    op.execute("""
+        UPDATE users
+        SET published_chapter_count = published.n
+        FROM (
+            SELECT author_id, count(*) AS n
+            FROM chapters
+            GROUP BY author_id
+        ) AS published
+        WHERE users.id = published.author_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'published_chapter_count')
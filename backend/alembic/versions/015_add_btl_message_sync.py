@@ -0,0 +1,36 @@
+"""add btl message sync
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-01-13
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '015'
+down_revision = '014'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Message pages and last-message lookups seek on (thread_id, created_at);
+    # the plain thread_id index is a prefix of it
+    op.create_index('ix_btl_messages_thread_id_created_at', 'btl_messages', ['thread_id', 'created_at'])
+    op.drop_index('ix_btl_messages_thread_id', table_name='btl_messages')
+
+    # Per-participant read marks for thread unread counts; existing
+    # history counts as read
+    op.add_column('btl_threads', sa.Column('participant1_last_read_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('btl_threads', sa.Column('participant2_last_read_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE btl_threads SET participant1_last_read_at = now(), participant2_last_read_at = now()")
+
+
+def downgrade() -> None:
+    op.drop_column('btl_threads', 'participant2_last_read_at')
+    op.drop_column('btl_threads', 'participant1_last_read_at')
+    op.create_index('ix_btl_messages_thread_id', 'btl_messages', ['thread_id'])
+    op.drop_index('ix_btl_messages_thread_id_created_at', table_name='btl_messages')
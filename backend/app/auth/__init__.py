@@ -6,6 +6,7 @@ from app.auth.security import (
     create_refresh_token,
     verify_token,
     get_current_user,
+    get_current_principal,
 )
 from app.auth.schemas import (
     Token,
@@ -22,6 +23,7 @@ __all__ = [
     "create_refresh_token",
     "verify_token",
     "get_current_user",
+    "get_current_principal",
     "Token",
     "TokenData",
     "UserRegister",
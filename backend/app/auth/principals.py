@@ -0,0 +1,199 @@
+"""
+Principal cache - resolve the authenticated user without a SELECT
+
+Every authenticated request needs its user row. Rows are cached by user
+id in two tiers:
+
+- in-process LRU, `principal_local_ttl` seconds (no I/O at all)
+- Redis, `principal_cache_ttl` seconds (shared by every process)
+
+and read from the database only on a miss. The password hash is never
+cached; it is loaded on demand when a handler touches it.
+
+Committing an ORM update or delete of a User drops its cached entry
+(password change, quiet mode, XP/level, account deletion), as does
+publishing or deleting a chapter (published_chapter_count). Bulk UPDATEs
+bypass ORM events, so code issuing one calls `mark_principal_stale`.
+Another process's LRU may serve the old row for up to
+`principal_local_ttl` seconds.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import redis
+from sqlalchemy import DateTime, event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.config import settings
+from app.logging_config import logger
+from app.models import Chapter, User
+from app.redis_client import redis_client
+
+# Cached columns - everything but the password hash
+_COLUMNS = [c for c in User.__table__.columns if c.key != "password_hash"]
+_COLUMN_KEYS = {c.key for c in _COLUMNS}
+_DATETIME_COLUMNS = {c.key for c in _COLUMNS if isinstance(c.type, DateTime)}
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user, for handlers that do not need the ORM User"""
+    id: int
+    username: str
+
+
+class _LocalCache:
+    """Small thread-safe LRU with a per-entry TTL"""
+
+    def __init__(self, size: int, ttl: float):
+        self.size = size
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: int, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: int) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_local = _LocalCache(settings.principal_local_size, settings.principal_local_ttl)
+
+
+def principal_key(user_id: int) -> str:
+    """Redis key for one cached user row"""
+    return f"principal:{user_id}"
+
+
+def _row(user: User) -> Dict[str, Any]:
+    return {c.key: getattr(user, c.key) for c in _COLUMNS}
+
+
+def _encode(row: Dict[str, Any]) -> str:
+    return json.dumps({
+        key: value.isoformat() if key in _DATETIME_COLUMNS and value is not None else value
+        for key, value in row.items()
+    })
+
+
+def _decode(raw: bytes) -> Dict[str, Any]:
+    row = json.loads(raw)
+    for key in _DATETIME_COLUMNS:
+        if row.get(key) is not None:
+            row[key] = datetime.fromisoformat(row[key])
+    return row
+
+
+def get_cached_row(user_id: int) -> Optional[Dict[str, Any]]:
+    """A user's cached row from the local LRU, else Redis (None on miss)"""
+    row = _local.get(user_id)
+    if row is not None:
+        return row
+
+    try:
+        raw = redis_client.get(principal_key(user_id))
+    except redis.RedisError as e:
+        logger.warning(f"Principal cache read failed for user {user_id}: {e}")
+        return None
+    if raw is None:
+        return None
+
+    row = _decode(raw)
+    if row.keys() != _COLUMN_KEYS:
+        # Cached before a column was added or dropped
+        return None
+    _local.set(user_id, row)
+    return row
+
+
+def cache_user(user: User) -> Dict[str, Any]:
+    """Store a freshly loaded user in both tiers; returns the cached row"""
+    row = _row(user)
+    _local.set(user.id, row)
+    try:
+        redis_client.set(principal_key(user.id), _encode(row), ex=settings.principal_cache_ttl)
+    except redis.RedisError as e:
+        logger.warning(f"Principal cache write failed for user {user.id}: {e}")
+    return row
+
+
+def invalidate_principal(user_id: int) -> None:
+    """Drop a user's cached row from both tiers"""
+    _local.delete(user_id)
+    try:
+        redis_client.delete(principal_key(user_id))
+    except redis.RedisError as e:
+        logger.warning(f"Principal cache invalidation failed for user {user_id}: {e}")
+
+
+def mark_principal_stale(db: Session, user_id: int) -> None:
+    """Invalidate a user's cached row once `db` commits (for bulk UPDATEs)"""
+    db.info.setdefault("stale_principals", set()).add(user_id)
+
+
+def attach_cached_user(db: Session, row: Dict[str, Any]) -> User:
+    """
+    A persistent User in `db` built from a cached row, without a SELECT.
+
+    Cached columns count as loaded; the password hash and relationships
+    load on first access.
+    """
+    existing = db.identity_map.get(inspect(User).identity_key_from_primary_key([row["id"]]))
+    if existing is not None:
+        return existing
+
+    user = User(**row)
+    make_transient_to_detached(user)
+    db.add(user)
+    return user
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_written(mapper, connection, target):
+    mark_principal_stale(inspect(target).session, target.id)
+
+
+@event.listens_for(Chapter, "after_insert")
+@event.listens_for(Chapter, "after_delete")
+def _chapter_written(mapper, connection, target):
+    # models/chapter.py bumps the author's published_chapter_count
+    mark_principal_stale(inspect(target).session, target.author_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _drop_stale_principals(session):
+    for user_id in session.info.pop("stale_principals", ()):
+        invalidate_principal(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _keep_principals(session):
+    session.info.pop("stale_principals", None)
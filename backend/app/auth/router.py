@@ -7,8 +7,9 @@ from app.database import get_db
 from app.models import User, Book
 from app.auth.schemas import UserRegister, UserLogin, Token, UserResponse
 from app.auth.security import (
-    get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    verify_password_async,
+    password_needs_rehash,
     create_access_token,
     create_refresh_token,
     verify_token,
@@ -49,7 +50,7 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
         user = User(
             email=user_data.email,
             username=user_data.username,
-            password_hash=get_password_hash(user_data.password),
+            password_hash=await get_password_hash_async(user_data.password),
             open_pages=3  # Initial Open Pages
         )
         db.add(user)
@@ -89,18 +90,27 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
     Login with email and password.
     
     - Validates credentials
+    - Upgrades the password hash if it uses an outdated bcrypt cost
     - Returns access and refresh tokens
     """
     # Find user by email
     user = db.query(User).filter(User.email == credentials.email).first()
     
-    if not user or not verify_password(credentials.password, user.password_hash):
+    if not user or not await verify_password_async(credentials.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Re-hash at the current cost while we have the plain password
+    if password_needs_rehash(user.password_hash):
+        try:
+            user.password_hash = await get_password_hash_async(credentials.password)
+            db.commit()
+        except HTTPException:
+            pass  # Hashing saturated - upgrade on a later login
+    
     # Create tokens
     token_data = {"sub": str(user.id), "username": user.username}
     access_token = create_access_token(token_data)
@@ -1,4 +1,7 @@
 """Security utilities for authentication"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 import bcrypt
@@ -6,21 +9,35 @@ from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.database import get_db
+from app.logging_config import logger
+from app.database import get_db, get_async_db, AsyncSessionLocal, ReadSessionLocal, is_pinned_to_primary
 from app.models import User
 from app.auth.schemas import TokenData
+from app.auth.principals import Principal, get_cached_row, cache_user, attach_cached_user
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
 
+# bcrypt takes ~250ms per hash at cost 12 and releases the GIL, so
+# request handlers hash on a small thread pool instead of the event loop.
+# At most `password_hash_queue_limit` hashes run or wait; beyond that
+# requests are shed with a 503 rather than queueing behind a burst.
+_hash_pool = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers,
+    thread_name_prefix="bcrypt"
+)
+_hash_slots = threading.BoundedSemaphore(settings.password_hash_queue_limit)
+
+
 def get_password_hash(password: str) -> str:
     """Hash a password using bcrypt"""
     # Convert password to bytes and hash
     password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
 
@@ -32,6 +49,46 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(password_bytes, hashed_bytes)
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether a hash was made at a cost other than `bcrypt_rounds`"""
+    # $2b$<cost>$<salt+hash>
+    try:
+        return int(hashed_password.split("$")[2]) != settings.bcrypt_rounds
+    except (IndexError, ValueError):
+        return True
+
+
+async def _run_on_hash_pool(fn, *args):
+    """
+    Run a bcrypt call on the hashing pool.
+    
+    Raises:
+        HTTPException: 503 when the pool's queue is full
+    """
+    if not _hash_slots.acquire(blocking=False):
+        logger.warning("Password hashing saturated - shedding request")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in attempts right now. Please try again shortly.",
+            headers={"Retry-After": "1"}
+        )
+    
+    future = _hash_pool.submit(fn, *args)
+    # Released when the hash finishes, even if the request went away
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return await asyncio.wrap_future(future)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password off the event loop (503 when saturated)"""
+    return await _run_on_hash_pool(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password off the event loop (503 when saturated)"""
+    return await _run_on_hash_pool(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -98,11 +155,108 @@ async def get_current_user(
     token = credentials.credentials
     token_data = verify_token(token, token_type="access")
     
-    user = db.query(User).filter(User.id == token_data.user_id).first()
+    row = get_cached_row(token_data.user_id)
+    if row is not None:
+        user = attach_cached_user(db, row)
+    else:
+        user = db.get(User, token_data.user_id)
+        if user is not None:
+            cache_user(user)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
+    
+    # Writes committed through this session pin the user to the primary
+    db.info["user_id"] = user.id
+    return user
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """
+    Get the current authenticated user through the async session.
+    
+    Use with routes that take `get_async_db`, so the user is attached
+    to the same session as the rest of the request.
+    """
+    token = credentials.credentials
+    token_data = verify_token(token, token_type="access")
+    
+    row = get_cached_row(token_data.user_id)
+    if row is not None:
+        user = attach_cached_user(db.sync_session, row)
+    else:
+        user = await db.get(User, token_data.user_id)
+        if user is not None:
+            cache_user(user)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
     
+    db.info["user_id"] = user.id
     return user
+
+
+async def get_read_db(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Dependency for read-only handlers: a routing session that reads from
+    the replica and writes to the primary.
+    
+    A user who wrote in the last `replica_sticky_seconds` reads from the
+    primary instead, so they see their own writes.
+    """
+    token_data = verify_token(credentials.credentials, token_type="access")
+    
+    async with ReadSessionLocal() as db:
+        db.info["user_id"] = token_data.user_id
+        if is_pinned_to_primary(token_data.user_id):
+            db.info["primary"] = True
+        yield db
+
+
+async def get_current_user_read(
+    db: AsyncSession = Depends(get_read_db)
+) -> User:
+    """Get the current authenticated user through the read session"""
+    row = await _principal_row(db.info["user_id"])
+    return attach_cached_user(db.sync_session, row)
+
+
+async def _principal_row(user_id: int) -> dict:
+    """
+    The user's cached row, filled from the primary on a miss - a lagging
+    replica must never be cached.
+    """
+    row = get_cached_row(user_id)
+    if row is None:
+        async with AsyncSessionLocal() as primary:
+            user = await primary.get(User, user_id)
+            if user is None:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="User not found",
+                )
+            row = cache_user(user)
+    return row
+
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Principal:
+    """
+    Get the current user's id and username without loading the ORM User.
+    
+    For handlers that need nothing else - usually served from the
+    principal cache with no database access.
+    """
+    token_data = verify_token(credentials.credentials, token_type="access")
+    row = await _principal_row(token_data.user_id)
+    return Principal(id=row["id"], username=row["username"])
@@ -1,8 +1,8 @@
 """Between the Lines routes - Private messaging"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
-from typing import List
+from sqlalchemy import literal, select, tuple_
+from typing import List, Optional
 from datetime import datetime, timezone
 
 from app.database import get_db
@@ -13,10 +13,16 @@ from app.models import (
 from app.auth.security import get_current_user
 from app.btl.schemas import (
     InviteCreate, InviteResponse,
-    ThreadResponse, MessageCreate, MessageResponse,
+    ThreadResponse, ThreadSummaryResponse, MessageCreate, MessageResponse,
     PinCreate, PinResponse
 )
-from app.btl.service import check_btl_eligibility
+from app.btl.service import (
+    check_btl_eligibility, check_invite_rate_limit,
+    list_thread_summaries, mark_thread_read
+)
+from app.services.rate_limit import rate_limit_exceeded
+from app.services.notification_service import notify_btl_invite, notify_btl_reply
+from app.config import settings
 
 router = APIRouter(prefix="/between-the-lines", tags=["Between the Lines"])
 
@@ -66,6 +72,14 @@ async def create_invite(
             detail=reason
         )
     
+    # Check rate limit
+    limit = check_invite_rate_limit(current_user.id)
+    if not limit.allowed:
+        raise rate_limit_exceeded(
+            limit,
+            f"Rate limit exceeded. Maximum {settings.btl_invite_rate_limit} invites per day"
+        )
+    
     # Check for existing pending invite
     existing = db.query(BetweenTheLinesInvite).filter(
         BetweenTheLinesInvite.sender_id == current_user.id,
@@ -92,8 +106,7 @@ async def create_invite(
     db.refresh(invite)
     
     # Notify recipient
-    from app.services.notification_service import notify_btl_invite
-    notify_btl_invite(db, invite.id, current_user.id, recipient.id)
+    notify_btl_invite(invite.id, current_user.id, recipient.id)
     
     return invite
 
@@ -197,29 +210,48 @@ async def decline_invite(
 # THREADS
 # ============================================================================
 
-@router.get("/threads", response_model=List[ThreadResponse])
+@router.get("/threads", response_model=List[ThreadSummaryResponse])
 async def list_threads(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """List user's Between the Lines threads"""
-    threads = db.query(BetweenTheLinesThread).filter(
-        or_(
-            BetweenTheLinesThread.participant1_id == current_user.id,
-            BetweenTheLinesThread.participant2_id == current_user.id
-        )
-    ).order_by(BetweenTheLinesThread.created_at.desc()).all()
+    """
+    List user's Between the Lines threads, most recently active first.
     
-    return threads
+    Each thread carries its latest message and how many of the other
+    participant's messages are unread.
+    """
+    return list_thread_summaries(current_user.id, db)
 
 
 @router.get("/threads/{thread_id}/messages", response_model=List[MessageResponse])
 async def get_thread_messages(
     thread_id: int,
+    response: Response,
+    before: Optional[int] = Query(None, description="Page back: messages older than this message id"),
+    after: Optional[int] = Query(None, description="Page forward: messages newer than this message id"),
+    since: Optional[datetime] = Query(None, description="Delta sync: messages created after this time"),
+    limit: int = Query(50, ge=1, le=100),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get messages in a thread"""
+    """
+    Get messages in a thread, oldest first.
+    
+    Without a cursor this is the latest `limit` messages. When more
+    messages lie in the direction being paged, the X-Next-Cursor header
+    holds the message id to pass back: as `before` when paging back
+    (including the first page), as `after` when paging forward from
+    `after` or `since`.
+    
+    Reading the newest messages moves the user's read mark forward.
+    """
+    if sum(value is not None for value in (before, after, since)) > 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use only one of before, after or since"
+        )
+    
     thread = db.query(BetweenTheLinesThread).filter(
         BetweenTheLinesThread.id == thread_id
     ).first()
@@ -237,12 +269,57 @@ async def get_thread_messages(
             detail="You are not a participant in this thread"
         )
     
-    # Get messages
-    messages = db.query(BetweenTheLinesMessage).filter(
-        BetweenTheLinesMessage.thread_id == thread_id
-    ).order_by(BetweenTheLinesMessage.created_at.asc()).all()
+    # Messages are ordered by (created_at, id); a cursor message id is
+    # resolved to its position, and must be a message in this thread
+    position = tuple_(BetweenTheLinesMessage.created_at, BetweenTheLinesMessage.id)
     
-    return messages
+    def position_of(message_id: int):
+        created_at = db.scalar(
+            select(BetweenTheLinesMessage.created_at).where(
+                BetweenTheLinesMessage.id == message_id,
+                BetweenTheLinesMessage.thread_id == thread_id
+            )
+        )
+        if created_at is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor is not a message in this thread"
+            )
+        return tuple_(literal(created_at), literal(message_id))
+    
+    query = select(BetweenTheLinesMessage).where(BetweenTheLinesMessage.thread_id == thread_id)
+    forward = after is not None or since is not None
+    
+    if forward:
+        if after is not None:
+            query = query.where(position > position_of(after))
+        else:
+            query = query.where(BetweenTheLinesMessage.created_at > since)
+        query = query.order_by(BetweenTheLinesMessage.created_at.asc(), BetweenTheLinesMessage.id.asc())
+    else:
+        if before is not None:
+            query = query.where(position < position_of(before))
+        query = query.order_by(BetweenTheLinesMessage.created_at.desc(), BetweenTheLinesMessage.id.desc())
+    
+    messages = db.scalars(query.limit(limit + 1)).all()
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    
+    if has_more:
+        response.headers["X-Next-Cursor"] = str(messages[-1].id)
+    
+    if not forward:
+        messages.reverse()
+    
+    # Serialized before committing the read mark, which expires them
+    page = [MessageResponse.model_validate(message) for message in messages]
+    
+    # Paging back never reaches past what the first page showed, but a
+    # first page or a forward page may hold messages the user had not seen
+    if messages and before is None and mark_thread_read(thread, current_user.id, messages[-1].created_at):
+        db.commit()
+    
+    return page
 
 
 # ============================================================================
@@ -293,8 +370,7 @@ async def create_message(
     
     # Notify the other participant
     recipient_id = thread.participant2_id if current_user.id == thread.participant1_id else thread.participant1_id
-    from app.services.notification_service import notify_btl_reply
-    notify_btl_reply(db, thread_id, current_user.id, recipient_id)
+    notify_btl_reply(thread_id, current_user.id, recipient_id)
     
     return message
 
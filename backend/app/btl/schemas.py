@@ -55,6 +55,13 @@ class MessageResponse(BaseModel):
         from_attributes = True
 
 
+class ThreadSummaryResponse(ThreadResponse):
+    """BTL thread in the thread list, with its latest message"""
+    last_message: Optional[MessageResponse] = None
+    last_message_at: Optional[datetime] = None
+    unread_count: int = 0
+
+
 class PinCreate(BaseModel):
     """Create pin request"""
     chapter_id: int
@@ -1,67 +1,49 @@
 """Between the Lines service - Eligibility and business logic"""
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import case, func, or_, select, true
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-import redis
-from datetime import datetime, timezone
 
-from app.models import User, Follow, Chapter, Block as BlockModel
+from app.models import User, BetweenTheLinesThread as Thread, BetweenTheLinesMessage as Message
 from app.config import settings
+from app.services import rate_limit
+from app.services.follow_graph import get_pair_edges
 
-# Redis client for rate limiting
-redis_client = redis.from_url(settings.redis_url)
+MIN_PUBLISHED_CHAPTERS = 3
 
 
-def check_mutual_follow(user1_id: int, user2_id: int, db: Session) -> bool:
-    """Check if two users follow each other"""
-    follow1 = db.query(Follow).filter(
-        Follow.follower_id == user1_id,
-        Follow.followed_id == user2_id
-    ).first()
-    
-    follow2 = db.query(Follow).filter(
-        Follow.follower_id == user2_id,
-        Follow.followed_id == user1_id
-    ).first()
-    
-    return follow1 is not None and follow2 is not None
+def check_invite_rate_limit(user_id: int) -> rate_limit.RateLimitResult:
+    """Count one BTL invite against the user's limit (3 per day)"""
+    return rate_limit.hit(
+        "btl_invites", user_id, settings.btl_invite_rate_limit, 86400, rate_limit.FIXED_WINDOW
+    )
 
 
-def check_chapter_minimum(user_id: int, db: Session) -> bool:
-    """Check if user has at least 3 published chapters"""
-    count = db.query(Chapter).filter(
-        Chapter.author_id == user_id
-    ).count()
+def btl_ineligibility_reasons(sender: User, recipient: User, db: Session) -> List[str]:
+    """
+    Every reason sender cannot invite recipient (empty if they can).
     
-    return count >= 3
-
-
-def check_not_blocked(user1_id: int, user2_id: int, db: Session) -> bool:
-    """Check if users have not blocked each other"""
-    block = db.query(BlockModel).filter(
-        or_(
-            and_(BlockModel.blocker_id == user1_id, BlockModel.blocked_id == user2_id),
-            and_(BlockModel.blocker_id == user2_id, BlockModel.blocked_id == user1_id)
-        )
-    ).first()
+    Chapter minimums come from the users' published_chapter_count and
+    follow/block edges from the follow graph cache, so this runs no SQL
+    unless the pair's edges are not cached (then one query).
+    """
+    edges = get_pair_edges(db, sender.id, recipient.id)
+    reasons = []
     
-    return block is None
-
-
-def check_invite_rate_limit(user_id: int) -> bool:
-    """Check if user has exceeded BTL invite rate limit (3 per day)"""
-    key = f"btl_invite_rate_limit:{user_id}"
-    count = redis_client.get(key)
+    if not edges.mutual_follow:
+        reasons.append("You must follow each other to start Between the Lines")
     
-    if count is None:
-        redis_client.setex(key, 86400, 1)  # 24 hours
-        return True
+    if sender.published_chapter_count < MIN_PUBLISHED_CHAPTERS:
+        reasons.append(f"You need at least {MIN_PUBLISHED_CHAPTERS} published chapters to send invites")
     
-    count = int(count)
-    if count >= settings.btl_invite_rate_limit:
-        return False
+    if recipient.published_chapter_count < MIN_PUBLISHED_CHAPTERS:
+        reasons.append(f"Recipient needs at least {MIN_PUBLISHED_CHAPTERS} published chapters")
     
-    redis_client.incr(key)
-    return True
+    if edges.blocked:
+        reasons.append("Cannot invite blocked users")
+    
+    return reasons
 
 
 def check_btl_eligibility(sender: User, recipient: User, db: Session) -> tuple[bool, str]:
@@ -72,29 +54,88 @@ def check_btl_eligibility(sender: User, recipient: User, db: Session) -> tuple[b
     1. Mutual follow relationship
     2. Both users have 3+ published chapters
     3. No block relationship
-    4. Rate limit not exceeded (3 invites/day)
+    
+    The invite rate limit is checked separately (check_invite_rate_limit)
+    so it can be reported as a 429 with Retry-After.
     
     Returns:
-        (eligible, reason) - True if eligible, False with reason if not
+        (eligible, reason) - True if eligible, False with every failing
+        reason ("; "-separated) if not
     """
-    # Check mutual follow
-    if not check_mutual_follow(sender.id, recipient.id, db):
-        return False, "You must follow each other to start Between the Lines"
+    reasons = btl_ineligibility_reasons(sender, recipient, db)
+    return not reasons, "; ".join(reasons)
+
+
+def list_thread_summaries(user_id: int, db: Session) -> List[Dict[str, Any]]:
+    """
+    The user's threads with their latest message and unread count,
+    most recently active first - one query.
     
-    # Check sender chapter minimum
-    if not check_chapter_minimum(sender.id, db):
-        return False, "You need at least 3 published chapters to send invites"
+    The latest message is a LATERAL lookup per thread on the
+    (thread_id, created_at) index; unread counts come from one grouped
+    subquery over messages newer than the user's read mark.
+    """
+    is_participant = or_(Thread.participant1_id == user_id, Thread.participant2_id == user_id)
+    last_read_at = case(
+        (Thread.participant1_id == user_id, Thread.participant1_last_read_at),
+        else_=Thread.participant2_last_read_at
+    )
+    
+    last_message = select(Message).where(
+        Message.thread_id == Thread.id
+    ).order_by(Message.created_at.desc(), Message.id.desc()).limit(1).lateral("last_message")
     
-    # Check recipient chapter minimum
-    if not check_chapter_minimum(recipient.id, db):
-        return False, "Recipient needs at least 3 published chapters"
+    unread = select(
+        Message.thread_id, func.count().label("unread_count")
+    ).join(Thread, Thread.id == Message.thread_id).where(
+        is_participant,
+        Message.sender_id != user_id,
+        or_(last_read_at.is_(None), Message.created_at > last_read_at)
+    ).group_by(Message.thread_id).subquery("unread")
     
-    # Check not blocked
-    if not check_not_blocked(sender.id, recipient.id, db):
-        return False, "Cannot invite blocked users"
+    rows = db.execute(
+        select(Thread, last_message, func.coalesce(unread.c.unread_count, 0).label("unread_count"))
+        .select_from(Thread)
+        .outerjoin(last_message, true())
+        .outerjoin(unread, unread.c.thread_id == Thread.id)
+        .where(is_participant)
+        .order_by(func.coalesce(last_message.c.created_at, Thread.created_at).desc(), Thread.id.desc())
+    ).all()
     
-    # Check rate limit
-    if not check_invite_rate_limit(sender.id):
-        return False, f"Rate limit exceeded. Maximum {settings.btl_invite_rate_limit} invites per day"
+    summaries = []
+    for row in rows:
+        thread = row.BetweenTheLinesThread
+        summaries.append({
+            "id": thread.id,
+            "participant1_id": thread.participant1_id,
+            "participant2_id": thread.participant2_id,
+            "status": thread.status,
+            "created_at": thread.created_at,
+            "closed_at": thread.closed_at,
+            "last_message": {
+                "id": row.id,
+                "thread_id": row.thread_id,
+                "sender_id": row.sender_id,
+                "content": row.content,
+                "created_at": row.created_at
+            } if row.id is not None else None,
+            "last_message_at": row.created_at,
+            "unread_count": row.unread_count
+        })
+    return summaries
+
+
+def mark_thread_read(thread: Thread, user_id: int, read_at: datetime) -> bool:
+    """
+    Move the participant's read mark forward to `read_at` (never back).
+    Caller commits.
     
-    return True, ""
+    Returns:
+        True if the mark moved
+    """
+    column = "participant1_last_read_at" if thread.participant1_id == user_id else "participant2_last_read_at"
+    current = getattr(thread, column)
+    if current is not None and current >= read_at:
+        return False
+    setattr(thread, column, read_at)
+    return True
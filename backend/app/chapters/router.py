@@ -1,24 +1,77 @@
 """Chapter routes"""
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select, delete, func, exists, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 from datetime import datetime, timezone, timedelta
-from typing import List
+from typing import List, Optional
 
-from app.database import get_db
-from app.models import User, Chapter, ChapterBlock, Book, Follow
-from app.auth.security import get_current_user
+from app.database import get_async_db
+from app.models import User, Chapter, ChapterBlock, Book, Follow, Heart, Bookmark
+from app.auth.principals import Principal
+from app.auth.security import get_current_user_async, get_read_db, get_current_principal
 from app.chapters.schemas import ChapterCreate, ChapterUpdate, ChapterResponse
 from app.services.open_pages import consume_open_page, can_publish
+from app.services.read_cursors import record_read
+from app.services.heart_counts import pending_delta
+from app.services.feed import push_chapter, remove_chapter
+from app.services.search_index import refresh_search_document
+from app.services.embedding_queue import queue_chapter_embedding
+from app.services.chapter_cache import get_cached_body, cache_body, invalidate_body
+from app.pagination import decode_cursor, keyset_before, page_from_rows
 
 router = APIRouter(prefix="/chapters", tags=["Chapters"])
 
 
+def _with_response_relations(query):
+    """Eager-load everything ChapterResponse reads (blocks, author, author's book)"""
+    return query.options(
+        selectinload(Chapter.blocks),
+        joinedload(Chapter.author).joinedload(User.book)
+    )
+
+
+async def _load_chapter(db: AsyncSession, chapter_id: int) -> Optional[Chapter]:
+    """Load a chapter ready to serialize, refreshing any stale state"""
+    return await db.scalar(
+        _with_response_relations(select(Chapter).where(Chapter.id == chapter_id))
+        .execution_options(populate_existing=True)
+    )
+
+
+def _viewer_overlay(chapter_id: int, viewer_id: int):
+    """
+    One cheap row for a chapter view: the version (updated_at), the
+    flushed heart_count (get_chapter adds the pending delta), the
+    author's Book id and the viewer's EXISTS flags (is_hearted,
+    is_bookmarked, follows_author, readable).
+    
+    readable: the viewer wrote it, the author's Book is not private, or
+    the viewer follows the author.
+    """
+    is_hearted = exists().where(Heart.user_id == viewer_id, Heart.chapter_id == Chapter.id)
+    is_bookmarked = exists().where(Bookmark.user_id == viewer_id, Bookmark.chapter_id == Chapter.id)
+    follows_author = exists().where(Follow.follower_id == viewer_id, Follow.followed_id == Chapter.author_id)
+    readable = or_(Chapter.author_id == viewer_id, Book.is_private.isnot(True), follows_author)
+    
+    return select(
+        Chapter.updated_at,
+        Chapter.heart_count,
+        Chapter.author_id,
+        Chapter.published_at,
+        Book.id.label("book_id"),
+        is_hearted.label("is_hearted"),
+        is_bookmarked.label("is_bookmarked"),
+        follows_author.label("follows_author"),
+        readable.label("readable")
+    ).outerjoin(Book, Book.user_id == Chapter.author_id).where(Chapter.id == chapter_id)
+
+
 @router.post("", response_model=ChapterResponse, status_code=status.HTTP_201_CREATED)
 async def create_chapter(
     chapter_data: ChapterCreate,
-    background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create and publish a new chapter.
@@ -46,7 +99,7 @@ async def create_chapter(
         edit_window_expires=datetime.now(timezone.utc) + timedelta(minutes=30)
     )
     db.add(chapter)
-    db.flush()  # Get chapter ID
+    await db.flush()  # Get chapter ID
     
     # Create blocks
     for block_data in chapter_data.blocks:
@@ -59,14 +112,18 @@ async def create_chapter(
         db.add(block)
     
     # Consume Open Page
-    consume_open_page(current_user, db)
+    await db.run_sync(lambda session: consume_open_page(current_user, session))
+    
+    await db.flush()
+    await db.run_sync(refresh_search_document, chapter.id)
+    await db.commit()
+    chapter = await _load_chapter(db, chapter.id)
     
-    db.commit()
-    db.refresh(chapter)
+    # Push into followers' New Chapters feeds
+    await db.run_sync(push_chapter, chapter)
     
-    # Queue embedding generation in background
-    from app.muse.embeddings import generate_chapter_embedding
-    background_tasks.add_task(generate_chapter_embedding, chapter, db)
+    # Queue embedding generation (batched by the job worker)
+    queue_chapter_embedding(chapter.id)
     
     return chapter
 
@@ -74,8 +131,8 @@ async def create_chapter(
 @router.get("/{chapter_id}", response_model=ChapterResponse)
 async def get_chapter(
     chapter_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get a chapter by ID.
@@ -84,69 +141,55 @@ async def get_chapter(
     - Includes author information (username, book_id)
     - Includes is_hearted and is_bookmarked status for current user
     - Does NOT include margins (fetched separately)
-    - Checks access permissions based on Book privacy (TODO)
-    """
-    from app.models.engagement import Heart, Bookmark
+    - Private Books are readable by their owner and followers only
     
-    chapter = db.query(Chapter).filter(Chapter.id == chapter_id).first()
+    The rendered body comes from the chapter cache; one query supplies
+    the version, heart_count and the viewer's flags, and Redis the
+    unflushed heart delta. A cache miss adds one query for the chapter
+    with its blocks and author.
+    """
+    view = (await db.execute(_viewer_overlay(chapter_id, current_user.id))).first()
     
-    if not chapter:
+    if not view:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Chapter not found"
         )
     
-    # Check access permissions based on Book privacy
-    book = db.query(Book).filter(Book.user_id == chapter.author_id).first()
-    if book and book.is_private:
-        # Private book: only owner and followers can access
-        if book.user_id != current_user.id:
-            # Check if user follows this book
-            is_following = db.query(Follow).filter(
-                Follow.follower_id == current_user.id,
-                Follow.followed_id == book.user_id
-            ).first()
-
-            if not is_following:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="This book is private"
-                )
-    
-    # Check if current user has hearted this chapter
-    is_hearted = db.query(Heart).filter(
-        Heart.user_id == current_user.id,
-        Heart.chapter_id == chapter.id
-    ).first() is not None
-    
-    # Check if current user has bookmarked this chapter
-    is_bookmarked = db.query(Bookmark).filter(
-        Bookmark.user_id == current_user.id,
-        Bookmark.chapter_id == chapter.id
-    ).first() is not None
+    if not view.readable:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="This book is private"
+        )
     
-    # Build response with author info
-    response_data = {
-        "id": chapter.id,
-        "author_id": chapter.author_id,
-        "title": chapter.title,
-        "cover_url": chapter.cover_url,
-        "mood": chapter.mood,
-        "theme": chapter.theme,
-        "time_period": chapter.time_period,
-        "heart_count": chapter.heart_count,
-        "is_hearted": is_hearted,
-        "is_bookmarked": is_bookmarked,
-        "published_at": chapter.published_at,
-        "edit_window_expires": chapter.edit_window_expires,
-        "blocks": chapter.blocks,
-        "author": {
-            "username": chapter.author.username,
-            "book_id": chapter.author.id
-        }
-    }
+    body = get_cached_body(chapter_id, view.updated_at)
+    if body is None:
+        chapter = (await db.execute(
+            select(Chapter).where(Chapter.id == chapter_id).options(
+                joinedload(Chapter.blocks),
+                joinedload(Chapter.author)
+            )
+        )).unique().scalar_one_or_none()
+        if not chapter:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Chapter not found"
+            )
+        body = cache_body(chapter)
+    
+    # Reading a followed author's chapter moves the reader's cursor for
+    # their Book forward (only followed Books have spines); the write is
+    # buffered so the view stays on the replica
+    if view.book_id and view.follows_author:
+        record_read(current_user.id, view.book_id, view.published_at)
     
-    return response_data
+    return {
+        **body,
+        # Hearts not yet flushed to the column
+        "heart_count": max(view.heart_count + pending_delta(chapter_id), 0),
+        "is_hearted": view.is_hearted,
+        "is_bookmarked": view.is_bookmarked
+    }
 
 
 @router.get("", response_model=dict)
@@ -154,8 +197,9 @@ async def list_chapters(
     page: int = 1,
     per_page: int = 20,
     author_id: int = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     List chapters with pagination.
@@ -163,18 +207,26 @@ async def list_chapters(
     - Optional filter by author_id
     - Returns chapters ordered by published_at (newest first)
     - Paginated with metadata
+    - Pass `cursor` (from next_cursor) to page by keyset; total is then omitted
     """
-    query = db.query(Chapter)
+    filters = [Chapter.author_id == author_id] if author_id else []
     
-    if author_id:
-        query = query.filter(Chapter.author_id == author_id)
-    
-    # Count total
-    total = query.count()
+    query = _with_response_relations(select(Chapter).where(*filters)).order_by(
+        Chapter.published_at.desc(), Chapter.id.desc()
+    )
     
-    # Apply pagination
-    offset = (page - 1) * per_page
-    chapters = query.order_by(Chapter.published_at.desc()).offset(offset).limit(per_page).all()
+    if cursor:
+        # Keyset pagination: seek past the last chapter seen, no count
+        total = None
+        query = query.where(keyset_before(Chapter.published_at, Chapter.id, decode_cursor(cursor)))
+    else:
+        # Count total
+        total = await db.scalar(select(func.count(Chapter.id)).where(*filters))
+        query = query.offset((page - 1) * per_page)
+    
+    chapters, has_more, next_cursor = page_from_rows(
+        (await db.scalars(query.limit(per_page + 1))).all(), per_page, key=lambda c: (c.published_at, c.id)
+    )
     
     # Build response with author info
     chapters_data = []
@@ -197,7 +249,9 @@ async def list_chapters(
         "chapters": chapters_data,
         "total": total,
         "page": page,
-        "per_page": per_page
+        "per_page": per_page,
+        "has_more": has_more,
+        "next_cursor": next_cursor
     }
 
 
@@ -205,8 +259,8 @@ async def list_chapters(
 async def update_chapter(
     chapter_id: int,
     chapter_data: ChapterUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update a chapter within the edit window (30 minutes).
@@ -215,7 +269,7 @@ async def update_chapter(
     - Must be within 30 minutes of publication
     - Can update title, mood, theme, and blocks
     """
-    chapter = db.query(Chapter).filter(Chapter.id == chapter_id).first()
+    chapter = await db.get(Chapter, chapter_id)
     
     if not chapter:
         raise HTTPException(
@@ -238,6 +292,10 @@ async def update_chapter(
             detail="Edit window has expired (30 minutes after publication)"
         )
     
+    # The cached body of this version is about to go stale
+    invalidate_body(chapter.id, chapter.updated_at)
+    chapter.updated_at = now  # also versions block-only edits
+    
     # Update fields
     if chapter_data.title is not None:
         chapter.title = chapter_data.title
@@ -251,7 +309,7 @@ async def update_chapter(
     # Update blocks if provided
     if chapter_data.blocks is not None:
         # Delete existing blocks
-        db.query(ChapterBlock).filter(ChapterBlock.chapter_id == chapter.id).delete()
+        await db.execute(delete(ChapterBlock).where(ChapterBlock.chapter_id == chapter.id))
         
         # Create new blocks
         for block_data in chapter_data.blocks:
@@ -263,8 +321,13 @@ async def update_chapter(
             )
             db.add(block)
     
-    db.commit()
-    db.refresh(chapter)
+    await db.flush()
+    await db.run_sync(refresh_search_document, chapter.id)
+    await db.commit()
+    chapter = await _load_chapter(db, chapter.id)
+    
+    # Re-embed if the text changed (unchanged text is skipped by hash)
+    queue_chapter_embedding(chapter.id)
     
     return chapter
 
@@ -272,8 +335,8 @@ async def update_chapter(
 @router.delete("/{chapter_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_chapter(
     chapter_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a chapter.
@@ -281,7 +344,7 @@ async def delete_chapter(
     - Only author can delete
     - Cascade deletes blocks, hearts, bookmarks, margins
     """
-    chapter = db.query(Chapter).filter(Chapter.id == chapter_id).first()
+    chapter = await db.get(Chapter, chapter_id)
     
     if not chapter:
         raise HTTPException(
@@ -296,7 +359,12 @@ async def delete_chapter(
             detail="You can only delete your own chapters"
         )
     
-    db.delete(chapter)
-    db.commit()
+    author_id = chapter.author_id
+    await db.delete(chapter)
+    await db.commit()
+    invalidate_body(chapter_id, chapter.updated_at)
+    
+    # Drop it from followers' New Chapters feeds
+    await db.run_sync(remove_chapter, chapter_id, author_id)
     
     return None
@@ -14,9 +14,23 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str | None = None
+    database_replica_url: str | None = None  # read replica for GET handlers (unset = primary serves everything)
+    replica_sticky_seconds: int = 5  # after a write, a user's reads stay on the primary this long
     
     # Redis
     redis_url: str = "redis://localhost:6379/0"
+    redis_max_connections: int = 50  # shared pool size per process
+    redis_pool_timeout: float = 5.0  # seconds to wait for a free connection
+    
+    # Principal cache (authenticated user rows)
+    principal_cache_ttl: int = 60  # seconds in Redis
+    principal_local_ttl: float = 5.0  # seconds in the in-process LRU
+    principal_local_size: int = 10000  # users held in the in-process LRU
+    
+    # Password hashing (bcrypt)
+    bcrypt_rounds: int = 12  # cost factor; older hashes are upgraded on login
+    password_hash_workers: int = 4  # threads hashing concurrently
+    password_hash_queue_limit: int = 32  # hashes running or waiting before 503s
     
     # JWT
     secret_key: str
@@ -40,12 +54,65 @@ class Settings(BaseSettings):
     # CORS
     cors_origins: list[str] = ["*"]
 
+    # Muse model provider
+    muse_provider: str = "openai"  # "openai" or "fake" (tests, benchmarks)
+    muse_chat_model: str = "gpt-4"
+    muse_embedding_model: str = "text-embedding-3-small"
+    muse_max_concurrency: int = 16  # concurrent model calls per process
+    muse_timeout: float = 30.0  # seconds per model call
+    muse_breaker_threshold: int = 5  # consecutive failures before failing fast
+    muse_breaker_reset_seconds: float = 30.0
+
     # Rate Limits
     margin_rate_limit: int = 20  # per hour
     btl_invite_rate_limit: int = 3  # per day
     muse_prompt_rate_limit: int = 10  # per hour
     muse_rewrite_rate_limit: int = 15  # per hour
     muse_cover_rate_limit: int = 5  # per day
+
+    # New Chapters feed
+    feed_max_items: int = 100  # per-reader feed bound
+    feed_fanout_max_followers: int = 5000  # above this, fan out on read
+    feed_empty_ttl: int = 300  # seconds an empty rebuilt feed is trusted before rebuilding again
+
+    # Rendered chapter cache
+    chapter_cache_ttl: int = 3600  # seconds a rendered chapter body stays cached
+
+    # Semantic search (pgvector HNSW)
+    hnsw_ef_search: int = 100  # default query-time candidate list (matches the m = 24 index)
+    semantic_search_max_k: int = 50
+
+    # Background jobs (rq)
+    jobs_run_inline: bool = False  # run jobs in the calling process (tests, local dev)
+    job_max_retries: int = 3
+    job_retry_intervals: list[int] = [10, 60, 300]  # seconds between attempts
+
+    # Embedding pipeline
+    embedding_batch_max_tokens: int = 100000  # estimated tokens per embeddings request
+    embedding_batch_max_inputs: int = 512  # inputs per embeddings request
+    embedding_flush_delay: int = 5  # seconds to let pending chapters coalesce
+
+    # Open Pages
+    open_page_grant_chunk_size: int = 1000  # users per UPDATE in the daily grant
+
+    # Heart counts (write-behind)
+    heart_flush_delay: int = 5  # seconds to let heart deltas coalesce before flushing
+
+    # Read cursors (write-behind)
+    read_cursor_flush_delay: int = 5  # seconds to let chapter views coalesce before flushing
+
+    # Notifications
+    notification_flush_delay: int = 30  # seconds to buffer events before writing them
+    notification_batch_size: int = 500  # events written per batch
+    notification_coalesce_window: int = 3600  # seconds an unread notification absorbs similar events
+    notification_heartbeat_seconds: int = 15  # idle seconds before a keepalive comment
+    notification_replay_limit: int = 100  # notifications delivered per catch-up
+
+    # Follow graph edge cache
+    follow_edge_cache_ttl: int = 3600  # seconds a user pair's follow/block edges stay cached
+
+    # Quiet Picks
+    quiet_picks_cache_ttl: int = 3600  # seconds; also bounds staleness of the 7-day window
     
     model_config = SettingsConfigDict(
         env_file=str(Path(__file__).parent.parent / ".env"),
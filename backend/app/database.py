@@ -1,9 +1,32 @@
-"""Database configuration and session management"""
-from sqlalchemy import create_engine
+"""Database configuration and session management
+
+Two session paths share one database:
+
+- async (asyncpg): `get_async_db` for request handlers, so queries
+  await instead of blocking the event loop
+- sync (psycopg2): `get_db` / `SessionLocal` for routers not yet ported,
+  the job worker, scripts and migrations
+
+Sync service functions can be reused from an AsyncSession with
+`await db.run_sync(fn, *args)` - they then run on the async connection.
+
+Read-only handlers take a routing session (`get_read_db` in
+app.auth.security) that sends reads to DATABASE_REPLICA_URL and writes
+to the primary. A user who has just written is pinned to the primary
+for `replica_sticky_seconds`, so they read their own writes despite
+replication lag.
+"""
+import redis
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url, URL
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
 
 from app.config import settings
+from app.logging_config import logger
+from app.redis_client import redis_client
 
 # Create database engine
 engine = create_engine(
@@ -16,10 +39,131 @@ engine = create_engine(
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def async_database_url(database_url: str) -> URL:
+    """The same database URL for the asyncpg driver"""
+    url = make_url(database_url).set(drivername="postgresql+asyncpg")
+    # asyncpg spells libpq's sslmode as ssl
+    sslmode = url.query.get("sslmode")
+    if sslmode:
+        url = url.difference_update_query(["sslmode"]).update_query_dict({"ssl": sslmode})
+    return url
+
+
+def _create_async_engine(database_url: str):
+    """Async engine for request handlers"""
+    return create_async_engine(
+        async_database_url(database_url),
+        pool_pre_ping=True,
+        pool_size=10,
+        max_overflow=20
+    )
+
+
+async_engine = _create_async_engine(settings.database_url)
+
+# Without a replica the primary serves reads too
+replica_configured = bool(settings.database_replica_url)
+replica_async_engine = (
+    _create_async_engine(settings.database_replica_url) if replica_configured else async_engine
+)
+
+
+# Objects stay usable after commit - attribute access must never
+# trigger a lazy refresh outside the event loop's await points
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+
+class RoutingSession(Session):
+    """
+    Session behind `ReadSessionLocal`: reads go to the replica, writes
+    (flushes, INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE) to the primary.
+
+    Once the session has written, or is pinned with
+    `info["primary"] = True`, every later statement goes to the primary
+    so the session reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        if (
+            self._flushing
+            or isinstance(clause, UpdateBase)
+            or getattr(clause, "_for_update_arg", None) is not None
+        ):
+            self.info["primary"] = True
+        if self.info.get("primary"):
+            return async_engine.sync_engine
+        return replica_async_engine.sync_engine
+
+
+ReadSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base class for models
 Base = declarative_base()
 
 
+def primary_pin_key(user_id: int) -> str:
+    """Redis key marking a user's reads as pinned to the primary"""
+    return f"db:primary:{user_id}"
+
+
+def pin_to_primary(user_id: int) -> None:
+    """Send the user's reads to the primary for the next few seconds"""
+    try:
+        redis_client.set(primary_pin_key(user_id), 1, ex=settings.replica_sticky_seconds)
+    except redis.RedisError as e:
+        logger.warning(f"Could not pin reads to primary for user {user_id}: {e}")
+
+
+def is_pinned_to_primary(user_id: int) -> bool:
+    """Whether the user wrote recently enough that the replica may lag"""
+    if not replica_configured:
+        return False
+    try:
+        return bool(redis_client.exists(primary_pin_key(user_id)))
+    except redis.RedisError:
+        # Cannot tell - the primary is always up to date
+        return True
+
+
+# Sessions record whether they wrote; committing a write made on behalf
+# of a user (info["user_id"], set by the auth dependencies) pins that
+# user's reads to the primary.
+
+@event.listens_for(Session, "after_flush")
+def _flushed(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _executed(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _committed(session):
+    wrote = session.info.pop("wrote", False)
+    user_id = session.info.get("user_id")
+    if wrote and user_id and replica_configured:
+        pin_to_primary(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _rolled_back(session):
+    session.info.pop("wrote", None)
+
+
 def get_db():
     """Dependency for getting database session"""
     db = SessionLocal()
@@ -27,3 +171,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency for getting an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,16 +1,46 @@
 """Engagement routes - Hearts, Follows, Bookmarks"""
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select, delete, exists
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from typing import List
+from typing import List, Optional
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models import User, Chapter, Heart, Follow, Bookmark, Book
-from app.auth.security import get_current_user
+from app.auth.principals import Principal
+from app.auth.security import get_current_user_async, get_read_db, get_current_principal
 from app.engagement.schemas import HeartResponse, FollowResponse, BookmarkResponse
+from app.services.feed import rebuild_feed
+from app.services.follow_graph import invalidate_pair
+from app.services.heart_counts import record_heart
+from app.services.notification_service import notify_shelf_add
+from app.jobs import enqueue
+from app.pagination import decode_cursor, keyset_before, page_from_rows
 
 router = APIRouter(prefix="/engagement", tags=["Engagement"])
 
+# Most ids a batch status request may ask about
+MAX_STATUS_IDS = 100
+
+
+def _parse_ids(raw: str, name: str) -> List[int]:
+    """Parse a comma-separated id list (duplicates dropped, order kept)"""
+    try:
+        ids = list(dict.fromkeys(int(part) for part in raw.split(",") if part.strip()))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{name} must be comma-separated integers"
+        )
+    
+    if not ids or len(ids) > MAX_STATUS_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{name} must list between 1 and {MAX_STATUS_IDS} ids"
+        )
+    return ids
+
 
 # ============================================================================
 # HEARTS
@@ -19,48 +49,47 @@ router = APIRouter(prefix="/engagement", tags=["Engagement"])
 @router.post("/chapters/{chapter_id}/heart", response_model=HeartResponse, status_code=status.HTTP_201_CREATED)
 async def heart_chapter(
     chapter_id: int,
-    background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Heart a chapter (toggle on)"""
-    chapter = db.query(Chapter).filter(Chapter.id == chapter_id).first()
-    
-    if not chapter:
+    """
+    Heart a chapter (toggle on).
+    
+    Idempotent: hearting twice returns the existing heart. The chapter's
+    heart_count catches up when pending counts are flushed.
+    """
+    try:
+        heart = await db.scalar(
+            insert(Heart).values(
+                user_id=current_user.id,
+                chapter_id=chapter_id
+            ).on_conflict_do_nothing(
+                constraint="uq_heart_user_chapter"
+            ).returning(Heart)
+        )
+    except IntegrityError:
+        # Foreign key: no such chapter
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Chapter not found"
         )
     
-    # Check if already hearted
-    existing = db.query(Heart).filter(
-        Heart.user_id == current_user.id,
-        Heart.chapter_id == chapter_id
-    ).first()
+    if heart is None:
+        # Already hearted
+        return await db.scalar(select(Heart).where(
+            Heart.user_id == current_user.id,
+            Heart.chapter_id == chapter_id
+        ))
     
-    if existing:
-        return existing
-    
-    # Create heart
-    heart = Heart(
-        user_id=current_user.id,
-        chapter_id=chapter_id
-    )
-    db.add(heart)
-    
-    # Increment heart count
-    chapter.heart_count += 1
-    
-    db.commit()
-    db.refresh(heart)
+    await db.commit()
+    record_heart(chapter_id, +1)
     
     # Award XP for hearting
-    from app.services.muse_progression import award_xp
-    award_xp(db, current_user, 'bookmark')  # Using bookmark XP (3 points)
+    enqueue("app.jobs.tasks.award_xp", current_user.id, 'bookmark')  # Using bookmark XP (3 points)
     
     # Update taste profile in background
-    from app.muse.embeddings import update_taste_profile
-    background_tasks.add_task(update_taste_profile, current_user, chapter, 'heart', db)
+    enqueue("app.jobs.tasks.update_taste", current_user.id, chapter_id, 'heart')
     
     return heart
 
@@ -68,36 +97,24 @@ async def heart_chapter(
 @router.delete("/chapters/{chapter_id}/heart", status_code=status.HTTP_204_NO_CONTENT)
 async def unheart_chapter(
     chapter_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Remove heart from a chapter (toggle off)"""
-    chapter = db.query(Chapter).filter(Chapter.id == chapter_id).first()
-    
-    if not chapter:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Chapter not found"
-        )
-    
-    heart = db.query(Heart).filter(
+    heart_id = await db.scalar(delete(Heart).where(
         Heart.user_id == current_user.id,
         Heart.chapter_id == chapter_id
-    ).first()
+    ).returning(Heart.id))
     
-    if not heart:
+    if heart_id is None:
+        chapter_exists = await db.scalar(select(Chapter.id).where(Chapter.id == chapter_id))
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Heart not found"
+            detail="Heart not found" if chapter_exists else "Chapter not found"
         )
     
-    db.delete(heart)
-    
-    # Decrement heart count
-    if chapter.heart_count > 0:
-        chapter.heart_count -= 1
-    
-    db.commit()
+    await db.commit()
+    record_heart(chapter_id, -1)
     return None
 
 
@@ -108,11 +125,11 @@ async def unheart_chapter(
 @router.post("/books/{book_id}/follow", response_model=FollowResponse, status_code=status.HTTP_201_CREATED)
 async def follow_book(
     book_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Follow a book"""
-    book = db.query(Book).filter(Book.id == book_id).first()
+    book = await db.get(Book, book_id)
     
     if not book:
         raise HTTPException(
@@ -128,10 +145,10 @@ async def follow_book(
         )
     
     # Check if already following
-    existing = db.query(Follow).filter(
+    existing = await db.scalar(select(Follow).where(
         Follow.follower_id == current_user.id,
         Follow.followed_id == book.user_id
-    ).first()
+    ))
     
     if existing:
         return existing
@@ -142,19 +159,24 @@ async def follow_book(
         followed_id=book.user_id
     )
     db.add(follow)
-    db.commit()
-    db.refresh(follow)
+    await db.commit()
+    await db.refresh(follow)
+    invalidate_pair(current_user.id, book.user_id)
+    
+    # Follow graph changed - rebuild the reader's feed
+    await db.run_sync(rebuild_feed, current_user.id)
+    
     return follow
 
 
 @router.delete("/books/{book_id}/follow", status_code=status.HTTP_204_NO_CONTENT)
 async def unfollow_book(
     book_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Unfollow a book"""
-    book = db.query(Book).filter(Book.id == book_id).first()
+    book = await db.get(Book, book_id)
     
     if not book:
         raise HTTPException(
@@ -162,10 +184,10 @@ async def unfollow_book(
             detail="Book not found"
         )
     
-    follow = db.query(Follow).filter(
+    follow = await db.scalar(select(Follow).where(
         Follow.follower_id == current_user.id,
         Follow.followed_id == book.user_id
-    ).first()
+    ))
     
     if not follow:
         raise HTTPException(
@@ -173,19 +195,24 @@ async def unfollow_book(
             detail="Follow not found"
         )
     
-    db.delete(follow)
-    db.commit()
+    await db.delete(follow)
+    await db.commit()
+    invalidate_pair(current_user.id, book.user_id)
+    
+    # Follow graph changed - rebuild the reader's feed
+    await db.run_sync(rebuild_feed, current_user.id)
+    
     return None
 
 
 @router.get("/books/{book_id}/followers", response_model=List[FollowResponse])
 async def get_followers(
     book_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get followers of a book"""
-    book = db.query(Book).filter(Book.id == book_id).first()
+    book = await db.get(Book, book_id)
     
     if not book:
         raise HTTPException(
@@ -193,9 +220,9 @@ async def get_followers(
             detail="Book not found"
         )
     
-    followers = db.query(Follow).filter(
+    followers = (await db.scalars(select(Follow).where(
         Follow.followed_id == book.user_id
-    ).all()
+    ))).all()
     
     return followers
 
@@ -203,11 +230,11 @@ async def get_followers(
 @router.get("/books/{book_id}/following", response_model=List[FollowResponse])
 async def get_following(
     book_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get books that this book's author is following"""
-    book = db.query(Book).filter(Book.id == book_id).first()
+    book = await db.get(Book, book_id)
     
     if not book:
         raise HTTPException(
@@ -215,9 +242,9 @@ async def get_following(
             detail="Book not found"
         )
     
-    following = db.query(Follow).filter(
+    following = (await db.scalars(select(Follow).where(
         Follow.follower_id == book.user_id
-    ).all()
+    ))).all()
     
     return following
 
@@ -229,12 +256,11 @@ async def get_following(
 @router.post("/chapters/{chapter_id}/bookmark", response_model=BookmarkResponse, status_code=status.HTTP_201_CREATED)
 async def bookmark_chapter(
     chapter_id: int,
-    background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Bookmark a chapter (can bookmark from unfollowed books)"""
-    chapter = db.query(Chapter).filter(Chapter.id == chapter_id).first()
+    chapter = await db.get(Chapter, chapter_id)
     
     if not chapter:
         raise HTTPException(
@@ -243,10 +269,10 @@ async def bookmark_chapter(
         )
     
     # Check if already bookmarked
-    existing = db.query(Bookmark).filter(
+    existing = await db.scalar(select(Bookmark).where(
         Bookmark.user_id == current_user.id,
         Bookmark.chapter_id == chapter_id
-    ).first()
+    ))
     
     if existing:
         return existing
@@ -257,12 +283,11 @@ async def bookmark_chapter(
         chapter_id=chapter_id
     )
     db.add(bookmark)
-    db.commit()
-    db.refresh(bookmark)
+    await db.commit()
+    await db.refresh(bookmark)
     
     # Update taste profile in background
-    from app.muse.embeddings import update_taste_profile
-    background_tasks.add_task(update_taste_profile, current_user, chapter, 'bookmark', db)
+    enqueue("app.jobs.tasks.update_taste", current_user.id, chapter_id, 'bookmark')
     
     return bookmark
 
@@ -270,11 +295,11 @@ async def bookmark_chapter(
 @router.delete("/bookmarks/{bookmark_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_bookmark(
     bookmark_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a bookmark"""
-    bookmark = db.query(Bookmark).filter(Bookmark.id == bookmark_id).first()
+    bookmark = await db.get(Bookmark, bookmark_id)
     
     if not bookmark:
         raise HTTPException(
@@ -288,20 +313,20 @@ async def delete_bookmark(
             detail="You can only delete your own bookmarks"
         )
     
-    db.delete(bookmark)
-    db.commit()
+    await db.delete(bookmark)
+    await db.commit()
     return None
 
 
 @router.get("/bookmarks", response_model=List[BookmarkResponse])
 async def list_bookmarks(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """List user's bookmarks in chronological order"""
-    bookmarks = db.query(Bookmark).filter(
+    bookmarks = (await db.scalars(select(Bookmark).where(
         Bookmark.user_id == current_user.id
-    ).order_by(Bookmark.created_at.desc()).all()
+    ).order_by(Bookmark.created_at.desc()))).all()
     
     return bookmarks
 
@@ -313,14 +338,14 @@ async def list_bookmarks(
 @router.post("/books/{book_id}/shelf", status_code=status.HTTP_201_CREATED)
 async def add_to_shelf(
     book_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Add a Book to your Shelf (curated collection)"""
     from app.models.shelf import Shelf
     
     # Get the book
-    book = db.query(Book).filter(Book.id == book_id).first()
+    book = await db.get(Book, book_id)
     
     if not book:
         raise HTTPException(
@@ -336,10 +361,10 @@ async def add_to_shelf(
         )
     
     # Check if already on shelf
-    existing = db.query(Shelf).filter(
+    existing = await db.scalar(select(Shelf).where(
         Shelf.user_id == current_user.id,
         Shelf.book_owner_id == book.user_id
-    ).first()
+    ))
     
     if existing:
         return {"message": "Book already on your Shelf", "shelf_id": existing.id}
@@ -350,12 +375,11 @@ async def add_to_shelf(
         book_owner_id=book.user_id
     )
     db.add(shelf_item)
-    db.commit()
-    db.refresh(shelf_item)
+    await db.commit()
+    await db.refresh(shelf_item)
     
     # Create notification for book owner
-    from app.services.notification_service import notify_shelf_add
-    notify_shelf_add(db, book.user_id, current_user.id)
+    notify_shelf_add(book.user_id, current_user.id)
     
     return {"message": "Book added to your Shelf", "shelf_id": shelf_item.id}
 
@@ -363,14 +387,14 @@ async def add_to_shelf(
 @router.delete("/books/{book_id}/shelf", status_code=status.HTTP_204_NO_CONTENT)
 async def remove_from_shelf(
     book_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Remove a Book from your Shelf"""
     from app.models.shelf import Shelf
     
     # Get the book
-    book = db.query(Book).filter(Book.id == book_id).first()
+    book = await db.get(Book, book_id)
     
     if not book:
         raise HTTPException(
@@ -379,10 +403,10 @@ async def remove_from_shelf(
         )
     
     # Find shelf entry
-    shelf_item = db.query(Shelf).filter(
+    shelf_item = await db.scalar(select(Shelf).where(
         Shelf.user_id == current_user.id,
         Shelf.book_owner_id == book.user_id
-    ).first()
+    ))
     
     if not shelf_item:
         raise HTTPException(
@@ -390,52 +414,100 @@ async def remove_from_shelf(
             detail="Book not on your Shelf"
         )
     
-    db.delete(shelf_item)
-    db.commit()
+    await db.delete(shelf_item)
+    await db.commit()
     return None
 
 
 @router.get("/shelf")
 async def get_shelf(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    page: int = Query(1, ge=1),
+    per_page: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get user's Shelf (curated Book collection)"""
+    """
+    Get user's Shelf (curated Book collection), most recently added first.
+    
+    One query joins each shelf entry to its Book and owner. When there
+    are more entries, the cursor for the next page is returned in the
+    X-Next-Cursor header; pass it back as `cursor`.
+    """
     from app.models.shelf import Shelf
     
-    shelf_items = db.query(Shelf).filter(
+    query = select(
+        Shelf.id, Shelf.created_at, Book, User.username
+    ).join(
+        Book, Book.user_id == Shelf.book_owner_id
+    ).join(
+        User, User.id == Shelf.book_owner_id
+    ).where(
         Shelf.user_id == current_user.id
-    ).order_by(Shelf.created_at.desc()).all()
-    
-    # Get Book details for each shelf item
-    books = []
-    for item in shelf_items:
-        book = db.query(Book).filter(Book.user_id == item.book_owner_id).first()
-        if book:
-            owner = db.query(User).filter(User.id == book.user_id).first()
-            books.append({
-                "id": book.id,
-                "user_id": book.user_id,
-                "username": owner.username if owner else "Unknown",
-                "display_name": book.display_name,
-                "bio": book.bio,
-                "cover_image_url": book.cover_image_url,
-                "added_at": item.created_at.isoformat()
-            })
-    
-    return books
+    ).order_by(Shelf.created_at.desc(), Shelf.id.desc())
+    
+    # Apply pagination (keyset when a cursor is given, offset otherwise)
+    if cursor:
+        query = query.where(keyset_before(Shelf.created_at, Shelf.id, decode_cursor(cursor)))
+    else:
+        query = query.offset((page - 1) * per_page)
+    
+    rows, has_more, next_cursor = page_from_rows(
+        (await db.execute(query.limit(per_page + 1))).all(), per_page, key=lambda row: (row.created_at, row.id)
+    )
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    return [
+        {
+            "id": row.Book.id,
+            "user_id": row.Book.user_id,
+            "username": row.username,
+            "display_name": row.Book.display_name,
+            "bio": row.Book.bio,
+            "cover_image_url": row.Book.cover_image_url,
+            "added_at": row.created_at.isoformat()
+        }
+        for row in rows
+    ]
+
+
+@router.get("/shelf/status")
+async def check_shelf_statuses(
+    book_ids: str = Query(..., description="Comma-separated Book ids"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Check which of many Books are on user's Shelf, in one query.
+    
+    Returns {book_id: {"on_shelf": bool}}; unknown Books are left out.
+    """
+    from app.models.shelf import Shelf
+    
+    ids = _parse_ids(book_ids, "book_ids")
+    
+    on_shelf = exists().where(
+        Shelf.user_id == current_user.id,
+        Shelf.book_owner_id == Book.user_id
+    )
+    rows = await db.execute(select(Book.id, on_shelf.label("on_shelf")).where(Book.id.in_(ids)))
+    
+    return {row.id: {"on_shelf": row.on_shelf} for row in rows}
 
 
 @router.get("/books/{book_id}/shelf/status")
 async def check_shelf_status(
     book_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Check if a Book is on user's Shelf"""
     from app.models.shelf import Shelf
     
-    book = db.query(Book).filter(Book.id == book_id).first()
+    book = await db.get(Book, book_id)
     
     if not book:
         raise HTTPException(
@@ -443,9 +515,43 @@ async def check_shelf_status(
             detail="Book not found"
         )
     
-    shelf_item = db.query(Shelf).filter(
+    shelf_item = await db.scalar(select(Shelf).where(
         Shelf.user_id == current_user.id,
         Shelf.book_owner_id == book.user_id
-    ).first()
+    ))
     
     return {"on_shelf": shelf_item is not None}
+
+
+# ============================================================================
+# BATCH STATUS
+# ============================================================================
+
+@router.get("/status")
+async def check_chapter_statuses(
+    chapter_ids: str = Query(..., description="Comma-separated chapter ids"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Check which of many chapters user has hearted or bookmarked, in one query.
+    
+    Returns {chapter_id: {"is_hearted": bool, "is_bookmarked": bool}};
+    unknown chapters are left out.
+    """
+    ids = _parse_ids(chapter_ids, "chapter_ids")
+    
+    is_hearted = exists().where(Heart.user_id == current_user.id, Heart.chapter_id == Chapter.id)
+    is_bookmarked = exists().where(Bookmark.user_id == current_user.id, Bookmark.chapter_id == Chapter.id)
+    rows = await db.execute(
+        select(
+            Chapter.id,
+            is_hearted.label("is_hearted"),
+            is_bookmarked.label("is_bookmarked")
+        ).where(Chapter.id.in_(ids))
+    )
+    
+    return {
+        row.id: {"is_hearted": row.is_hearted, "is_bookmarked": row.is_bookmarked}
+        for row in rows
+    }
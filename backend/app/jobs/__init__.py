@@ -0,0 +1,7 @@
+"""Background jobs - rq queue, tasks and worker"""
+from app.jobs.queues import enqueue, enqueue_in
+
+__all__ = [
+    "enqueue",
+    "enqueue_in",
+]
@@ -0,0 +1,100 @@
+"""
+Job queue
+
+Jobs are enqueued by dotted path with plain, serializable arguments
+(ids, strings), never ORM objects or sessions - each task opens its
+own session in the worker. Failed jobs are retried with backoff; once
+retries run out they are copied to the dead-letter queue, which no
+worker consumes, for inspection and replay.
+"""
+from datetime import timedelta
+from typing import Any
+import redis
+from rq import Queue, Retry, Callback
+from rq.job import Job
+
+from app.config import settings
+from app.logging_config import logger
+from app.redis_client import redis_client as redis_conn
+
+# Jobs run in the calling process when JOBS_RUN_INLINE is set (tests, local dev)
+default_queue = Queue("default", connection=redis_conn, is_async=not settings.jobs_run_inline)
+dead_letter_queue = Queue("dead_letter", connection=redis_conn)
+
+
+def _dead_letter(job: Job, connection, type, value, traceback) -> None:
+    """Failure callback: park the job once it has no retries left"""
+    if job.retries_left:
+        logger.warning(f"Job {job.func_name} ({job.id}) failed, {job.retries_left} retries left: {value}")
+        return
+
+    logger.error(f"Job {job.func_name} ({job.id}) failed permanently: {value}")
+    dead_letter_queue.enqueue(
+        job.func_name,
+        args=job.args,
+        kwargs=job.kwargs,
+        meta={"original_job_id": job.id, "error": repr(value)}
+    )
+
+
+def enqueue(func: str, *args: Any, **kwargs: Any) -> bool:
+    """
+    Enqueue a task on the default queue.
+
+    Never raises - if Redis is down the job is logged and dropped, so a
+    request never fails because of background work.
+
+    Args:
+        func: Dotted path of the task, e.g. "app.jobs.tasks.flush_embeddings"
+        *args, **kwargs: Serializable task arguments
+
+    Returns:
+        False if the job was dropped
+    """
+    try:
+        default_queue.enqueue(func, args=args, kwargs=kwargs, **_job_options())
+    except redis.RedisError as e:
+        logger.error(f"Failed to enqueue {func}: {e}")
+        return False
+    return True
+
+
+def enqueue_in(delay: int, func: str, *args: Any, **kwargs: Any) -> bool:
+    """
+    Enqueue a task to run after `delay` seconds (immediately when inline).
+
+    Same retry and failure handling as enqueue; never raises. Returns
+    False if the job was dropped.
+    """
+    if settings.jobs_run_inline:
+        return enqueue(func, *args, **kwargs)
+
+    try:
+        default_queue.enqueue_in(timedelta(seconds=delay), func, args=args, kwargs=kwargs, **_job_options())
+    except redis.RedisError as e:
+        logger.error(f"Failed to schedule {func}: {e}")
+        return False
+    return True
+
+
+def _job_options() -> dict:
+    """Retry with backoff, then dead-letter"""
+    return {
+        "retry": Retry(max=settings.job_max_retries, interval=settings.job_retry_intervals),
+        "on_failure": Callback(_dead_letter)
+    }
+
+
+def replay_dead_letters() -> int:
+    """
+    Move every dead-lettered job back onto the default queue.
+
+    Returns:
+        Number of jobs replayed
+    """
+    replayed = 0
+    for job in dead_letter_queue.jobs:
+        enqueue(job.func_name, *job.args, **job.kwargs)
+        job.delete()
+        replayed += 1
+    return replayed
@@ -0,0 +1,188 @@
+"""
+Background tasks
+
+Every task takes ids, opens its own session and lets exceptions
+propagate so the queue can retry it. Enqueue with app.jobs.enqueue,
+e.g. enqueue("app.jobs.tasks.update_taste", user.id, chapter.id, "heart").
+"""
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.jobs.queues import enqueue
+from app.models import User, Chapter
+from app.logging_config import logger
+
+
+@contextmanager
+def job_session() -> Iterator[Session]:
+    """A database session owned by the running job"""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def flush_embeddings() -> None:
+    """
+    Embed every chapter waiting in the pending set, in batches.
+
+    Ids are put back if a batch fails, so the retried job picks them up.
+    """
+    from app.muse.embeddings import embed_chapters
+    from app.services import embedding_queue
+
+    embedding_queue.clear_flush_scheduled()
+
+    with job_session() as db:
+        while True:
+            chapter_ids = embedding_queue.pop_pending(settings.embedding_batch_max_inputs)
+            if not chapter_ids:
+                return
+            try:
+                embedded = embed_chapters(db, chapter_ids)
+            except Exception:
+                db.rollback()
+                embedding_queue.requeue(chapter_ids)
+                raise
+            logger.info(f"Embedded {embedded} of {len(chapter_ids)} pending chapter(s)")
+
+
+def flush_heart_counts() -> None:
+    """
+    Apply pending heart deltas to chapters.heart_count in one UPDATE.
+
+    Deltas are put back if the flush fails, so the retried job applies
+    them; chapters clamped at zero are reconciled against the hearts table.
+    """
+    from app.services import heart_counts
+
+    heart_counts.clear_flush_scheduled()
+    deltas = heart_counts.take_deltas()
+    if not deltas:
+        return
+
+    with job_session() as db:
+        try:
+            suspect = heart_counts.apply_deltas(db, deltas)
+            db.commit()
+        except Exception:
+            db.rollback()
+            heart_counts.restore_deltas(deltas)
+            raise
+
+    logger.info(f"Flushed heart counts for {len(deltas)} chapter(s)")
+    if suspect:
+        enqueue("app.jobs.tasks.reconcile_heart_counts", suspect)
+
+
+def reconcile_heart_counts(chapter_ids: Optional[List[int]] = None) -> None:
+    """Recompute heart_count from the hearts table (all chapters when None)"""
+    from app.services import heart_counts
+
+    with job_session() as db:
+        fixed = heart_counts.reconcile(db, chapter_ids)
+        db.commit()
+
+    if fixed:
+        logger.warning(f"Reconciled drifted heart counts on {fixed} chapter(s)")
+
+
+def flush_read_cursors() -> None:
+    """
+    Apply read cursors buffered by chapter views in one upsert.
+
+    Cursors are put back if the flush fails, so the retried job applies them.
+    """
+    from app.services import read_cursors
+
+    read_cursors.clear_flush_scheduled()
+    reads = read_cursors.take_pending()
+    if not reads:
+        return
+
+    with job_session() as db:
+        try:
+            written = read_cursors.apply_reads(db, reads)
+            db.commit()
+        except Exception:
+            db.rollback()
+            read_cursors.restore_pending(reads)
+            raise
+
+    logger.info(f"Flushed {written} read cursor(s)")
+
+
+def reconcile_unread_counts() -> None:
+    """Recompute every user's unread notification counter"""
+    from app.services.notification_service import reconcile_unread_counts as reconcile
+
+    with job_session() as db:
+        fixed = reconcile(db)
+        db.commit()
+
+    if fixed:
+        logger.warning(f"Reconciled drifted unread notification counts for {fixed} user(s)")
+
+
+def grant_open_pages() -> None:
+    """Daily Open Page grant for every eligible user"""
+    from app.services.open_pages import grant_open_pages_to_all_users
+
+    with job_session() as db:
+        stats = grant_open_pages_to_all_users(db)
+
+    logger.info(
+        f"Granted Open Pages to {stats['granted']} of {stats['total_users']} user(s)"
+    )
+
+
+def update_taste(user_id: int, chapter_id: int, interaction_type: str) -> None:
+    """Nudge a reader's taste profile towards a chapter they engaged with"""
+    from app.muse.embeddings import update_taste_profile
+
+    with job_session() as db:
+        user = db.query(User).filter(User.id == user_id).first()
+        chapter = db.query(Chapter).filter(Chapter.id == chapter_id).first()
+        if not user or not chapter:
+            return
+        update_taste_profile(user, chapter, interaction_type, db)
+
+
+def award_xp(user_id: int, action: str) -> None:
+    """Award Muse XP for an action"""
+    from app.services.muse_progression import award_xp as award
+
+    with job_session() as db:
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            return
+        award(db, user, action)
+
+
+def flush_notifications() -> None:
+    """
+    Write buffered notification events, in batches.
+
+    Events are put back if a batch fails, so the retried job writes them.
+    """
+    from app.services import notification_queue
+    from app.services.notification_service import write_notifications
+
+    notification_queue.clear_flush_scheduled()
+
+    with job_session() as db:
+        while True:
+            events = notification_queue.take_pending(settings.notification_batch_size)
+            if not events:
+                return
+            try:
+                written = write_notifications(db, events)
+            except Exception:
+                db.rollback()
+                notification_queue.requeue(events)
+                raise
+            logger.info(f"Wrote {written} notification(s) for {len(events)} event(s)")
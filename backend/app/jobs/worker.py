@@ -0,0 +1,45 @@
+"""
+Job worker entry point
+
+    python -m app.jobs.worker                     # process the default queue
+    python -m app.jobs.worker --replay            # requeue dead-lettered jobs, then exit
+    python -m app.jobs.worker --reconcile-hearts  # recompute every heart count, then exit
+    python -m app.jobs.worker --grant-open-pages  # daily Open Page grant, then exit (cron)
+    python -m app.jobs.worker --reconcile-unread  # recompute unread notification counts, then exit (cron)
+"""
+import sys
+from rq import Worker
+
+from app.jobs.queues import redis_conn, default_queue, replay_dead_letters
+from app.logging_config import logger
+
+
+def main() -> None:
+    """Run a worker, or run a one-off maintenance command"""
+    if "--replay" in sys.argv[1:]:
+        replayed = replay_dead_letters()
+        logger.info(f"Replayed {replayed} dead-lettered job(s)")
+        return
+
+    if "--reconcile-hearts" in sys.argv[1:]:
+        from app.jobs.tasks import reconcile_heart_counts
+        reconcile_heart_counts()
+        return
+
+    if "--grant-open-pages" in sys.argv[1:]:
+        from app.jobs.tasks import grant_open_pages
+        grant_open_pages()
+        return
+
+    if "--reconcile-unread" in sys.argv[1:]:
+        from app.jobs.tasks import reconcile_unread_counts
+        reconcile_unread_counts()
+        return
+
+    # The scheduler is needed for retry backoff intervals
+    worker = Worker([default_queue], connection=redis_conn)
+    worker.work(with_scheduler=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,20 @@
 """Library routes - Feed and bookshelf"""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from typing import List
-from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy import select, func, desc
+from typing import List, Optional
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models import User, Book, Chapter, Follow
-from app.auth.security import get_current_user
+from app.auth.principals import Principal
+from app.auth.security import get_current_user_async, get_read_db, get_current_principal
 from app.library.schemas import SpineResponse, FeedResponse, ChapterFeedItem, PaginationMeta
 from app.chapters.schemas import ChapterResponse
+from app.services.spines import get_spines, advance_read_cursor
+from app.services.feed import get_feed_page
+from app.config import settings
+from app.pagination import encode_cursor, decode_cursor, keyset_before, page_from_rows
 
 router = APIRouter(prefix="/library", tags=["Library"])
 
@@ -20,8 +25,8 @@ router = APIRouter(prefix="/library", tags=["Library"])
 
 @router.get("/spines", response_model=List[SpineResponse])
 async def get_bookshelf_spines(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get bookshelf spines (followed books with unread indicators).
@@ -30,48 +35,44 @@ async def get_bookshelf_spines(
     - unread_count: number of chapters published since user's last read
     - last_chapter_at: timestamp of most recent chapter
     """
-    # Get all users the current user follows
-    follows = db.query(Follow).filter(
-        Follow.follower_id == current_user.id
-    ).all()
+    rows = await db.run_sync(get_spines, current_user.id)
+    
+    return [
+        SpineResponse(
+            book_id=row.book_id,
+            user_id=row.user_id,
+            username=row.username,
+            display_name=row.display_name,
+            unread_count=row.unread_count or 0,
+            last_chapter_at=row.last_chapter_at
+        )
+        for row in rows
+    ]
+
+
+@router.post("/books/{book_id}/read", status_code=status.HTTP_204_NO_CONTENT)
+async def mark_book_read(
+    book_id: int,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Mark a Book as read up to now.
     
-    spines = []
+    Clears the unread indicator on its spine.
+    """
+    book = await db.get(Book, book_id)
     
-    for follow in follows:
-        # Get the followed user's book
-        book = db.query(Book).filter(Book.user_id == follow.followed_id).first()
-        
-        if not book:
-            continue
-        
-        # Get the most recent chapter
-        last_chapter = db.query(Chapter).filter(
-            Chapter.author_id == follow.followed_id
-        ).order_by(desc(Chapter.published_at)).first()
-        
-        # Calculate unread count (for now, just count all chapters)
-        # TODO: Track user's last read timestamp per book
-        unread_count = db.query(func.count(Chapter.id)).filter(
-            Chapter.author_id == follow.followed_id
-        ).scalar()
-        
-        # Get user info
-        followed_user = db.query(User).filter(User.id == follow.followed_id).first()
-        
-        spine = SpineResponse(
-            book_id=book.id,
-            user_id=followed_user.id,
-            username=followed_user.username,
-            display_name=book.display_name,
-            unread_count=unread_count or 0,
-            last_chapter_at=last_chapter.published_at if last_chapter else None
+    if not book:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Book not found"
         )
-        spines.append(spine)
     
-    # Sort by most recent chapter first
-    spines.sort(key=lambda x: x.last_chapter_at or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
+    await db.run_sync(advance_read_cursor, current_user.id, book.id)
+    await db.commit()
     
-    return spines
+    return None
 
 
 # ============================================================================
@@ -82,8 +83,9 @@ async def get_bookshelf_spines(
 async def get_new_chapters_feed(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=50),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from pagination.next_cursor"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get new chapters feed from followed books.
@@ -91,85 +93,74 @@ async def get_new_chapters_feed(
     - Paginated results (max 50 per page)
     - Bounded to 100 total results
     - Ordered by published_at descending
+    - Served from the reader's materialized feed (see services/feed.py)
+    - Pass `cursor` to page by keyset instead of page number (no total)
     """
-    # Get all users the current user follows
-    followed_user_ids = db.query(Follow.followed_id).filter(
-        Follow.follower_id == current_user.id
-    ).all()
-    
-    followed_user_ids = [uid[0] for uid in followed_user_ids]
-    
-    if not followed_user_ids:
+    if cursor:
+        after = decode_cursor(cursor)
+        rows, _ = await db.run_sync(get_feed_page, current_user.id, per_page + 1, after=after)
+        rows, has_more, next_cursor = page_from_rows(
+            rows, per_page, key=lambda row: (row[0].published_at, row[0].id)
+        )
         return FeedResponse(
-            chapters=[],
+            chapters=[_feed_item(chapter, author_username) for chapter, author_username in rows],
             pagination=PaginationMeta(
                 page=page,
                 per_page=per_page,
-                total=0,
-                total_pages=0,
-                has_more=False
+                has_more=has_more,
+                next_cursor=next_cursor
             )
         )
     
-    # Query chapters from followed users
-    query = db.query(Chapter).filter(
-        Chapter.author_id.in_(followed_user_ids)
-    ).order_by(desc(Chapter.published_at))
-    
-    # Count total (bounded to 100)
-    total = min(query.count(), 100)
-    total_pages = (total + per_page - 1) // per_page
-    
-    # Apply pagination
     offset = (page - 1) * per_page
     
-    # Don't allow fetching beyond 100 results
-    if offset >= 100:
+    # Don't allow fetching beyond the feed bound
+    if offset >= settings.feed_max_items:
         return FeedResponse(
             chapters=[],
             pagination=PaginationMeta(
                 page=page,
                 per_page=per_page,
-                total=total,
-                total_pages=total_pages,
+                total=0,
+                total_pages=0,
                 has_more=False
             )
         )
     
-    # Limit to remaining results within 100 bound
-    limit = min(per_page, 100 - offset)
-    
-    chapters = query.offset(offset).limit(limit).all()
-    
-    # Build feed items
-    feed_items = []
-    for chapter in chapters:
-        author = db.query(User).filter(User.id == chapter.author_id).first()
-        
-        feed_item = ChapterFeedItem(
-            id=chapter.id,
-            title=chapter.title,
-            author_id=chapter.author_id,
-            author_username=author.username,
-            mood=chapter.mood,
-            theme=chapter.theme,
-            heart_count=chapter.heart_count,
-            published_at=chapter.published_at
-        )
-        feed_items.append(feed_item)
+    # Limit to remaining results within the feed bound
+    limit = min(per_page, settings.feed_max_items - offset)
+    
+    rows, total = await db.run_sync(get_feed_page, current_user.id, limit, offset=offset)
+    total_pages = (total + per_page - 1) // per_page
+    has_more = page < total_pages
     
     return FeedResponse(
-        chapters=feed_items,
+        chapters=[_feed_item(chapter, author_username) for chapter, author_username in rows],
         pagination=PaginationMeta(
             page=page,
             per_page=per_page,
             total=total,
             total_pages=total_pages,
-            has_more=page < total_pages
+            has_more=has_more,
+            next_cursor=encode_cursor(rows[-1][0].published_at, rows[-1][0].id) if has_more and rows else None
         )
     )
 
 
+def _feed_item(chapter: Chapter, author_username: str) -> ChapterFeedItem:
+    """Build a feed item from a chapter and its author's username"""
+    return ChapterFeedItem(
+        id=chapter.id,
+        title=chapter.title,
+        author_id=chapter.author_id,
+        author_username=author_username,
+        mood=chapter.mood,
+        theme=chapter.theme,
+        heart_count=chapter.heart_count,
+        published_at=chapter.published_at
+    )
+
+
 # ============================================================================
 # BOOK CHAPTERS
 # ============================================================================
@@ -177,17 +168,22 @@ async def get_new_chapters_feed(
 @router.get("/books/{book_id}/chapters", response_model=List[ChapterResponse])
 async def get_book_chapters(
     book_id: int,
+    response: Response,
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=50),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get chapters from a specific book with pagination.
     
     Checks access permissions based on book privacy settings.
+    
+    When there are more chapters, the cursor for the next page is
+    returned in the X-Next-Cursor header; pass it back as `cursor`.
     """
-    book = db.query(Book).filter(Book.id == book_id).first()
+    book = await db.get(Book, book_id)
     
     if not book:
         raise HTTPException(
@@ -200,10 +196,10 @@ async def get_book_chapters(
         # Private book: only owner and followers can access
         if book.user_id != current_user.id:
             # Check if user follows this book
-            is_following = db.query(Follow).filter(
+            is_following = await db.scalar(select(Follow.id).where(
                 Follow.follower_id == current_user.id,
                 Follow.followed_id == book.user_id
-            ).first()
+            ).limit(1))
             
             if not is_following:
                 raise HTTPException(
@@ -212,13 +208,26 @@ async def get_book_chapters(
                 )
     
     # Query chapters
-    query = db.query(Chapter).filter(
+    query = select(Chapter).where(
         Chapter.author_id == book.user_id
-    ).order_by(desc(Chapter.published_at))
+    ).options(
+        # Everything ChapterResponse reads, loaded up front
+        selectinload(Chapter.blocks),
+        joinedload(Chapter.author).joinedload(User.book)
+    ).order_by(desc(Chapter.published_at), desc(Chapter.id))
+    
+    # Apply pagination (keyset when a cursor is given, offset otherwise)
+    if cursor:
+        query = query.where(keyset_before(Chapter.published_at, Chapter.id, decode_cursor(cursor)))
+    else:
+        query = query.offset((page - 1) * per_page)
+    
+    chapters, has_more, next_cursor = page_from_rows(
+        (await db.scalars(query.limit(per_page + 1))).all(), per_page, key=lambda c: (c.published_at, c.id)
+    )
     
-    # Apply pagination
-    offset = (page - 1) * per_page
-    chapters = query.offset(offset).limit(per_page).all()
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
     return chapters
 
@@ -230,8 +239,8 @@ async def get_book_chapters(
 
 @router.get("/spines-discovery")
 async def get_spines_discovery(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get Spines - Books you've interacted with (read from, added to Shelf, or seen in Quiet Picks).
@@ -244,44 +253,44 @@ async def get_spines_discovery(
     discovered_user_ids = set()
     
     # 1. Books on user's Shelf
-    shelf_user_ids = db.query(Shelf.book_owner_id).filter(
+    shelf_user_ids = await db.scalars(select(Shelf.book_owner_id).where(
         Shelf.user_id == current_user.id
-    ).all()
-    discovered_user_ids.update([uid[0] for uid in shelf_user_ids])
+    ))
+    discovered_user_ids.update(shelf_user_ids)
     
     # 2. Books from hearted chapters
-    hearted_author_ids = db.query(Chapter.author_id).join(
+    hearted_author_ids = await db.scalars(select(Chapter.author_id).join(
         Heart, Heart.chapter_id == Chapter.id
-    ).filter(
+    ).where(
         Heart.user_id == current_user.id
-    ).distinct().all()
-    discovered_user_ids.update([uid[0] for uid in hearted_author_ids])
+    ).distinct())
+    discovered_user_ids.update(hearted_author_ids)
     
     # 3. Books from bookmarked chapters
-    bookmarked_author_ids = db.query(Chapter.author_id).join(
+    bookmarked_author_ids = await db.scalars(select(Chapter.author_id).join(
         Bookmark, Bookmark.chapter_id == Chapter.id
-    ).filter(
+    ).where(
         Bookmark.user_id == current_user.id
-    ).distinct().all()
-    discovered_user_ids.update([uid[0] for uid in bookmarked_author_ids])
+    ).distinct())
+    discovered_user_ids.update(bookmarked_author_ids)
     
     if not discovered_user_ids:
         return []
     
     # Get all Books and Users in one query
-    books_with_users = db.query(Book, User).join(
+    books_with_users = (await db.execute(select(Book, User).join(
         User, Book.user_id == User.id
-    ).filter(
+    ).where(
         Book.user_id.in_(discovered_user_ids)
-    ).all()
+    ))).all()
     
     # Get last chapter dates for all these users in one query
-    last_chapters = db.query(
+    last_chapters = (await db.execute(select(
         Chapter.author_id,
         func.max(Chapter.published_at).label('last_published')
-    ).filter(
+    ).where(
         Chapter.author_id.in_(discovered_user_ids)
-    ).group_by(Chapter.author_id).all()
+    ).group_by(Chapter.author_id))).all()
     
     last_chapter_map = {author_id: last_pub for author_id, last_pub in last_chapters}
     
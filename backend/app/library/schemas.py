@@ -18,12 +18,18 @@ class SpineResponse(BaseModel):
 
 
 class PaginationMeta(BaseModel):
-    """Pagination metadata"""
+    """
+    Pagination metadata.
+    
+    Offset mode fills in total and total_pages. Cursor mode skips the
+    count and leaves them empty; follow next_cursor instead.
+    """
     page: int
     per_page: int
-    total: int
-    total_pages: int
+    total: Optional[int] = None
+    total_pages: Optional[int] = None
     has_more: bool
+    next_cursor: Optional[str] = None
 
 
 class ChapterFeedItem(BaseModel):
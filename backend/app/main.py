@@ -27,6 +27,12 @@ async def lifespan(app: FastAPI):
     logger.info(f"🚀 Starting {settings.app_name}")
     yield
     # Shutdown
+    from app.muse.providers import close_muse
+    from app.services.notification_stream import close_notification_hub
+    from app.database import async_engine
+    await close_muse()
+    await close_notification_hub()
+    await async_engine.dispose()
     logger.info(f"👋 Shutting down {settings.app_name}")
 
 
@@ -45,6 +51,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Add custom middleware
@@ -70,6 +77,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -89,6 +97,13 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/cache")
+async def cache_health():
+    """Response cache hit/miss counters"""
+    from app.services.chapter_cache import cache_stats
+    return {"chapter_cache": cache_stats()}
+
+
 # Include routers
 from app.auth.router import router as auth_router
 from app.users.router import router as users_router
@@ -3,37 +3,28 @@ from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime, timezone, timedelta
-import redis
 
 from app.database import get_db
 from app.models import User, Chapter, Margin
 from app.auth.security import get_current_user
 from app.margins.schemas import MarginCreate, MarginResponse
+from app.jobs import enqueue
+from app.services.notification_service import notify_margin_added
+from app.services import rate_limit
 from app.config import settings
 
 router = APIRouter(prefix="/margins", tags=["Margins"])
 
-# Redis client for rate limiting
-redis_client = redis.from_url(settings.redis_url)
-
-
-def check_rate_limit(user_id: int) -> bool:
-    """Check if user has exceeded margin creation rate limit (20 per hour)"""
-    key = f"margin_rate_limit:{user_id}"
-    count = redis_client.get(key)
-    
-    if count is None:
-        # First margin in this hour
-        redis_client.setex(key, 3600, 1)
-        return True
-    
-    count = int(count)
-    if count >= 20:
-        return False
-    
-    # Increment count
-    redis_client.incr(key)
-    return True
+def check_rate_limit(user_id: int) -> rate_limit.RateLimitResult:
+    """
+    Count one margin against the user's limit (20 per hour).
+    
+    A token bucket: a burst of up to the full limit is allowed, then
+    margins refill steadily across the hour.
+    """
+    return rate_limit.hit(
+        "margins", user_id, settings.margin_rate_limit, 3600, rate_limit.TOKEN_BUCKET
+    )
 
 
 # ============================================================================
@@ -49,10 +40,11 @@ async def create_margin(
 ):
     """Create a margin (comment) on a chapter"""
     # Check rate limit
-    if not check_rate_limit(current_user.id):
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Rate limit exceeded. Maximum 20 margins per hour."
+    limit = check_rate_limit(current_user.id)
+    if not limit.allowed:
+        raise rate_limit.rate_limit_exceeded(
+            limit,
+            f"Rate limit exceeded. Maximum {settings.margin_rate_limit} margins per hour."
         )
     
     chapter = db.query(Chapter).filter(Chapter.id == chapter_id).first()
@@ -90,12 +82,10 @@ async def create_margin(
     db.refresh(margin)
     
     # Award XP for margin
-    from app.services.muse_progression import award_xp
-    award_xp(db, current_user, "margin")
+    enqueue("app.jobs.tasks.award_xp", current_user.id, "margin_comment")
     
     # Create notification for chapter author
-    from app.services.notification_service import notify_margin_added
-    notify_margin_added(db, margin, chapter)
+    notify_margin_added(margin, chapter)
     
     return margin
 
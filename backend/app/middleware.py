@@ -5,6 +5,9 @@ import time
 
 from app.logging_config import logger
 
+# Retry-After (seconds) for 429s that did not set their own
+DEFAULT_RETRY_AFTER = 60
+
 
 class RequestLoggingMiddleware(BaseHTTPMiddleware):
     """Log all API requests"""
@@ -36,13 +39,17 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
 
 
 class RateLimitHeaderMiddleware(BaseHTTPMiddleware):
-    """Add rate limit headers to responses"""
+    """
+    Make sure every 429 response tells the client when to retry.
+    
+    Limits enforced through app.services.rate_limit already carry an
+    exact Retry-After; this only fills in a default for any other 429.
+    """
     
     async def dispatch(self, request: Request, call_next):
         response = await call_next(request)
         
-        # Add rate limit headers for 429 responses
-        if response.status_code == 429:
-            response.headers["Retry-After"] = "3600"  # 1 hour
+        if response.status_code == 429 and "retry-after" not in response.headers:
+            response.headers["Retry-After"] = str(DEFAULT_RETRY_AFTER)
         
         return response
@@ -16,6 +16,7 @@ from app.models.between_the_lines import (
 from app.models.moderation import Block, Report
 from app.models.embedding import ChapterEmbedding, UserTasteProfile
 from app.models.notification import Notification, NotificationType
+from app.models.read_cursor import ReadCursor
 
 __all__ = [
     "User",
@@ -43,4 +44,5 @@ __all__ = [
     "UserTasteProfile",
     "Notification",
     "NotificationType",
+    "ReadCursor",
 ]
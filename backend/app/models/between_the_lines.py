@@ -37,6 +37,10 @@ class BetweenTheLinesThread(Base):
     # Thread status
     status = Column(Enum(BTLThreadStatus), default=BTLThreadStatus.OPEN, nullable=False)
     
+    # Read marks - the other participant's messages after these are unread
+    participant1_last_read_at = Column(DateTime(timezone=True), nullable=True)
+    participant2_last_read_at = Column(DateTime(timezone=True), nullable=True)
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
     closed_at = Column(DateTime(timezone=True), nullable=True)
@@ -84,7 +88,8 @@ class BetweenTheLinesMessage(Base):
     """Between the Lines message - chat message in a thread"""
     __tablename__ = "btl_messages"
     __table_args__ = (
-        Index("ix_btl_messages_thread_id", "thread_id"),
+        # Message pages and last-message lookups seek on (thread_id, created_at)
+        Index("ix_btl_messages_thread_id_created_at", "thread_id", "created_at"),
         Index("ix_btl_messages_sender_id", "sender_id"),
     )
 
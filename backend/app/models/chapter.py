@@ -1,10 +1,12 @@
 """Chapter and ChapterBlock models"""
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, JSON, Index, event, update
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.dialects.postgresql import TSVECTOR
 import enum
 
 from app.database import Base
+from app.models.user import User
 
 
 class BlockType(str, enum.Enum):
@@ -19,6 +21,12 @@ class BlockType(str, enum.Enum):
 class Chapter(Base):
     """Chapter model - a published post"""
     __tablename__ = "chapters"
+    __table_args__ = (
+        Index("ix_chapters_author_id_published_at", "author_id", "published_at"),
+        # Keyset pagination seeks on (published_at, id)
+        Index("ix_chapters_published_at_id", "published_at", "id"),
+        Index("ix_chapters_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     author_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -36,6 +44,10 @@ class Chapter(Base):
     heart_count = Column(Integer, default=0, nullable=False)
     theme_count = Column(Integer, default=0, nullable=False)
     
+    # Full-text search document, maintained by services/search_index.py
+    # (deferred - only search queries need it)
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
+    
     # Publishing and editing
     published_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
     edit_window_expires = Column(DateTime(timezone=True), nullable=False)
@@ -86,3 +98,21 @@ class ChapterBlock(Base):
     
     def __repr__(self):
         return f"<ChapterBlock(id={self.id}, chapter_id={self.chapter_id}, type={self.block_type}, position={self.position})>"
+
+
+def _adjust_published_count(connection, author_id: int, delta: int) -> None:
+    connection.execute(
+        update(User.__table__)
+        .where(User.__table__.c.id == author_id)
+        .values(published_chapter_count=User.__table__.c.published_chapter_count + delta)
+    )
+
+
+@event.listens_for(Chapter, "after_insert")
+def _chapter_published(mapper, connection, target):
+    _adjust_published_count(connection, target.author_id, 1)
+
+
+@event.listens_for(Chapter, "after_delete")
+def _chapter_deleted(mapper, connection, target):
+    _adjust_published_count(connection, target.author_id, -1)
@@ -1,6 +1,6 @@
 """Embedding models - ChapterEmbedding and UserTasteProfile"""
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from pgvector.sqlalchemy import Vector
 
@@ -12,6 +12,14 @@ class ChapterEmbedding(Base):
     __tablename__ = "chapter_embeddings"
     __table_args__ = (
         Index("ix_chapter_embeddings_chapter_id", "chapter_id"),
+        # ANN index for cosine distance (build parameters from migration 011)
+        Index(
+            "ix_chapter_embeddings_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+            postgresql_with={"m": 24, "ef_construction": 128}
+        ),
     )
 
     id = Column(Integer, primary_key=True, index=True)
@@ -20,6 +28,9 @@ class ChapterEmbedding(Base):
     # Embedding vector (OpenAI text-embedding-3-small produces 1536 dimensions)
     embedding = Column(Vector(1536), nullable=False)
     
+    # SHA-256 of the text the vector was computed from - unchanged text is not re-embedded
+    content_hash = Column(String(64), nullable=True)
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
     updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
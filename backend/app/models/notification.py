@@ -1,5 +1,5 @@
 """Notification model - rare, human, meaningful"""
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum as SQLEnum, Index
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum as SQLEnum, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import enum
@@ -29,11 +29,19 @@ class Notification(Base):
     __tablename__ = "notifications"
     __table_args__ = (
         Index("ix_notifications_user_id_created_at", "user_id", "created_at"),
+        Index(
+            "ix_notifications_user_id_created_at_unread", "user_id", "created_at",
+            postgresql_where=text("NOT read")
+        ),
     )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
-    type = Column(SQLEnum(NotificationType), nullable=False)
+    # Stored by value, matching the notificationtype enum in migration 005
+    type = Column(
+        SQLEnum(NotificationType, values_callable=lambda types: [t.value for t in types]),
+        nullable=False
+    )
     
     # Human-readable message (pre-formatted)
     message = Column(Text, nullable=False)
@@ -46,7 +54,7 @@ class Notification(Base):
     actor_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)  # Who triggered it
     
     # State
-    read = Column(Boolean, default=False, nullable=False, index=True)
+    read = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
     
     # Relationships
@@ -0,0 +1,33 @@
+"""Read cursor model - how far a reader has read into a followed Book"""
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint, Index
+
+from app.database import Base
+
+
+class ReadCursor(Base):
+    """
+    Per-(reader, book) read cursor.
+
+    Chapters published after last_read_at count as unread on the
+    reader's bookshelf spines.
+    """
+    __tablename__ = "read_cursors"
+    __table_args__ = (
+        UniqueConstraint("reader_id", "book_id", name="uq_read_cursor_reader_book"),
+        Index("ix_read_cursors_reader_id", "reader_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    reader_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    book_id = Column(Integer, ForeignKey("books.id", ondelete="CASCADE"), nullable=False)
+
+    # Everything published up to this moment has been read
+    last_read_at = Column(DateTime(timezone=True), nullable=False)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
+
+    def __repr__(self):
+        return f"<ReadCursor(reader_id={self.reader_id}, book_id={self.book_id}, last_read_at={self.last_read_at})>"
@@ -26,6 +26,12 @@ class User(Base):
     # Quiet Mode - respects user's need for uninterrupted space
     quiet_mode = Column(Boolean, default=False, nullable=False)
     
+    # Unread notifications badge, kept in step by notification_service
+    unread_notification_count = Column(Integer, default=0, nullable=False)
+    
+    # Chapters published, kept in step by Chapter insert/delete events
+    published_chapter_count = Column(Integer, default=0, nullable=False)
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
     updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
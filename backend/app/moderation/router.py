@@ -8,6 +8,8 @@ from app.database import get_db
 from app.models import User, Block, Report, Follow, Book, Chapter, Margin
 from app.auth.security import get_current_user
 from app.moderation.schemas import BlockResponse, ReportCreate, ReportResponse
+from app.services.feed import rebuild_feed
+from app.services.follow_graph import invalidate_pair
 
 router = APIRouter(prefix="/moderation", tags=["Moderation"])
 
@@ -72,6 +74,11 @@ async def block_user(
     
     db.commit()
     db.refresh(block)
+    invalidate_pair(current_user.id, user_id)
+    
+    # Follows were removed both ways - rebuild both feeds
+    rebuild_feed(db, current_user.id)
+    rebuild_feed(db, user_id)
     
     return block
 
@@ -96,6 +103,7 @@ async def unblock_user(
     
     db.delete(block)
     db.commit()
+    invalidate_pair(current_user.id, user_id)
     
     return None
 
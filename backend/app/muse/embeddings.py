@@ -1,15 +1,22 @@
 """Muse embeddings service - OpenAI embeddings for taste and recommendations"""
-from openai import OpenAI
-from typing import List, Optional
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple
 import numpy as np
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from datetime import datetime, timezone, timedelta
 
 from app.config import settings
 from app.models import Chapter, ChapterEmbedding, UserTasteProfile, User
+from app.services import quiet_picks
+from app.muse.providers import Muse, create_provider, get_muse
 
-# Initialize OpenAI client
-client = OpenAI(api_key=settings.openai_api_key)
+# Per-input limit of the embedding model
+MAX_INPUT_TOKENS = 8191
+
+# Pessimistic characters-per-token ratio used for batching and truncation
+CHARS_PER_TOKEN = 3
 
 
 def extract_chapter_text(chapter: Chapter) -> str:
@@ -39,44 +46,153 @@ def extract_chapter_text(chapter: Chapter) -> str:
     return "\n\n".join(parts)
 
 
-async def generate_chapter_embedding(chapter: Chapter, db: Session) -> List[float]:
+async def embed_text(text: str) -> List[float]:
     """
-    Generate embedding for a chapter using OpenAI text-embedding-3-small.
+    Embed a piece of text from a request handler (search queries,
+    onboarding preferences).
     
-    Args:
-        chapter: Chapter to generate embedding for
-        db: Database session
+    Raises:
+        MuseUnavailableError: If the provider fails or times out
     
     Returns:
         Embedding vector (1536 dimensions)
     """
+    return (await get_muse().embed([text]))[0]
+
+
+def embed_texts(texts: List[str]) -> List[List[float]]:
+    """
+    Embed several texts with one API request, from the job worker.
+    
+    Each call runs on a short-lived loop with its own provider. Jobs run
+    inline (JOBS_RUN_INLINE) execute inside a request's running loop,
+    where a second loop cannot start, so the call then waits on a
+    worker thread instead.
+    
+    Returns:
+        One embedding vector per input, in input order
+    """
+    async def run() -> List[List[float]]:
+        muse = Muse(create_provider())
+        try:
+            return await muse.embed(texts)
+        finally:
+            await muse.aclose()
+    
     try:
-        # Extract text
-        text = extract_chapter_text(chapter)
-        
-        # Generate embedding
-        response = client.embeddings.create(
-            model="text-embedding-3-small",
-            input=text
-        )
-        
-        embedding = response.data[0].embedding
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(run())
+    
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed") as pool:
+        return pool.submit(lambda: asyncio.run(run())).result()
+
+
+def content_hash(text: str) -> str:
+    """Hash of the text a chapter embedding was computed from"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _estimate_tokens(text: str) -> int:
+    """Conservative token estimate (no tokenizer dependency)"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _batches(items: List[Tuple[int, str, str]]) -> Iterator[List[Tuple[int, str, str]]]:
+    """Group (chapter_id, text, hash) items into requests under the API limits"""
+    batch, batch_tokens = [], 0
+    for item in items:
+        tokens = _estimate_tokens(item[1])
+        if batch and (
+            batch_tokens + tokens > settings.embedding_batch_max_tokens
+            or len(batch) >= settings.embedding_batch_max_inputs
+        ):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(item)
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+
+def embed_chapters(db: Session, chapter_ids: List[int]) -> int:
+    """
+    Embed chapters in as few API requests as possible.
+    
+    Chapters whose text hash matches their stored embedding are skipped,
+    so re-queueing an unchanged chapter costs nothing. Commits after
+    each request, so a failure only loses the batch in flight. Once a
+    batch is committed its chapters are Quiet Picks candidates, so the
+    authors' followers' cached picks are dropped.
+    
+    Args:
+        db: Database session
+        chapter_ids: Chapters to (re-)embed; deleted ones are ignored
+    
+    Returns:
+        Number of chapters embedded
+    """
+    if not chapter_ids:
+        return 0
+    
+    chapters = db.query(Chapter).filter(
+        Chapter.id.in_(chapter_ids)
+    ).options(selectinload(Chapter.blocks)).order_by(Chapter.id).all()
+    
+    existing = {
+        row.chapter_id: row
+        for row in db.query(ChapterEmbedding).filter(
+            ChapterEmbedding.chapter_id.in_(chapter_ids)
+        ).all()
+    }
+    
+    author_of = {chapter.id: chapter.author_id for chapter in chapters}
+    pending = []
+    for chapter in chapters:
+        # Over-long chapters are truncated to the model's input limit
+        text = extract_chapter_text(chapter)[:MAX_INPUT_TOKENS * CHARS_PER_TOKEN]
+        text_hash = content_hash(text)
+        current = existing.get(chapter.id)
+        if current is not None and current.content_hash == text_hash:
+            continue
+        pending.append((chapter.id, text, text_hash))
+    
+    embedded = 0
+    for batch in _batches(pending):
+        vectors = embed_texts([text for _, text, _ in batch])
         
-        # Store in database
-        chapter_embedding = ChapterEmbedding(
-            chapter_id=chapter.id,
-            embedding=embedding
-        )
-        db.add(chapter_embedding)
+        for (chapter_id, _, text_hash), vector in zip(batch, vectors):
+            row = existing.get(chapter_id)
+            if row:
+                row.embedding = vector
+                row.content_hash = text_hash
+            else:
+                db.add(ChapterEmbedding(
+                    chapter_id=chapter_id,
+                    embedding=vector,
+                    content_hash=text_hash
+                ))
         db.commit()
-        
-        return embedding
+        quiet_picks.invalidate_followers_quiet_picks(
+            db, list({author_of[chapter_id] for chapter_id, _, _ in batch})
+        )
+        embedded += len(batch)
+    
+    return embedded
+
+
+def generate_chapter_embedding(chapter: Chapter, db: Session) -> None:
+    """
+    Embed a single chapter if its text changed.
     
-    except Exception as e:
-        # Log error but don't fail the request
-        print(f"⚠️  Failed to generate embedding for chapter {chapter.id}: {e}")
-        # Return None or empty list to indicate failure
-        return []
+    Chapters are normally embedded in batches by the job worker
+    (see services/embedding_queue.py); errors propagate so jobs retry.
+    
+    Args:
+        chapter: Chapter to generate embedding for
+        db: Database session
+    """
+    embed_chapters(db, [chapter.id])
 
 
 async def initialize_taste_profile(user: User, preferences: str, db: Session) -> List[float]:
@@ -92,12 +208,7 @@ async def initialize_taste_profile(user: User, preferences: str, db: Session) ->
         Taste embedding vector
     """
     # Generate embedding from preferences
-    response = client.embeddings.create(
-        model="text-embedding-3-small",
-        input=preferences
-    )
-    
-    embedding = response.data[0].embedding
+    embedding = await embed_text(preferences)
     
     # Create or update taste profile
     profile = db.query(UserTasteProfile).filter(
@@ -115,11 +226,12 @@ async def initialize_taste_profile(user: User, preferences: str, db: Session) ->
         db.add(profile)
     
     db.commit()
+    quiet_picks.invalidate_quiet_picks(user.id)
     
     return embedding
 
 
-async def update_taste_profile(
+def update_taste_profile(
     user: User,
     chapter: Chapter,
     interaction_type: str,
@@ -163,7 +275,7 @@ async def update_taste_profile(
     
     if not chapter_embedding:
         # Generate embedding if not exists
-        await generate_chapter_embedding(chapter, db)
+        generate_chapter_embedding(chapter, db)
         chapter_embedding = db.query(ChapterEmbedding).filter(
             ChapterEmbedding.chapter_id == chapter.id
         ).first()
@@ -185,6 +297,7 @@ async def update_taste_profile(
     profile.embedding = new_taste.tolist()
     profile.updated_at = datetime.now(timezone.utc)
     db.commit()
+    quiet_picks.invalidate_quiet_picks(user.id)
 
 
 def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
@@ -215,11 +328,13 @@ async def get_quiet_picks(user: User, db: Session) -> List[Chapter]:
     Get personalized chapter recommendations (Quiet Picks).
     
     Algorithm:
-    1. Get chapters from followed books (last 7 days, unread)
-    2. Calculate cosine similarity with user taste
-    3. Return top 5 by similarity (max 2 per book for diversity)
+    1. Candidates: chapters from followed books (last 7 days)
+    2. Rank by cosine distance to the user's taste, in the database
+    3. Return top 5 (max 2 per book for diversity)
     4. Taste-based, not popularity-based
     
+    See services/quiet_picks.py for the query and caching.
+    
     Args:
         user: User to get recommendations for
         db: Database session
@@ -227,71 +342,7 @@ async def get_quiet_picks(user: User, db: Session) -> List[Chapter]:
     Returns:
         List of recommended chapters
     """
-    from app.models import Follow, Book
-    
-    # Get user's taste profile
-    profile = db.query(UserTasteProfile).filter(
-        UserTasteProfile.user_id == user.id
-    ).first()
-    
-    if not profile:
-        return []
-    
-    # Get followed user IDs
-    followed_user_ids = db.query(Follow.followed_id).filter(
-        Follow.follower_id == user.id
-    ).all()
-    followed_user_ids = [uid[0] for uid in followed_user_ids]
-    
-    if not followed_user_ids:
-        return []
-    
-    # Get chapters from last 7 days
-    seven_days_ago = datetime.now(timezone.utc) - timedelta(days=7)
-    
-    chapters = db.query(Chapter).filter(
-        Chapter.author_id.in_(followed_user_ids),
-        Chapter.published_at >= seven_days_ago
-    ).all()
-    
-    if not chapters:
-        return []
-    
-    # Calculate similarity for each chapter
-    chapter_scores = []
-    
-    for chapter in chapters:
-        # Get chapter embedding
-        embedding = db.query(ChapterEmbedding).filter(
-            ChapterEmbedding.chapter_id == chapter.id
-        ).first()
-        
-        if not embedding:
-            continue
-        
-        # Calculate similarity
-        similarity = cosine_similarity(profile.embedding, embedding.embedding)
-        
-        chapter_scores.append((chapter, similarity))
-    
-    # Sort by similarity (descending)
-    chapter_scores.sort(key=lambda x: x[1], reverse=True)
-    
-    # Apply diversity constraint (max 2 per book)
-    author_counts = {}
-    picks = []
-    
-    for chapter, score in chapter_scores:
-        author_id = chapter.author_id
-        
-        if author_counts.get(author_id, 0) < 2:
-            picks.append(chapter)
-            author_counts[author_id] = author_counts.get(author_id, 0) + 1
-        
-        if len(picks) >= 5:
-            break
-    
-    return picks
+    return quiet_picks.get_quiet_picks(db, user.id)
 
 
 def calculate_resonance(user1: User, user2: User, db: Session) -> float:
@@ -0,0 +1,319 @@
+"""
+Muse model providers - async completions and embeddings
+
+All Muse calls from request handlers go through a MuseProvider so
+they never block the event loop:
+
+- a process-wide semaphore caps concurrent model calls
+- every call has a timeout
+- a circuit breaker fails fast while the backend keeps failing
+
+The backend is pluggable: "openai" talks to OpenAI with AsyncOpenAI,
+"fake" returns deterministic local output for tests and benchmarks
+(set MUSE_PROVIDER=fake).
+"""
+import asyncio
+import hashlib
+import math
+import time
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, List, Optional
+
+from app.config import settings
+from app.logging_config import logger
+
+# Embedding dimensions shared by every provider (matches Vector(1536))
+EMBEDDING_DIMENSIONS = 1536
+
+
+class MuseUnavailableError(Exception):
+    """Muse backend timed out, failed, or is cooling down after failures"""
+
+
+class MuseProvider(ABC):
+    """Backend interface for Muse model calls"""
+
+    @abstractmethod
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """Chat completion - returns the assistant message text"""
+
+    @abstractmethod
+    def stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> AsyncIterator[str]:
+        """Chat completion as an async iterator of text deltas"""
+
+    @abstractmethod
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts - one vector per input, in input order"""
+
+    async def aclose(self) -> None:
+        """Release network resources"""
+
+
+class OpenAIProvider(MuseProvider):
+    """OpenAI backend (AsyncOpenAI)"""
+
+    def __init__(self):
+        from openai import AsyncOpenAI
+
+        # Retries are left to callers; the timeout is enforced per call below
+        self.client = AsyncOpenAI(api_key=settings.openai_api_key, max_retries=0)
+
+    async def complete(self, messages, temperature, max_tokens):
+        response = await self.client.chat.completions.create(
+            model=settings.muse_chat_model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        return response.choices[0].message.content
+
+    async def stream(self, messages, temperature, max_tokens):
+        response = await self.client.chat.completions.create(
+            model=settings.muse_chat_model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+        try:
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await response.close()
+
+    async def embed(self, texts):
+        response = await self.client.embeddings.create(
+            model=settings.muse_embedding_model,
+            input=texts
+        )
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    async def aclose(self):
+        await self.client.close()
+
+
+class FakeProvider(MuseProvider):
+    """
+    Deterministic local backend for tests and benchmarks.
+
+    Completions echo a numbered list derived from the prompt; embeddings
+    are unit vectors seeded from a hash of the text, so equal texts get
+    equal vectors. `latency` simulates model time without blocking.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    async def complete(self, messages, temperature, max_tokens):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        prompt = messages[-1]["content"]
+        words = prompt.split()[:max(1, max_tokens // 10)]
+        return "\n".join(f"{i}. {' '.join(words[:i + 2])}" for i in range(1, 6))
+
+    async def stream(self, messages, temperature, max_tokens):
+        content = await self.complete(messages, temperature, max_tokens)
+        for i, token in enumerate(content.split(" ")):
+            if self.latency:
+                await asyncio.sleep(self.latency / 10)
+            yield token if i == 0 else " " + token
+
+    async def embed(self, texts):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    @staticmethod
+    def _vector(text: str) -> List[float]:
+        seed = hashlib.sha256(text.encode("utf-8")).digest()
+        raw = [seed[i % len(seed)] - 127.5 + i % 7 for i in range(EMBEDDING_DIMENSIONS)]
+        norm = math.sqrt(sum(x * x for x in raw))
+        return [x / norm for x in raw]
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After `threshold` failures in a row the circuit opens and calls fail
+    immediately for `reset_after` seconds; then one trial call is let
+    through (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, threshold: int, reset_after: float):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            # Half-open: let this call through as the trial
+            self.opened_at = time.monotonic()
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.threshold:
+            if self.opened_at is None:
+                logger.warning(f"Muse circuit opened after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()
+
+
+class Muse:
+    """A provider wrapped with the concurrency limit, timeout and breaker"""
+
+    def __init__(self, provider: MuseProvider):
+        self.provider = provider
+        self.semaphore = asyncio.Semaphore(settings.muse_max_concurrency)
+        self.breaker = CircuitBreaker(settings.muse_breaker_threshold, settings.muse_breaker_reset_seconds)
+
+    async def _call(self, name: str, coro_factory, timeout: float):
+        if not self.breaker.allow():
+            raise MuseUnavailableError("Muse is cooling down after repeated failures")
+
+        async with self.semaphore:
+            try:
+                result = await asyncio.wait_for(coro_factory(), timeout=timeout)
+            except asyncio.TimeoutError:
+                self.breaker.record_failure()
+                logger.warning(f"Muse {name} timed out after {timeout}s")
+                raise MuseUnavailableError(f"Muse {name} timed out")
+            except Exception as e:
+                self.breaker.record_failure()
+                logger.error(f"Muse {name} failed: {e}")
+                raise MuseUnavailableError(f"Muse {name} failed") from e
+
+        self.breaker.record_success()
+        return result
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        timeout: Optional[float] = None
+    ) -> str:
+        """
+        Chat completion through the provider.
+
+        Raises:
+            MuseUnavailableError: On timeout, backend error or open circuit
+        """
+        return await self._call(
+            "completion",
+            lambda: self.provider.complete(messages, temperature, max_tokens),
+            timeout or settings.muse_timeout
+        )
+
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """
+        Streaming chat completion through the provider.
+
+        The concurrency slot is held until the stream ends. The timeout
+        applies to each wait for the next delta (including the first),
+        not to the whole stream.
+
+        Raises:
+            MuseUnavailableError: On timeout, backend error or open circuit
+        """
+        if not self.breaker.allow():
+            raise MuseUnavailableError("Muse is cooling down after repeated failures")
+
+        timeout = timeout or settings.muse_timeout
+        async with self.semaphore:
+            deltas = self.provider.stream(messages, temperature, max_tokens)
+            try:
+                while True:
+                    try:
+                        delta = await asyncio.wait_for(deltas.__anext__(), timeout=timeout)
+                    except StopAsyncIteration:
+                        break
+                    yield delta
+            except asyncio.TimeoutError:
+                self.breaker.record_failure()
+                logger.warning(f"Muse stream stalled for {timeout}s")
+                raise MuseUnavailableError("Muse stream timed out")
+            except Exception as e:
+                self.breaker.record_failure()
+                logger.error(f"Muse stream failed: {e}")
+                raise MuseUnavailableError("Muse stream failed") from e
+            finally:
+                await deltas.aclose()
+
+        self.breaker.record_success()
+
+    async def embed(self, texts: List[str], timeout: Optional[float] = None) -> List[List[float]]:
+        """
+        Embed texts through the provider.
+
+        Raises:
+            MuseUnavailableError: On timeout, backend error or open circuit
+        """
+        return await self._call(
+            "embedding",
+            lambda: self.provider.embed(texts),
+            timeout or settings.muse_timeout
+        )
+
+    async def aclose(self) -> None:
+        await self.provider.aclose()
+
+
+def create_provider(name: Optional[str] = None) -> MuseProvider:
+    """Build the provider named by MUSE_PROVIDER (or `name`)"""
+    name = name or settings.muse_provider
+    if name == "openai":
+        return OpenAIProvider()
+    if name == "fake":
+        return FakeProvider()
+    raise ValueError(f"Unknown Muse provider: {name}")
+
+
+_muse: Optional[Muse] = None
+
+
+def get_muse() -> Muse:
+    """The process-wide Muse used by request handlers"""
+    global _muse
+    if _muse is None:
+        _muse = Muse(create_provider())
+    return _muse
+
+
+async def close_muse() -> None:
+    """Close the process-wide provider on shutdown"""
+    global _muse
+    if _muse is not None:
+        await _muse.aclose()
+        _muse = None
+
+
+def set_muse_provider(provider: MuseProvider) -> None:
+    """Swap the backend, e.g. for a FakeProvider in tests or benchmarks"""
+    global _muse
+    _muse = Muse(provider)
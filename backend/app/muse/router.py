@@ -1,7 +1,8 @@
 """Muse AI routes - Writing assistant"""
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import AsyncIterator, Callable, List
 
 from app.database import get_db
 from app.models import User
@@ -13,18 +14,54 @@ from app.muse.schemas import (
 )
 from app.muse.service import (
     generate_prompts, suggest_titles, rewrite_text,
+    stream_prompts, stream_titles, stream_rewrite,
+    parse_prompts, parse_titles,
     check_rate_limit
 )
 from app.muse.embeddings import (
     initialize_taste_profile, get_quiet_picks, calculate_resonance
 )
+from app.muse.providers import MuseUnavailableError
 from app.services.muse_progression import get_muse_info
+from app.services.rate_limit import rate_limit_exceeded
 from app.chapters.schemas import ChapterResponse
 from app.config import settings
+from app.sse import sse_event, SSE_HEADERS
 
 router = APIRouter(prefix="/muse", tags=["Muse AI"])
 
 
+def muse_unavailable() -> HTTPException:
+    """503 for when the model backend is slow, failing or cooling down"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Muse is resting for a moment. Please try again shortly."
+    )
+
+
+def muse_event_stream(deltas: AsyncIterator[str], finish: Callable[[str], dict]) -> StreamingResponse:
+    """
+    Forward model deltas to the client as Server-Sent Events.
+
+    Each delta is sent as `data: {"delta": ...}` as soon as it arrives.
+    The stream ends with an `event: done` message carrying `finish` of the
+    full text (the same body the buffered endpoint returns), or with an
+    `event: error` message if Muse fails part-way through.
+    """
+    async def events():
+        parts = []
+        try:
+            async for delta in deltas:
+                parts.append(delta)
+                yield sse_event({"delta": delta})
+        except MuseUnavailableError:
+            yield sse_event({"detail": muse_unavailable().detail}, event="error")
+            return
+        yield sse_event(finish("".join(parts)), event="done")
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 # ============================================================================
 # MUSE LEVEL INFO
 # ============================================================================
@@ -53,26 +90,61 @@ async def get_writing_prompts(
     Rate limit: 10 prompts per hour
     """
     # Check rate limit
-    if not check_rate_limit(
+    limit = check_rate_limit(
         current_user.id,
         "muse_prompts",
         settings.muse_prompt_rate_limit,
         3600  # 1 hour
-    ):
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail=f"Rate limit exceeded. Maximum {settings.muse_prompt_rate_limit} prompts per hour."
+    )
+    if not limit.allowed:
+        raise rate_limit_exceeded(
+            limit,
+            f"Rate limit exceeded. Maximum {settings.muse_prompt_rate_limit} prompts per hour."
         )
     
     # Generate prompts
-    prompts = await generate_prompts(
-        context=request.context,
-        notes=request.notes
-    )
+    try:
+        prompts = await generate_prompts(
+            context=request.context,
+            notes=request.notes
+        )
+    except MuseUnavailableError:
+        raise muse_unavailable()
     
     return PromptResponse(prompts=prompts)
 
 
+@router.post("/prompts/stream")
+async def stream_writing_prompts(
+    request: PromptRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream writing prompts as Server-Sent Events.
+    
+    Counts against the same limit as /muse/prompts (10 per hour).
+    The final `done` event carries the parsed PromptResponse.
+    """
+    # Check rate limit
+    limit = check_rate_limit(
+        current_user.id,
+        "muse_prompts",
+        settings.muse_prompt_rate_limit,
+        3600  # 1 hour
+    )
+    if not limit.allowed:
+        raise rate_limit_exceeded(
+            limit,
+            f"Rate limit exceeded. Maximum {settings.muse_prompt_rate_limit} prompts per hour."
+        )
+    
+    return muse_event_stream(
+        stream_prompts(context=request.context, notes=request.notes),
+        lambda text: PromptResponse(prompts=parse_prompts(text)).model_dump()
+    )
+
+
 # ============================================================================
 # TITLE SUGGESTIONS
 # ============================================================================
@@ -89,15 +161,35 @@ async def get_title_suggestions(
     No specific rate limit (uses general Muse operations limit)
     """
     # Generate titles
-    titles = await suggest_titles(
-        content=request.content,
-        mood=request.mood,
-        theme=request.theme
-    )
+    try:
+        titles = await suggest_titles(
+            content=request.content,
+            mood=request.mood,
+            theme=request.theme
+        )
+    except MuseUnavailableError:
+        raise muse_unavailable()
     
     return TitleSuggestionResponse(titles=titles)
 
 
+@router.post("/title-suggestions/stream")
+async def stream_title_suggestions(
+    request: TitleSuggestionRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream title suggestions as Server-Sent Events.
+    
+    The final `done` event carries the parsed TitleSuggestionResponse.
+    """
+    return muse_event_stream(
+        stream_titles(content=request.content, mood=request.mood, theme=request.theme),
+        lambda text: TitleSuggestionResponse(titles=parse_titles(text)).model_dump()
+    )
+
+
 # ============================================================================
 # TEXT REWRITING
 # ============================================================================
@@ -114,23 +206,27 @@ async def rewrite_text_endpoint(
     Rate limit: 15 rewrites per hour
     """
     # Check rate limit
-    if not check_rate_limit(
+    limit = check_rate_limit(
         current_user.id,
         "muse_rewrite",
         settings.muse_rewrite_rate_limit,
         3600  # 1 hour
-    ):
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail=f"Rate limit exceeded. Maximum {settings.muse_rewrite_rate_limit} rewrites per hour."
+    )
+    if not limit.allowed:
+        raise rate_limit_exceeded(
+            limit,
+            f"Rate limit exceeded. Maximum {settings.muse_rewrite_rate_limit} rewrites per hour."
         )
     
     # Rewrite text
-    rewritten = await rewrite_text(
-        text=request.text,
-        style=request.style,
-        preserve_voice=request.preserve_voice
-    )
+    try:
+        rewritten = await rewrite_text(
+            text=request.text,
+            style=request.style,
+            preserve_voice=request.preserve_voice
+        )
+    except MuseUnavailableError:
+        raise muse_unavailable()
     
     return RewriteResponse(
         original=request.text,
@@ -138,6 +234,41 @@ async def rewrite_text_endpoint(
     )
 
 
+@router.post("/rewrite/stream")
+async def stream_rewrite_endpoint(
+    request: RewriteRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream a rewrite as Server-Sent Events.
+    
+    Counts against the same limit as /muse/rewrite (15 per hour).
+    The final `done` event carries the RewriteResponse.
+    """
+    # Check rate limit
+    limit = check_rate_limit(
+        current_user.id,
+        "muse_rewrite",
+        settings.muse_rewrite_rate_limit,
+        3600  # 1 hour
+    )
+    if not limit.allowed:
+        raise rate_limit_exceeded(
+            limit,
+            f"Rate limit exceeded. Maximum {settings.muse_rewrite_rate_limit} rewrites per hour."
+        )
+    
+    return muse_event_stream(
+        stream_rewrite(
+            text=request.text,
+            style=request.style,
+            preserve_voice=request.preserve_voice
+        ),
+        lambda text: RewriteResponse(original=request.text, rewritten=text.strip()).model_dump()
+    )
+
+
 
 # ============================================================================
 # TASTE PROFILE & ONBOARDING
@@ -158,7 +289,10 @@ async def onboard_taste_profile(
     Returns:
         Success message
     """
-    await initialize_taste_profile(current_user, preferences, db)
+    try:
+        await initialize_taste_profile(current_user, preferences, db)
+    except MuseUnavailableError:
+        raise muse_unavailable()
     
     return {"message": "Taste profile initialized successfully"}
 
@@ -1,20 +1,16 @@
-"""Muse AI service - OpenAI integration"""
-from openai import OpenAI
-from typing import List, Optional
-import redis
+"""Muse AI service - writing help through the Muse provider layer"""
+from typing import AsyncIterator, List, Optional
 
-from app.config import settings
+from app.muse.providers import get_muse
+from app.services import rate_limit
 
-# Initialize OpenAI client
-client = OpenAI(api_key=settings.openai_api_key)
 
-# Redis client for rate limiting
-redis_client = redis.from_url(settings.redis_url)
-
-
-def check_rate_limit(user_id: int, operation: str, limit: int, window: int) -> bool:
+def check_rate_limit(user_id: int, operation: str, limit: int, window: int) -> rate_limit.RateLimitResult:
     """
-    Check if user has exceeded rate limit for an operation.
+    Count one Muse operation against the user's limit.
+    
+    Uses a sliding window, so a burst at the end of one hour and the
+    start of the next cannot double the allowance.
     
     Args:
         user_id: User ID
@@ -23,35 +19,15 @@ def check_rate_limit(user_id: int, operation: str, limit: int, window: int) -> b
         window: Time window in seconds
     
     Returns:
-        True if within limit, False if exceeded
+        RateLimitResult - check `.allowed`
     """
-    key = f"muse_rate_limit:{operation}:{user_id}"
-    count = redis_client.get(key)
-    
-    if count is None:
-        redis_client.setex(key, window, 1)
-        return True
-    
-    count = int(count)
-    if count >= limit:
-        return False
-    
-    redis_client.incr(key)
-    return True
+    return rate_limit.hit(operation, user_id, limit, window, rate_limit.SLIDING_WINDOW)
 
 
-async def generate_prompts(context: Optional[str] = None, notes: Optional[List[str]] = None) -> List[str]:
-    """
-    Generate writing prompts using GPT-4.
-    
-    Args:
-        context: Optional context about the user's writing
-        notes: Optional list of user's notes
-    
-    Returns:
-        List of writing prompts
-    """
-    # Build prompt
+# Each operation builds its model request once, so the buffered and
+# streaming variants send exactly the same prompt.
+
+def _prompts_request(context: Optional[str], notes: Optional[List[str]]) -> dict:
     system_prompt = """You are Muse, a thoughtful writing assistant for the Chapters platform. 
 Your role is to inspire writers with creative, meaningful prompts that encourage depth and introspection.
 Generate 5 unique writing prompts that are:
@@ -68,19 +44,18 @@ Generate 5 unique writing prompts that are:
     if notes:
         user_prompt += f"\n\nWriter's recent notes: {', '.join(notes[:3])}"
     
-    # Call OpenAI
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[
+    return {
+        "messages": [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
         ],
-        temperature=0.8,
-        max_tokens=500
-    )
-    
-    # Parse response
-    content = response.choices[0].message.content
+        "temperature": 0.8,
+        "max_tokens": 500
+    }
+
+
+def parse_prompts(content: str) -> List[str]:
+    """Split a completion into up to 5 clean prompts"""
     prompts = [line.strip() for line in content.split('\n') if line.strip() and not line.strip().startswith('#')]
     
     # Clean up numbered prompts
@@ -89,18 +64,7 @@ Generate 5 unique writing prompts that are:
     return prompts[:5]
 
 
-async def suggest_titles(content: str, mood: Optional[str] = None, theme: Optional[str] = None) -> List[str]:
-    """
-    Suggest titles for a draft using GPT-4.
-    
-    Args:
-        content: Draft content
-        mood: Optional mood
-        theme: Optional theme
-    
-    Returns:
-        List of title suggestions
-    """
+def _titles_request(content: str, mood: Optional[str], theme: Optional[str]) -> dict:
     system_prompt = """You are Muse, a thoughtful writing assistant. 
 Generate 5 compelling title suggestions that capture the essence of the content.
 Titles should be:
@@ -116,17 +80,18 @@ Titles should be:
     if theme:
         user_prompt += f"\nTheme: {theme}"
     
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[
+    return {
+        "messages": [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
         ],
-        temperature=0.7,
-        max_tokens=200
-    )
-    
-    content = response.choices[0].message.content
+        "temperature": 0.7,
+        "max_tokens": 200
+    }
+
+
+def parse_titles(content: str) -> List[str]:
+    """Split a completion into up to 5 clean titles"""
     titles = [line.strip() for line in content.split('\n') if line.strip() and not line.strip().startswith('#')]
     
     # Clean up numbered titles
@@ -137,18 +102,7 @@ Titles should be:
     return titles[:5]
 
 
-async def rewrite_text(text: str, style: Optional[str] = None, preserve_voice: bool = True) -> str:
-    """
-    Rewrite text using GPT-4 while preserving the author's voice.
-    
-    Args:
-        text: Original text
-        style: Optional style guidance (e.g., "more concise", "more poetic")
-        preserve_voice: Whether to preserve the author's voice
-    
-    Returns:
-        Rewritten text
-    """
+def _rewrite_request(text: str, style: Optional[str], preserve_voice: bool) -> dict:
     system_prompt = """You are Muse, a thoughtful writing assistant. 
 Your role is to help writers refine their work while preserving their unique voice.
 When rewriting:
@@ -166,14 +120,73 @@ Rewrite the text to improve clarity, flow, and impact."""
     if style:
         user_prompt += f"\n\nStyle guidance: {style}"
     
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[
+    return {
+        "messages": [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
         ],
-        temperature=0.7,
-        max_tokens=len(text.split()) * 2  # Allow up to 2x the original length
-    )
+        "temperature": 0.7,
+        "max_tokens": len(text.split()) * 2  # Allow up to 2x the original length
+    }
+
+
+async def generate_prompts(context: Optional[str] = None, notes: Optional[List[str]] = None) -> List[str]:
+    """
+    Generate writing prompts with the Muse chat model.
+    
+    Args:
+        context: Optional context about the user's writing
+        notes: Optional list of user's notes
+    
+    Returns:
+        List of writing prompts
+    """
+    content = await get_muse().complete(**_prompts_request(context, notes))
+    return parse_prompts(content)
+
+
+async def suggest_titles(content: str, mood: Optional[str] = None, theme: Optional[str] = None) -> List[str]:
+    """
+    Suggest titles for a draft with the Muse chat model.
+    
+    Args:
+        content: Draft content
+        mood: Optional mood
+        theme: Optional theme
     
-    return response.choices[0].message.content.strip()
+    Returns:
+        List of title suggestions
+    """
+    completion = await get_muse().complete(**_titles_request(content, mood, theme))
+    return parse_titles(completion)
+
+
+async def rewrite_text(text: str, style: Optional[str] = None, preserve_voice: bool = True) -> str:
+    """
+    Rewrite text with the Muse chat model while preserving the author's voice.
+    
+    Args:
+        text: Original text
+        style: Optional style guidance (e.g., "more concise", "more poetic")
+        preserve_voice: Whether to preserve the author's voice
+    
+    Returns:
+        Rewritten text
+    """
+    rewritten = await get_muse().complete(**_rewrite_request(text, style, preserve_voice))
+    return rewritten.strip()
+
+
+def stream_prompts(context: Optional[str] = None, notes: Optional[List[str]] = None) -> AsyncIterator[str]:
+    """Writing prompts as raw text deltas (parse the joined text with parse_prompts)"""
+    return get_muse().stream(**_prompts_request(context, notes))
+
+
+def stream_titles(content: str, mood: Optional[str] = None, theme: Optional[str] = None) -> AsyncIterator[str]:
+    """Title suggestions as raw text deltas (parse the joined text with parse_titles)"""
+    return get_muse().stream(**_titles_request(content, mood, theme))
+
+
+def stream_rewrite(text: str, style: Optional[str] = None, preserve_voice: bool = True) -> AsyncIterator[str]:
+    """Rewritten text as deltas, as the model produces them"""
+    return get_muse().stream(**_rewrite_request(text, style, preserve_voice))
@@ -1,13 +1,19 @@
 """Notification routes - Rare, human, meaningful"""
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import List, Optional
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models import User, Notification, NotificationType
-from app.auth.security import get_current_user
-from app.notifications.schemas import NotificationResponse, UnreadCountResponse
-from app.services.notification_service import mark_as_read, mark_all_as_read, get_unread_count
+from app.auth.principals import Principal
+from app.auth.security import get_current_user_async, get_read_db, get_current_principal, get_current_user_read
+from app.notifications.schemas import NotificationResponse, UnreadCountResponse, notification_response
+from app.services.notification_service import mark_as_read, mark_all_as_read
+from app.services.notification_stream import notification_events, publish_resume
+from app.sse import SSE_HEADERS
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
@@ -17,8 +23,8 @@ async def get_notifications(
     type: NotificationType = None,
     unread_only: bool = False,
     limit: int = 50,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get user's notifications.
@@ -28,7 +34,7 @@ async def get_notifications(
     - Human (contextual, not demanding)
     - Respectful (no guilt, no rush)
     """
-    query = db.query(Notification).filter(
+    query = select(Notification).where(
         Notification.user_id == current_user.id
     ).options(
         joinedload(Notification.actor),
@@ -36,52 +42,58 @@ async def get_notifications(
     )
     
     if type:
-        query = query.filter(Notification.type == type)
+        query = query.where(Notification.type == type)
     
     if unread_only:
-        query = query.filter(Notification.read == False)
+        query = query.where(Notification.read == False)
     
-    notifications = query.order_by(
-        Notification.created_at.desc()
-    ).limit(limit).all()
+    notifications = (await db.scalars(
+        query.order_by(Notification.created_at.desc()).limit(limit)
+    )).all()
     
-    return [
-        NotificationResponse(
-            id=n.id,
-            type=n.type,
-            message=n.message,
-            read=n.read,
-            created_at=n.created_at,
-            chapter_id=n.chapter_id,
-            chapter_title=n.chapter.title if n.chapter else None,
-            margin_id=n.margin_id,
-            btl_thread_id=n.btl_thread_id,
-            btl_invite_id=n.btl_invite_id,
-            actor_id=n.actor_id,
-            actor_username=n.actor.username if n.actor else None
-        )
-        for n in notifications
-    ]
+    return [notification_response(n) for n in notifications]
 
 
 @router.get("/unread-count", response_model=UnreadCountResponse)
 async def get_unread_notifications_count(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_read)
 ):
-    """Get count of unread notifications"""
-    count = get_unread_count(db, current_user.id)
-    return UnreadCountResponse(count=count)
+    """Get count of unread notifications (served from the cached user row)"""
+    return UnreadCountResponse(count=current_user.unread_notification_count)
+
+
+@router.get("/stream")
+async def stream_notifications(
+    last_event_id: Optional[int] = Header(None),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Receive notifications as they happen (Server-Sent Events).
+    
+    Replaces polling /unread-count:
+    - `event: unread` first, with the unread count
+    - `event: notification` for each new notification (SSE id = notification id)
+    - a comment line as heartbeat when nothing has happened for a while
+    
+    Reconnect with the Last-Event-ID header to receive anything missed.
+    Nothing is pushed during Quiet Mode; turning it off delivers what
+    arrived in the meantime.
+    """
+    return StreamingResponse(
+        notification_events(current_user.id, last_event_id),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
 
 
 @router.post("/{notification_id}/read")
 async def mark_notification_read(
     notification_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Mark a notification as read"""
-    success = mark_as_read(db, notification_id, current_user.id)
+    success = await db.run_sync(mark_as_read, notification_id, current_user.id)
     
     if not success:
         raise HTTPException(
@@ -95,19 +107,19 @@ async def mark_notification_read(
 @router.post("/mark-all-read")
 async def mark_all_notifications_read(
     type: NotificationType = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Mark all notifications as read (optionally filtered by type)"""
-    mark_all_as_read(db, current_user.id, type)
+    await db.run_sync(mark_all_as_read, current_user.id, type)
     return {"message": "All notifications marked as read"}
 
 
 @router.post("/quiet-mode")
 async def toggle_quiet_mode(
     enabled: bool,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     Toggle Quiet Mode.
@@ -120,7 +132,10 @@ async def toggle_quiet_mode(
     Copy: "Quiet Mode is on. Nothing will interrupt you."
     """
     current_user.quiet_mode = enabled
-    db.commit()
+    await db.commit()
+    
+    if not enabled:
+        publish_resume(current_user.id)
     
     return {
         "quiet_mode": enabled,
@@ -130,7 +145,7 @@ async def toggle_quiet_mode(
 
 @router.get("/quiet-mode")
 async def get_quiet_mode(
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_read)
 ):
     """Get current Quiet Mode status"""
     return {
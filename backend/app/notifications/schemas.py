@@ -3,7 +3,7 @@ from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional
 
-from app.models.notification import NotificationType
+from app.models.notification import Notification, NotificationType
 
 
 class NotificationResponse(BaseModel):
@@ -28,5 +28,23 @@ class NotificationResponse(BaseModel):
         from_attributes = True
 
 
+def notification_response(n: Notification) -> NotificationResponse:
+    """Build the response for a notification (needs actor and chapter loaded)"""
+    return NotificationResponse(
+        id=n.id,
+        type=n.type,
+        message=n.message,
+        read=n.read,
+        created_at=n.created_at,
+        chapter_id=n.chapter_id,
+        chapter_title=n.chapter.title if n.chapter else None,
+        margin_id=n.margin_id,
+        btl_thread_id=n.btl_thread_id,
+        btl_invite_id=n.btl_invite_id,
+        actor_id=n.actor_id,
+        actor_username=n.actor.username if n.actor else None
+    )
+
+
 class UnreadCountResponse(BaseModel):
     count: int
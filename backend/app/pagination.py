@@ -0,0 +1,105 @@
+"""Keyset (cursor) pagination helpers
+
+List endpoints ordered newest-first can page with an opaque cursor that
+encodes the (published_at, id) of the last item returned. The next page
+is everything strictly after that pair, so deep pages cost the same as
+the first one and no COUNT(*) is needed: fetch limit + 1 rows and the
+extra row tells us whether there is more. Relevance-ordered search
+results use a ranked cursor that leads with the rank.
+"""
+import base64
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+
+
+def _encode(*parts: str) -> str:
+    raw = "|".join(parts)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode(cursor: str, count: int) -> List[str]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+    parts = raw.split("|")
+    if len(parts) != count:
+        raise ValueError("Wrong number of cursor parts")
+    return parts
+
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor"
+    )
+
+
+def encode_cursor(published_at: datetime, id: int) -> str:
+    """Encode a (published_at, id) position as an opaque cursor"""
+    return _encode(published_at.isoformat(), str(id))
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode an opaque cursor back into (published_at, id).
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        published_at, id = _decode(cursor, 2)
+        return datetime.fromisoformat(published_at), int(id)
+    except (ValueError, UnicodeError):
+        raise _invalid_cursor()
+
+
+def encode_ranked_cursor(rank: float, published_at: datetime, id: int) -> str:
+    """Encode a (rank, published_at, id) position for relevance-ordered lists"""
+    return _encode(repr(rank), published_at.isoformat(), str(id))
+
+
+def decode_ranked_cursor(cursor: str) -> Tuple[float, datetime, int]:
+    """
+    Decode a ranked cursor back into (rank, published_at, id).
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        rank, published_at, id = _decode(cursor, 3)
+        return float(rank), datetime.fromisoformat(published_at), int(id)
+    except (ValueError, UnicodeError):
+        raise _invalid_cursor()
+
+
+def keyset_before(published_col, id_col, position: Tuple[datetime, int]):
+    """
+    Filter clause for rows that come after `position` in newest-first order.
+
+    Row-value comparison lets Postgres seek straight into an index on
+    (published_at, id) instead of scanning and discarding an OFFSET.
+    """
+    return tuple_(published_col, id_col) < tuple_(*position)
+
+
+def page_from_rows(
+    rows: List[Any],
+    limit: int,
+    key: Callable[[Any], Tuple[datetime, int]]
+) -> Tuple[List[Any], bool, Optional[str]]:
+    """
+    Trim a limit + 1 fetch down to one page.
+
+    Args:
+        rows: Up to limit + 1 rows in newest-first order
+        limit: Page size
+        key: Returns (published_at, id) for a row
+
+    Returns:
+        (page rows, has_more, next_cursor)
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(*key(rows[-1])) if has_more and rows else None
+    return rows, has_more, next_cursor
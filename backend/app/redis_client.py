@@ -0,0 +1,18 @@
+"""Shared Redis connection pool
+
+Every module talks to Redis through this one client, so a process holds
+a single bounded pool instead of one pool per module. When the pool is
+exhausted callers wait up to `redis_pool_timeout` for a free connection
+rather than opening more.
+"""
+import redis
+
+from app.config import settings
+
+pool = redis.BlockingConnectionPool.from_url(
+    settings.redis_url,
+    max_connections=settings.redis_max_connections,
+    timeout=settings.redis_pool_timeout
+)
+
+redis_client = redis.Redis(connection_pool=pool)
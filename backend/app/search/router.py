@@ -1,30 +1,57 @@
 """Search routes - Chapters and Themes"""
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, or_, and_
-from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy import select, func, and_, tuple_, cast, REAL
+from typing import Dict, List, Literal, Optional
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models import User, Chapter, Theme, Book, chapter_themes
-from app.auth.security import get_current_user
+from app.auth.principals import Principal
+from app.auth.security import get_current_user_async, get_read_db, get_current_principal
+from app.pagination import (
+    decode_cursor,
+    keyset_before,
+    page_from_rows,
+    encode_ranked_cursor,
+    decode_ranked_cursor
+)
+from app.services.search_index import to_query, get_headlines, refresh_search_document
+from app.services.semantic_search import semantic_ranking, hybrid_ranking
+from app.config import settings
+from app.muse.providers import MuseUnavailableError
 from app.search.schemas import (
     ThemeResponse,
     ChapterSearchResult,
     SearchResponse,
+    SemanticSearchResult,
+    SemanticSearchResponse,
     ThemeChaptersResponse
 )
 
 router = APIRouter(prefix="/search", tags=["Search"])
 
 
+async def _hydrate(db: AsyncSession, chapter_ids: List[int]) -> Dict[int, Chapter]:
+    """Load result chapters with authors, books and themes in one round of queries"""
+    if not chapter_ids:
+        return {}
+    
+    chapters = await db.scalars(select(Chapter).where(Chapter.id.in_(chapter_ids)).options(
+        joinedload(Chapter.author).joinedload(User.book),
+        selectinload(Chapter.themes)
+    ))
+    return {chapter.id: chapter for chapter in chapters}
+
+
 # ============================================================================
 # THEMES
 # ============================================================================
 
 @router.get("/themes", response_model=List[ThemeResponse])
 async def list_themes(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     List all curated themes with chapter counts.
@@ -33,12 +60,12 @@ async def list_themes(
     human experiences and emotions, not trending topics.
     """
     # Get themes with chapter counts
-    themes = db.query(
+    themes = (await db.execute(select(
         Theme,
         func.count(chapter_themes.c.chapter_id).label('chapter_count')
     ).outerjoin(
         chapter_themes, Theme.id == chapter_themes.c.theme_id
-    ).group_by(Theme.id).order_by(Theme.name).all()
+    ).group_by(Theme.id).order_by(Theme.name))).all()
     
     return [
         ThemeResponse(
@@ -58,17 +85,19 @@ async def get_theme_chapters(
     slug: str,
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=50),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get chapters for a theme.
     
     Shows "chapters where people lingered" - no metrics, no trending.
     Ordered by recency to show living, breathing work.
+    Pass `cursor` (from next_cursor) to page by keyset instead of page number.
     """
     # Get theme
-    theme = db.query(Theme).filter(Theme.slug == slug).first()
+    theme = await db.scalar(select(Theme).where(Theme.slug == slug))
     
     if not theme:
         raise HTTPException(
@@ -77,18 +106,30 @@ async def get_theme_chapters(
         )
     
     # Get chapters with this theme
-    query = db.query(Chapter).join(
+    query = select(Chapter).join(
         chapter_themes, Chapter.id == chapter_themes.c.chapter_id
-    ).filter(
+    ).where(
         chapter_themes.c.theme_id == theme.id
     ).options(
         joinedload(Chapter.author).joinedload(User.book),
-        joinedload(Chapter.themes)
-    ).order_by(Chapter.published_at.desc())
+        selectinload(Chapter.themes),
+        selectinload(Chapter.blocks)
+    ).order_by(Chapter.published_at.desc(), Chapter.id.desc())
+    
+    # Pagination (keyset when a cursor is given, offset otherwise)
+    if cursor:
+        query = query.where(keyset_before(Chapter.published_at, Chapter.id, decode_cursor(cursor)))
+    else:
+        query = query.offset((page - 1) * per_page)
+    
+    chapters, has_more, next_cursor = page_from_rows(
+        (await db.scalars(query.limit(per_page + 1))).all(), per_page, key=lambda c: (c.published_at, c.id)
+    )
     
-    # Pagination
-    total = query.count()
-    chapters = query.offset((page - 1) * per_page).limit(per_page).all()
+    # Theme size straight from the association table - no chapter join
+    chapter_count = await db.scalar(select(func.count()).select_from(chapter_themes).where(
+        chapter_themes.c.theme_id == theme.id
+    ))
     
     # Format results
     chapter_results = []
@@ -122,12 +163,13 @@ async def get_theme_chapters(
             slug=theme.slug,
             description=theme.description,
             emoji=theme.emoji,
-            chapter_count=total
+            chapter_count=chapter_count
         ),
         chapters=chapter_results,
         page=page,
         per_page=per_page,
-        has_more=total > page * per_page
+        has_more=has_more,
+        next_cursor=next_cursor
     )
 
 
@@ -140,65 +182,60 @@ async def search_chapters(
     q: str = Query(..., min_length=2, max_length=100),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=50),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
-    Search for chapters by title, mood, or content.
+    Search for chapters by title, mood, themes, or content.
     
     Philosophy: "People don't search for people. They search for ideas,
     moods, and themes." Results show chapters first, not profiles.
     
-    No popularity sorting - just relevance and recency.
+    No popularity sorting - just relevance and recency. Matches use the
+    chapter's full-text document (title, mood, themes, text and quote
+    blocks); excerpts highlight matches with <mark>.
+    Pass `cursor` (from next_cursor) to page by keyset; total is then omitted.
     """
-    search_term = f"%{q.lower()}%"
-    
-    # Search in:
-    # 1. Chapter titles
-    # 2. Chapter moods
-    # 3. Chapter block content (text blocks only)
-    # 4. Theme names
-    
-    query = db.query(Chapter).distinct().outerjoin(
-        chapter_themes, Chapter.id == chapter_themes.c.chapter_id
-    ).outerjoin(
-        Theme, chapter_themes.c.theme_id == Theme.id
-    ).filter(
-        or_(
-            func.lower(Chapter.title).like(search_term),
-            func.lower(Chapter.mood).like(search_term),
-            func.lower(Theme.name).like(search_term)
+    tsquery = to_query(q)
+    rank = func.ts_rank(Chapter.search_vector, tsquery).label("rank")
+    match = Chapter.search_vector.op("@@")(tsquery)
+    
+    # Rank and page over ids only; the GIN index finds the matches
+    query = select(Chapter.id, rank, Chapter.published_at).where(
+        match
+    ).order_by(rank.desc(), Chapter.published_at.desc(), Chapter.id.desc())
+    
+    # Pagination (keyset when a cursor is given, offset otherwise)
+    if cursor:
+        total = None
+        after_rank, after_published_at, after_id = decode_ranked_cursor(cursor)
+        # ts_rank is float4 - compare at that precision so ties stay exact
+        query = query.where(
+            tuple_(func.ts_rank(Chapter.search_vector, tsquery), Chapter.published_at, Chapter.id)
+            < tuple_(cast(after_rank, REAL), after_published_at, after_id)
         )
-    ).options(
-        joinedload(Chapter.author).joinedload(User.book),
-        joinedload(Chapter.themes),
-        joinedload(Chapter.blocks)
-    ).order_by(Chapter.published_at.desc())
-    
-    # Pagination
-    total = query.count()
-    chapters = query.offset((page - 1) * per_page).limit(per_page).all()
+    else:
+        total = await db.scalar(select(func.count(Chapter.id)).where(match))
+        query = query.offset((page - 1) * per_page)
+    
+    rows = (await db.execute(query.limit(per_page + 1))).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    next_cursor = None
+    if has_more:
+        last_id, last_rank, last_published_at = rows[-1]
+        next_cursor = encode_ranked_cursor(last_rank, last_published_at, last_id)
+    
+    # Hydrate the page, then highlight excerpts for just these chapters
+    chapter_ids = [row[0] for row in rows]
+    by_id = await _hydrate(db, chapter_ids)
+    headlines = await db.run_sync(get_headlines, chapter_ids, q)
     
     # Format results
     chapter_results = []
-    for chapter in chapters:
-        # Get first text block for excerpt
-        excerpt = None
-        for block in chapter.blocks:
-            if block.block_type == 'text' and block.content.get('text'):
-                text = block.content['text']
-                # Try to find search term in text for context
-                text_lower = text.lower()
-                if q.lower() in text_lower:
-                    # Find position and extract context
-                    pos = text_lower.find(q.lower())
-                    start = max(0, pos - 100)
-                    end = min(len(text), pos + 100)
-                    excerpt = ('...' if start > 0 else '') + text[start:end] + ('...' if end < len(text) else '')
-                else:
-                    excerpt = text[:200] + '...' if len(text) > 200 else text
-                break
-        
+    for chapter_id in chapter_ids:
+        chapter = by_id[chapter_id]
         chapter_results.append(ChapterSearchResult(
             id=chapter.id,
             title=chapter.title,
@@ -209,7 +246,7 @@ async def search_chapters(
             author_id=chapter.author_id,
             author_username=chapter.author.username,
             author_book_id=chapter.author.book.id if chapter.author.book else 0,
-            excerpt=excerpt,
+            excerpt=headlines.get(chapter.id),
             themes=[t.name for t in chapter.themes]
         ))
     
@@ -219,10 +256,71 @@ async def search_chapters(
         total=total,
         page=page,
         per_page=per_page,
-        has_more=total > page * per_page
+        has_more=has_more,
+        next_cursor=next_cursor
     )
 
 
+@router.get("/semantic", response_model=SemanticSearchResponse)
+async def semantic_search(
+    q: str = Query(..., min_length=2, max_length=500),
+    k: int = Query(20, ge=1, le=settings.semantic_search_max_k),
+    mode: Literal["semantic", "hybrid"] = Query("semantic"),
+    ef_search: Optional[int] = Query(None, ge=1, le=1000, description="HNSW candidate list size (recall vs latency)"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Search chapters by meaning rather than words.
+    
+    The query is embedded once and matched against chapter embeddings
+    through the HNSW index. `hybrid` fuses that ranking with the
+    full-text ranking, so exact phrases still count.
+    """
+    from app.muse.embeddings import embed_text
+    
+    try:
+        embedding = await embed_text(q)
+    except MuseUnavailableError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Semantic search is temporarily unavailable"
+        )
+    
+    ef_search = ef_search or settings.hnsw_ef_search
+    if mode == "hybrid":
+        ranking = await db.run_sync(hybrid_ranking, q, embedding, k, ef_search)
+    else:
+        ranking = await db.run_sync(semantic_ranking, embedding, k, ef_search)
+    
+    # Hydrate the ranked chapters with one query
+    chapter_ids = [chapter_id for chapter_id, _ in ranking]
+    by_id = await _hydrate(db, chapter_ids)
+    headlines = await db.run_sync(get_headlines, chapter_ids, q)
+    
+    chapter_results = []
+    for chapter_id, score in ranking:
+        chapter = by_id.get(chapter_id)
+        if chapter is None:
+            continue
+        chapter_results.append(SemanticSearchResult(
+            id=chapter.id,
+            title=chapter.title,
+            mood=chapter.mood,
+            cover_url=chapter.cover_url,
+            heart_count=chapter.heart_count,
+            published_at=chapter.published_at,
+            author_id=chapter.author_id,
+            author_username=chapter.author.username,
+            author_book_id=chapter.author.book.id if chapter.author.book else 0,
+            excerpt=headlines.get(chapter.id),
+            themes=[t.name for t in chapter.themes],
+            score=score
+        ))
+    
+    return SemanticSearchResponse(query=q, mode=mode, chapters=chapter_results)
+
+
 # ============================================================================
 # MUSE THEME SUGGESTIONS
 # ============================================================================
@@ -230,8 +328,8 @@ async def search_chapters(
 @router.post("/suggest-themes/{chapter_id}")
 async def suggest_themes_for_chapter(
     chapter_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Muse suggests themes for a chapter (max 3).
@@ -239,10 +337,10 @@ async def suggest_themes_for_chapter(
     This is a placeholder for AI-powered theme suggestion.
     For now, returns empty list - implement with embeddings later.
     """
-    chapter = db.query(Chapter).filter(
+    chapter = await db.scalar(select(Chapter).where(
         Chapter.id == chapter_id,
         Chapter.author_id == current_user.id
-    ).first()
+    ))
     
     if not chapter:
         raise HTTPException(
@@ -263,8 +361,8 @@ async def suggest_themes_for_chapter(
 async def add_theme_to_chapter(
     chapter_id: int,
     theme_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Add a theme to a chapter (max 3 themes per chapter).
@@ -273,10 +371,10 @@ async def add_theme_to_chapter(
     Muse can suggest, but the author always chooses.
     """
     # Get chapter
-    chapter = db.query(Chapter).filter(
+    chapter = await db.scalar(select(Chapter).where(
         Chapter.id == chapter_id,
         Chapter.author_id == current_user.id
-    ).first()
+    ))
     
     if not chapter:
         raise HTTPException(
@@ -285,7 +383,7 @@ async def add_theme_to_chapter(
         )
     
     # Check theme exists
-    theme = db.query(Theme).filter(Theme.id == theme_id).first()
+    theme = await db.get(Theme, theme_id)
     
     if not theme:
         raise HTTPException(
@@ -294,9 +392,9 @@ async def add_theme_to_chapter(
         )
     
     # Check max 3 themes
-    current_theme_count = db.query(chapter_themes).filter(
+    current_theme_count = await db.scalar(select(func.count()).select_from(chapter_themes).where(
         chapter_themes.c.chapter_id == chapter_id
-    ).count()
+    ))
     
     if current_theme_count >= 3:
         raise HTTPException(
@@ -305,22 +403,23 @@ async def add_theme_to_chapter(
         )
     
     # Check if already added
-    existing = db.query(chapter_themes).filter(
+    existing = (await db.execute(select(chapter_themes).where(
         chapter_themes.c.chapter_id == chapter_id,
         chapter_themes.c.theme_id == theme_id
-    ).first()
+    ))).first()
     
     if existing:
         return {"message": "Theme already added"}
     
     # Add theme
-    db.execute(
+    await db.execute(
         chapter_themes.insert().values(
             chapter_id=chapter_id,
             theme_id=theme_id
         )
     )
-    db.commit()
+    await db.run_sync(refresh_search_document, chapter_id)
+    await db.commit()
     
     return {"message": f"Theme '{theme.name}' added to chapter"}
 
@@ -329,15 +428,15 @@ async def add_theme_to_chapter(
 async def remove_theme_from_chapter(
     chapter_id: int,
     theme_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Remove a theme from a chapter"""
     # Get chapter
-    chapter = db.query(Chapter).filter(
+    chapter = await db.scalar(select(Chapter).where(
         Chapter.id == chapter_id,
         Chapter.author_id == current_user.id
-    ).first()
+    ))
     
     if not chapter:
         raise HTTPException(
@@ -346,7 +445,7 @@ async def remove_theme_from_chapter(
         )
     
     # Remove theme
-    result = db.execute(
+    result = await db.execute(
         chapter_themes.delete().where(
             and_(
                 chapter_themes.c.chapter_id == chapter_id,
@@ -361,6 +460,7 @@ async def remove_theme_from_chapter(
             detail="Theme not found on this chapter"
         )
     
-    db.commit()
+    await db.run_sync(refresh_search_document, chapter_id)
+    await db.commit()
     
     return {"message": "Theme removed from chapter"}
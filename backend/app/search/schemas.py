@@ -1,6 +1,6 @@
 """Search schemas"""
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 
 
@@ -28,7 +28,7 @@ class ChapterSearchResult(BaseModel):
     author_id: int
     author_username: str
     author_book_id: int
-    excerpt: Optional[str] = None  # Text snippet for context
+    excerpt: Optional[str] = None  # Text snippet for context (search: matches wrapped in <mark>)
     themes: List[str] = []  # Theme names
     
     class Config:
@@ -39,10 +39,23 @@ class SearchResponse(BaseModel):
     """Search results"""
     query: str
     chapters: List[ChapterSearchResult]
-    total: int
+    total: Optional[int] = None  # Not counted in cursor mode
     page: int
     per_page: int
     has_more: bool
+    next_cursor: Optional[str] = None
+
+
+class SemanticSearchResult(ChapterSearchResult):
+    """Chapter in semantic search results"""
+    score: float  # Cosine similarity (semantic) or fused RRF score (hybrid)
+
+
+class SemanticSearchResponse(BaseModel):
+    """Semantic search results (top k, no paging)"""
+    query: str
+    mode: Literal["semantic", "hybrid"]
+    chapters: List[SemanticSearchResult]
 
 
 class ThemeChaptersResponse(BaseModel):
@@ -52,3 +65,4 @@ class ThemeChaptersResponse(BaseModel):
     page: int
     per_page: int
     has_more: bool
+    next_cursor: Optional[str] = None
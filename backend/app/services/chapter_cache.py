@@ -0,0 +1,118 @@
+"""
+Rendered chapter cache - the viewer-independent part of GET /chapters/{id}
+
+A chapter's body (metadata, blocks, author) only changes through an
+edit inside its 30-minute window, which bumps `updated_at`. Bodies are
+cached in Redis under chapter id + updated_at, so any change of the row
+moves readers to a fresh key; edits and deletes also drop the old entry
+straight away. Per-viewer fields (is_hearted, is_bookmarked) and the
+live heart_count are not cached - the router merges them in from one
+cheap query plus the chapter's unflushed heart delta.
+
+Hits and misses are counted in a Redis hash, shared by every process
+and exposed by GET /health/cache.
+"""
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import redis
+
+from app.chapters.schemas import ChapterBlockResponse
+from app.config import settings
+from app.logging_config import logger
+from app.models import Chapter
+from app.redis_client import redis_client
+
+STATS_KEY = "chapter_cache:stats"
+
+
+def chapter_body_key(chapter_id: int, updated_at: datetime) -> str:
+    """Redis key of one version of a chapter's rendered body"""
+    return f"chapter_body:{chapter_id}:{int(updated_at.timestamp() * 1_000_000)}"
+
+
+def render_body(chapter: Chapter) -> Dict[str, Any]:
+    """
+    The viewer-independent response fields, JSON-ready.
+
+    Needs blocks and author loaded.
+    """
+    return {
+        "id": chapter.id,
+        "author_id": chapter.author_id,
+        "title": chapter.title,
+        "cover_url": chapter.cover_url,
+        "mood": chapter.mood,
+        "theme": chapter.theme,
+        "time_period": chapter.time_period,
+        "published_at": chapter.published_at.isoformat(),
+        "edit_window_expires": chapter.edit_window_expires.isoformat(),
+        "blocks": [
+            ChapterBlockResponse.model_validate(block).model_dump(mode="json")
+            for block in chapter.blocks
+        ],
+        "author": {
+            "username": chapter.author.username,
+            "book_id": chapter.author.id
+        }
+    }
+
+
+def _count(field: str) -> None:
+    try:
+        redis_client.hincrby(STATS_KEY, field, 1)
+    except redis.RedisError:
+        pass
+
+
+def get_cached_body(chapter_id: int, updated_at: datetime) -> Optional[Dict[str, Any]]:
+    """The cached body for this version of the chapter (None on miss)"""
+    try:
+        raw = redis_client.get(chapter_body_key(chapter_id, updated_at))
+    except redis.RedisError as e:
+        logger.warning(f"Chapter cache read failed for chapter {chapter_id}: {e}")
+        return None
+
+    _count("hits" if raw is not None else "misses")
+    return json.loads(raw) if raw is not None else None
+
+
+def cache_body(chapter: Chapter) -> Dict[str, Any]:
+    """Render and store a chapter's body; returns it"""
+    body = render_body(chapter)
+    try:
+        redis_client.set(
+            chapter_body_key(chapter.id, chapter.updated_at),
+            json.dumps(body),
+            ex=settings.chapter_cache_ttl
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Chapter cache write failed for chapter {chapter.id}: {e}")
+    return body
+
+
+def invalidate_body(chapter_id: int, updated_at: datetime) -> None:
+    """Drop the cached body for this version (call before an edit or delete)"""
+    try:
+        redis_client.delete(chapter_body_key(chapter_id, updated_at))
+    except redis.RedisError as e:
+        logger.warning(f"Chapter cache invalidation failed for chapter {chapter_id}: {e}")
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters since the stats were last reset"""
+    try:
+        raw = redis_client.hgetall(STATS_KEY)
+    except redis.RedisError as e:
+        logger.warning(f"Chapter cache stats unavailable: {e}")
+        return {"hits": None, "misses": None, "hit_rate": None}
+
+    hits = int(raw.get(b"hits", 0))
+    misses = int(raw.get(b"misses", 0))
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 4) if total else None
+    }
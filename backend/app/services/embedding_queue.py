@@ -0,0 +1,55 @@
+"""
+Embedding queue - coalesces chapters waiting for (re-)embedding
+
+Publishing or editing a chapter adds its id to a Redis set and makes
+sure one flush job is scheduled. The flush job drains the set in
+batches, so a burst of publishes becomes a few multi-input embedding
+requests instead of one request per chapter.
+"""
+from typing import List
+import redis
+
+from app.config import settings
+from app.logging_config import logger
+from app.redis_client import redis_client
+
+
+PENDING_KEY = "embeddings:pending"
+FLUSH_SCHEDULED_KEY = "embeddings:flush_scheduled"
+
+
+def queue_chapter_embedding(chapter_id: int) -> None:
+    """
+    Mark a chapter for (re-)embedding.
+
+    Cheap to call on every edit - unchanged text is skipped at flush time.
+    """
+    from app.jobs import enqueue_in
+
+    try:
+        redis_client.sadd(PENDING_KEY, chapter_id)
+
+        # Only the first caller in a window schedules the flush; the flag
+        # is released if scheduling fails, and expires on its own in case
+        # the flush job is lost later
+        if redis_client.set(FLUSH_SCHEDULED_KEY, 1, nx=True, ex=settings.embedding_flush_delay * 10):
+            if not enqueue_in(settings.embedding_flush_delay, "app.jobs.tasks.flush_embeddings"):
+                clear_flush_scheduled()
+    except redis.RedisError as e:
+        logger.error(f"Failed to queue embedding for chapter {chapter_id}: {e}")
+
+
+def pop_pending(limit: int) -> List[int]:
+    """Take up to `limit` chapter ids off the pending set"""
+    return [int(cid) for cid in redis_client.spop(PENDING_KEY, limit) or []]
+
+
+def requeue(chapter_ids: List[int]) -> None:
+    """Put chapter ids back after a failed flush so the retry sees them"""
+    if chapter_ids:
+        redis_client.sadd(PENDING_KEY, *chapter_ids)
+
+
+def clear_flush_scheduled() -> None:
+    """Allow the next queued chapter to schedule a new flush"""
+    redis_client.delete(FLUSH_SCHEDULED_KEY)
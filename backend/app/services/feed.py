@@ -0,0 +1,254 @@
+"""
+New Chapters feed - materialized per-reader feeds in Redis
+
+Fan-out on write: when a chapter is published its id is pushed into a
+sorted set per follower (score = published_at), trimmed to the feed
+bound. Authors with very large follower counts are fanned out on read
+instead, so publishing stays flat no matter how many followers they have.
+
+Reads page through the sorted set and hydrate the page with one primary
+key lookup. If Redis is unavailable, the feed is served from Postgres.
+"""
+from datetime import datetime
+from typing import List, Optional, Tuple
+import redis
+from sqlalchemy.orm import Session
+from sqlalchemy import desc
+
+from app.config import settings
+from app.logging_config import logger
+from app.redis_client import redis_client
+from app.models import User, Chapter, Follow
+from app.pagination import keyset_before
+from app.services.quiet_picks import quiet_picks_key
+
+
+# Authors whose chapters are pulled at read time instead of pushed
+PULL_AUTHORS_KEY = "feed:pull_authors"
+
+
+def feed_key(reader_id: int) -> str:
+    """Redis key of a reader's materialized feed"""
+    return f"feed:{reader_id}"
+
+
+def empty_feed_key(reader_id: int) -> str:
+    """Redis key marking a reader's feed as rebuilt and found empty"""
+    return f"feed:{reader_id}:empty"
+
+
+def push_chapter(db: Session, chapter: Chapter) -> None:
+    """
+    Fan a newly published chapter out to its author's followers.
+
+    Authors above the fan-out threshold are marked for fan-out on read
+    instead. An author who drops back under it has their recent chapters
+    pushed along with the new one, since the ones published in pull mode
+    never reached the followers' feeds. Never raises - a failed push only
+    delays the chapter until the next feed rebuild.
+    """
+    try:
+        follower_ids = [
+            row[0] for row in db.query(Follow.follower_id).filter(
+                Follow.followed_id == chapter.author_id
+            ).all()
+        ]
+
+        if len(follower_ids) > settings.feed_fanout_max_followers:
+            redis_client.sadd(PULL_AUTHORS_KEY, chapter.author_id)
+            return
+
+        if redis_client.srem(PULL_AUTHORS_KEY, chapter.author_id):
+            rows = db.query(Chapter.id, Chapter.published_at).filter(
+                Chapter.author_id == chapter.author_id
+            ).order_by(desc(Chapter.published_at)).limit(settings.feed_max_items).all()
+            chapters = {chapter_id: published_at.timestamp() for chapter_id, published_at in rows}
+        else:
+            chapters = {}
+        chapters[chapter.id] = chapter.published_at.timestamp()
+
+        pipe = redis_client.pipeline(transaction=False)
+        for follower_id in follower_ids:
+            key = feed_key(follower_id)
+            pipe.zadd(key, chapters)
+            pipe.zremrangebyrank(key, 0, -(settings.feed_max_items + 1))
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Feed fan-out failed for chapter {chapter.id}: {e}")
+
+
+def remove_chapter(db: Session, chapter_id: int, author_id: int) -> None:
+    """Remove a deleted chapter from its author's followers' feeds"""
+    try:
+        follower_ids = db.query(Follow.follower_id).filter(
+            Follow.followed_id == author_id
+        ).all()
+
+        pipe = redis_client.pipeline(transaction=False)
+        for (follower_id,) in follower_ids:
+            pipe.zrem(feed_key(follower_id), chapter_id)
+            pipe.delete(quiet_picks_key(follower_id))
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Feed removal failed for chapter {chapter_id}: {e}")
+
+
+def rebuild_feed(db: Session, reader_id: int) -> None:
+    """
+    Rebuild a reader's feed from the follow graph.
+
+    Called when the follow graph changes (follow, unfollow, block).
+    Chapters from fan-out-on-read authors are left out; they are
+    merged in at read time.
+    """
+    try:
+        pull_author_ids = [int(a) for a in redis_client.smembers(PULL_AUTHORS_KEY)]
+
+        followed_ids = db.query(Follow.followed_id).filter(
+            Follow.follower_id == reader_id
+        )
+        query = db.query(Chapter.id, Chapter.published_at).filter(
+            Chapter.author_id.in_(followed_ids)
+        )
+        if pull_author_ids:
+            query = query.filter(Chapter.author_id.notin_(pull_author_ids))
+
+        rows = query.order_by(desc(Chapter.published_at)).limit(settings.feed_max_items).all()
+
+        key = feed_key(reader_id)
+        pipe = redis_client.pipeline()
+        pipe.delete(key, quiet_picks_key(reader_id), empty_feed_key(reader_id))
+        if rows:
+            pipe.zadd(key, {chapter_id: published_at.timestamp() for chapter_id, published_at in rows})
+        else:
+            # An empty sorted set does not exist, so remember that this
+            # one was built - reads would otherwise rebuild it every time
+            pipe.set(empty_feed_key(reader_id), 1, ex=settings.feed_empty_ttl)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Feed rebuild failed for reader {reader_id}: {e}")
+
+
+def _hydrate(db: Session, chapter_ids: List[int]) -> List[Tuple[Chapter, str]]:
+    """Load a page of chapters with author usernames, preserving feed order"""
+    if not chapter_ids:
+        return []
+
+    rows = db.query(Chapter, User.username).join(
+        User, User.id == Chapter.author_id
+    ).filter(
+        Chapter.id.in_(chapter_ids)
+    ).all()
+
+    by_id = {chapter.id: (chapter, username) for chapter, username in rows}
+    # Deleted chapters may linger in a feed until trimmed - skip them
+    return [by_id[cid] for cid in chapter_ids if cid in by_id]
+
+
+def _pull_entries(db: Session, reader_id: int, pull_author_ids: List[int]) -> List[Tuple[int, float]]:
+    """Fan-out-on-read: newest chapters from followed high-fan-out authors"""
+    followed_pull_ids = db.query(Follow.followed_id).filter(
+        Follow.follower_id == reader_id,
+        Follow.followed_id.in_(pull_author_ids)
+    )
+    rows = db.query(Chapter.id, Chapter.published_at).filter(
+        Chapter.author_id.in_(followed_pull_ids)
+    ).order_by(desc(Chapter.published_at)).limit(settings.feed_max_items).all()
+
+    return [(chapter_id, published_at.timestamp()) for chapter_id, published_at in rows]
+
+
+def _feed_from_db(
+    db: Session,
+    reader_id: int,
+    offset: int,
+    limit: int,
+    after: Optional[Tuple[datetime, int]] = None
+) -> Tuple[List[Tuple[Chapter, str]], Optional[int]]:
+    """Fallback path when Redis is unavailable"""
+    followed_ids = db.query(Follow.followed_id).filter(
+        Follow.follower_id == reader_id
+    )
+    query = db.query(Chapter, User.username).join(
+        User, User.id == Chapter.author_id
+    ).filter(
+        Chapter.author_id.in_(followed_ids)
+    ).order_by(desc(Chapter.published_at), desc(Chapter.id))
+
+    if after is not None:
+        # Keep the feed bound even when paging by cursor
+        bounded = query.limit(settings.feed_max_items).subquery()
+        rows = query.filter(
+            Chapter.id.in_(db.query(bounded.c.id)),
+            keyset_before(Chapter.published_at, Chapter.id, after)
+        ).limit(limit).all()
+        return rows, None
+
+    total = min(query.count(), settings.feed_max_items)
+    return query.offset(offset).limit(limit).all(), total
+
+
+def get_feed_page(
+    db: Session,
+    reader_id: int,
+    limit: int,
+    offset: int = 0,
+    after: Optional[Tuple[datetime, int]] = None
+) -> Tuple[List[Tuple[Chapter, str]], Optional[int]]:
+    """
+    Get one page of a reader's New Chapters feed.
+
+    Args:
+        db: Database session
+        reader_id: The reader
+        limit: Page size
+        offset: Number of feed items to skip (offset mode)
+        after: (published_at, id) of the last item already seen (cursor mode)
+
+    Returns:
+        (page of (chapter, author_username), total items in the bounded feed).
+        Total is None in cursor mode.
+    """
+    key = feed_key(reader_id)
+
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.zcard(key)
+        pipe.smembers(PULL_AUTHORS_KEY)
+        pipe.exists(empty_feed_key(reader_id))
+        size, pull_author_ids, built_empty = pipe.execute()
+
+        if size == 0 and not built_empty:
+            rebuild_feed(db, reader_id)
+            size = redis_client.zcard(key)
+
+        if not pull_author_ids and after is None:
+            # Common case: the whole feed is materialized
+            total = min(size, settings.feed_max_items)
+            chapter_ids = [int(cid) for cid in redis_client.zrevrange(key, offset, offset + limit - 1)]
+            return _hydrate(db, chapter_ids), total
+
+        # Rank the whole (bounded) feed, merging in chapters pulled
+        # from high-fan-out authors
+        entries = {
+            (int(cid), score)
+            for cid, score in redis_client.zrevrange(key, 0, settings.feed_max_items - 1, withscores=True)
+        }
+        if pull_author_ids:
+            entries |= set(_pull_entries(db, reader_id, [int(a) for a in pull_author_ids]))
+
+        entries = sorted(entries, key=lambda e: (e[1], e[0]), reverse=True)
+        entries = entries[:settings.feed_max_items]
+
+        if after is not None:
+            after_key = (after[0].timestamp(), after[1])
+            page = [e for e in entries if (e[1], e[0]) < after_key][:limit]
+            total = None
+        else:
+            page = entries[offset:offset + limit]
+            total = len(entries)
+
+        return _hydrate(db, [cid for cid, _ in page]), total
+    except redis.RedisError as e:
+        logger.warning(f"Feed read fell back to database for reader {reader_id}: {e}")
+        return _feed_from_db(db, reader_id, offset, limit, after)
@@ -0,0 +1,95 @@
+"""
+Follow graph edge cache - follow and block edges between two users
+
+Between the Lines eligibility needs to know, for one pair of users,
+whether each follows the other and whether either has blocked the other.
+Those three edges are cached in Redis per unordered pair
+(`follow_edges:{low_id}:{high_id}`) and read from the database in one
+statement on a miss.
+
+Following, unfollowing, blocking and unblocking call invalidate_pair
+after committing. An entry written by a read that raced such a change
+can outlive it by up to `follow_edge_cache_ttl` seconds.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+import redis
+from sqlalchemy import and_, exists, or_, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.logging_config import logger
+from app.models import Block, Follow
+from app.redis_client import redis_client
+
+
+@dataclass(frozen=True)
+class PairEdges:
+    """Edges between user_id and other_id, from user_id's side"""
+    follows: bool  # user_id follows other_id
+    followed_by: bool  # other_id follows user_id
+    blocked: bool  # either has blocked the other
+
+    @property
+    def mutual_follow(self) -> bool:
+        return self.follows and self.followed_by
+
+
+def pair_key(user_id: int, other_id: int) -> str:
+    """Redis key for the edges between two users (either order)"""
+    low, high = sorted((user_id, other_id))
+    return f"follow_edges:{low}:{high}"
+
+
+def _encode(low_follows_high: bool, high_follows_low: bool, blocked: bool) -> str:
+    return "".join("1" if flag else "0" for flag in (low_follows_high, high_follows_low, blocked))
+
+
+def _load(db: Session, low: int, high: int) -> str:
+    def follows(follower_id: int, followed_id: int):
+        return exists().where(Follow.follower_id == follower_id, Follow.followed_id == followed_id)
+
+    row = db.execute(select(
+        follows(low, high),
+        follows(high, low),
+        exists().where(or_(
+            and_(Block.blocker_id == low, Block.blocked_id == high),
+            and_(Block.blocker_id == high, Block.blocked_id == low)
+        ))
+    )).one()
+    return _encode(*row)
+
+
+def get_pair_edges(db: Session, user_id: int, other_id: int) -> PairEdges:
+    """The follow and block edges between two users, cached per pair"""
+    low, high = sorted((user_id, other_id))
+    key = pair_key(low, high)
+
+    cached: Optional[bytes] = None
+    try:
+        cached = redis_client.get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Follow edge cache read failed for users {low} and {high}: {e}")
+
+    if cached is not None:
+        flags = cached.decode()
+    else:
+        flags = _load(db, low, high)
+        try:
+            redis_client.set(key, flags, ex=settings.follow_edge_cache_ttl)
+        except redis.RedisError as e:
+            logger.warning(f"Follow edge cache write failed for users {low} and {high}: {e}")
+
+    low_follows_high, high_follows_low, blocked = (flag == "1" for flag in flags)
+    if user_id == low:
+        return PairEdges(low_follows_high, high_follows_low, blocked)
+    return PairEdges(high_follows_low, low_follows_high, blocked)
+
+
+def invalidate_pair(user_id: int, other_id: int) -> None:
+    """Drop the cached edges between two users (call after committing a change)"""
+    try:
+        redis_client.delete(pair_key(user_id, other_id))
+    except redis.RedisError as e:
+        logger.warning(f"Follow edge cache invalidation failed for users {user_id} and {other_id}: {e}")
@@ -0,0 +1,151 @@
+"""
+Heart counts - write-behind counters for Chapter.heart_count
+
+Hearting no longer touches the chapters row. Each heart or unheart adds
++1/-1 to the chapter's entry in a Redis hash and makes sure one flush job
+is scheduled; the flush applies every pending delta in one UPDATE, so a
+popular chapter takes one row write per flush instead of a row lock per
+heart. The heart_count column therefore lags the hearts table by up to
+`heart_flush_delay` seconds; readers that need the live count add
+pending_delta().
+
+The flush does not bump chapters.updated_at, so hearts leave the
+rendered chapter cache alone.
+
+If counts drift (a lost delta, hearts removed by cascade) reconcile()
+recomputes them from the hearts table. The flush reconciles any chapter
+it would have taken below zero; run a full pass with
+`python -m app.jobs.worker --reconcile-hearts`.
+"""
+from typing import Dict, List, Optional
+
+import redis
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.logging_config import logger
+from app.redis_client import redis_client
+
+
+DELTAS_KEY = "hearts:deltas"
+FLUSH_SCHEDULED_KEY = "hearts:flush_scheduled"
+
+# Add each delta, clamped at zero. Chapters a decrement leaves at zero
+# may have been clamped, so they are returned for reconciliation.
+_APPLY_SQL = text("""
+    UPDATE chapters AS c
+    SET heart_count = GREATEST(c.heart_count + d.delta, 0)
+    FROM unnest(CAST(:chapter_ids AS integer[]), CAST(:deltas AS integer[])) AS d(chapter_id, delta)
+    WHERE c.id = d.chapter_id
+    RETURNING c.id, (d.delta < 0 AND c.heart_count = 0) AS suspect
+""")
+
+# Count hearts per chapter, less deltas still waiting in Redis (the next
+# flush adds those)
+_RECONCILE_SQL = text("""
+    UPDATE chapters AS c
+    SET heart_count = GREATEST(counted.n - COALESCE(p.delta, 0), 0)
+    FROM (
+        SELECT ch.id, count(h.id) AS n
+        FROM chapters ch
+        LEFT JOIN hearts h ON h.chapter_id = ch.id
+        WHERE CAST(:chapter_ids AS integer[]) IS NULL OR ch.id = ANY(CAST(:chapter_ids AS integer[]))
+        GROUP BY ch.id
+    ) AS counted
+    LEFT JOIN unnest(CAST(:pending_ids AS integer[]), CAST(:pending_deltas AS integer[])) AS p(chapter_id, delta)
+        ON p.chapter_id = counted.id
+    WHERE c.id = counted.id AND c.heart_count <> GREATEST(counted.n - COALESCE(p.delta, 0), 0)
+""")
+
+
+def record_heart(chapter_id: int, delta: int) -> None:
+    """
+    Count a heart (+1) or unheart (-1) towards the chapter's heart_count.
+
+    Never raises - a delta lost to a Redis outage is repaired by reconcile().
+    """
+    from app.jobs import enqueue_in
+
+    try:
+        redis_client.hincrby(DELTAS_KEY, chapter_id, delta)
+
+        # Only the first caller in a window schedules the flush; the flag
+        # is released if scheduling fails, and expires on its own in case
+        # the flush job is lost later
+        if redis_client.set(FLUSH_SCHEDULED_KEY, 1, nx=True, ex=settings.heart_flush_delay * 10):
+            if not enqueue_in(settings.heart_flush_delay, "app.jobs.tasks.flush_heart_counts"):
+                clear_flush_scheduled()
+    except redis.RedisError as e:
+        logger.error(f"Failed to record heart delta for chapter {chapter_id}: {e}")
+
+
+def pending_delta(chapter_id: int) -> int:
+    """The chapter's delta not yet flushed (0 if Redis is unavailable)"""
+    try:
+        return int(redis_client.hget(DELTAS_KEY, chapter_id) or 0)
+    except redis.RedisError as e:
+        logger.warning(f"Failed to read pending heart delta for chapter {chapter_id}: {e}")
+        return 0
+
+
+def take_deltas() -> Dict[int, int]:
+    """Atomically take every pending delta off the hash"""
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.hgetall(DELTAS_KEY)
+    pipe.delete(DELTAS_KEY)
+    pending, _ = pipe.execute()
+    return {int(chapter_id): int(delta) for chapter_id, delta in pending.items() if int(delta)}
+
+
+def restore_deltas(deltas: Dict[int, int]) -> None:
+    """Put deltas back after a failed flush so the retry applies them"""
+    if not deltas:
+        return
+    pipe = redis_client.pipeline(transaction=True)
+    for chapter_id, delta in deltas.items():
+        pipe.hincrby(DELTAS_KEY, chapter_id, delta)
+    pipe.execute()
+
+
+def clear_flush_scheduled() -> None:
+    """Allow the next heart to schedule a new flush"""
+    redis_client.delete(FLUSH_SCHEDULED_KEY)
+
+
+def apply_deltas(db: Session, deltas: Dict[int, int]) -> List[int]:
+    """
+    Add deltas to chapters.heart_count in one statement. Caller commits.
+
+    Returns:
+        Ids of chapters that may have drifted (clamped at zero)
+    """
+    if not deltas:
+        return []
+    rows = db.execute(_APPLY_SQL, {
+        "chapter_ids": list(deltas.keys()),
+        "deltas": list(deltas.values())
+    }).all()
+    return [row.id for row in rows if row.suspect]
+
+
+def reconcile(db: Session, chapter_ids: Optional[List[int]] = None) -> int:
+    """
+    Recompute heart_count from the hearts table. Caller commits.
+
+    Args:
+        db: Database session
+        chapter_ids: Chapters to check (all chapters when None)
+
+    Returns:
+        Number of chapters whose count was corrected
+    """
+    pending = {
+        int(chapter_id): int(delta)
+        for chapter_id, delta in redis_client.hgetall(DELTAS_KEY).items()
+    }
+    return db.execute(_RECONCILE_SQL, {
+        "chapter_ids": chapter_ids,
+        "pending_ids": list(pending.keys()),
+        "pending_deltas": list(pending.values())
+    }).rowcount
@@ -0,0 +1,61 @@
+"""
+Notification queue - buffers notification events for batched writes
+
+Margins, shelf adds and Between the Lines activity push a small event
+onto a Redis list and make sure one flush job is scheduled. The flush
+job takes the buffered events in batches and writes them with
+notification_service.write_notifications, which coalesces events for
+the same person and the same thing into one notification.
+"""
+import json
+from typing import Any, Dict, List
+import redis
+
+from app.config import settings
+from app.logging_config import logger
+from app.redis_client import redis_client
+
+
+PENDING_KEY = "notifications:pending"
+FLUSH_SCHEDULED_KEY = "notifications:flush_scheduled"
+
+
+def queue_notification(event: Dict[str, Any]) -> None:
+    """
+    Buffer a notification event (see notification_service for the shape).
+
+    Never raises - a notification is not worth failing a request over.
+    """
+    from app.jobs import enqueue_in
+
+    try:
+        redis_client.rpush(PENDING_KEY, json.dumps(event))
+
+        # Only the first caller in a window schedules the flush; the flag
+        # is released if scheduling fails, and expires on its own in case
+        # the flush job is lost later
+        if redis_client.set(FLUSH_SCHEDULED_KEY, 1, nx=True, ex=settings.notification_flush_delay * 10):
+            if not enqueue_in(settings.notification_flush_delay, "app.jobs.tasks.flush_notifications"):
+                clear_flush_scheduled()
+    except redis.RedisError as e:
+        logger.error(f"Failed to queue {event.get('type')} notification for user {event.get('user_id')}: {e}")
+
+
+def take_pending(limit: int) -> List[Dict[str, Any]]:
+    """Atomically take up to `limit` of the oldest buffered events"""
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.lrange(PENDING_KEY, 0, limit - 1)
+    pipe.ltrim(PENDING_KEY, limit, -1)
+    raw, _ = pipe.execute()
+    return [json.loads(event) for event in raw]
+
+
+def requeue(events: List[Dict[str, Any]]) -> None:
+    """Put events back (at the front, in order) after a failed flush"""
+    if events:
+        redis_client.lpush(PENDING_KEY, *[json.dumps(event) for event in reversed(events)])
+
+
+def clear_flush_scheduled() -> None:
+    """Allow the next queued event to schedule a new flush"""
+    redis_client.delete(FLUSH_SCHEDULED_KEY)
@@ -6,9 +6,64 @@ Philosophy:
 - Never guilt or rush
 - Respect Quiet Mode
 - No exclamation points ever
+
+Notification events are buffered (notify_* functions) and written in
+batches by write_notifications, which coalesces events about the same
+thing into one notification with a gentler plural message.
+
+Each user's unread count is kept in users.unread_notification_count, in
+the same transaction as the notification write, so badge reads never
+count rows. reconcile_unread_counts() repairs drift (notifications
+removed by cascade).
 """
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Set
+from sqlalchemy import func, insert, select, text
 from sqlalchemy.orm import Session
-from app.models import Notification, NotificationType, User, Chapter, Margin
+from app.config import settings
+from app.models import (
+    Notification, NotificationType, User, Chapter, Margin,
+    BetweenTheLinesThread, BetweenTheLinesInvite
+)
+from app.auth.principals import mark_principal_stale
+from app.notifications.schemas import notification_response
+from app.services.notification_queue import queue_notification
+from app.services.notification_stream import publish_notification
+
+
+# Recount unread notifications for users whose counter drifted
+_RECONCILE_SQL = text("""
+    UPDATE users AS u
+    SET unread_notification_count = COALESCE(unread.n, 0)
+    FROM users AS target
+    LEFT JOIN (
+        SELECT user_id, count(*) AS n
+        FROM notifications
+        WHERE NOT read
+        GROUP BY user_id
+    ) AS unread ON unread.user_id = target.id
+    WHERE u.id = target.id AND u.unread_notification_count <> COALESCE(unread.n, 0)
+    RETURNING u.id
+""")
+
+# Add new notifications to several users' unread counters at once
+_ADD_UNREAD_SQL = text("""
+    UPDATE users AS u
+    SET unread_notification_count = u.unread_notification_count + d.n
+    FROM unnest(CAST(:user_ids AS integer[]), CAST(:counts AS integer[])) AS d(user_id, n)
+    WHERE u.id = d.user_id
+""")
+
+
+def _adjust_unread(db: Session, user_id: int, delta: int) -> None:
+    """Add delta to the user's unread counter (never below zero). Caller commits."""
+    db.query(User).filter(User.id == user_id).update(
+        {User.unread_notification_count: func.greatest(User.unread_notification_count + delta, 0)},
+        synchronize_session=False
+    )
+    # The counter is served from the principal cache
+    mark_principal_stale(db, user_id)
 
 
 def create_notification(
@@ -26,7 +81,8 @@ def create_notification(
     Create a notification.
     
     Respects Quiet Mode - if user has quiet_mode enabled, notification is
-    created but not pushed (they'll see it when they return).
+    created but not pushed (they'll see it when they return). Otherwise
+    it is pushed to the user's open notification streams.
     """
     notification = Notification(
         user_id=user_id,
@@ -40,124 +96,242 @@ def create_notification(
     )
     
     db.add(notification)
+    _adjust_unread(db, user_id, +1)
     db.commit()
     db.refresh(notification)
     
+    quiet_mode = db.query(User.quiet_mode).filter(User.id == user_id).scalar()
+    if not quiet_mode:
+        publish_notification(user_id, notification_response(notification))
+    
     return notification
 
 
-def notify_margin_added(db: Session, margin: Margin, chapter: Chapter):
-    """Someone left a margin on your chapter"""
-    if margin.user_id == chapter.author_id:
-        return  # Don't notify yourself
-    
-    actor = db.query(User).filter(User.id == margin.user_id).first()
-    if not actor:
-        return
+# Messages for one event, and for several coalesced into one notification
+_MESSAGES = {
+    NotificationType.MARGIN: (
+        "Someone lingered in the margins of your chapter.",
+        "Several people lingered in the margins of your chapter."
+    ),
+    NotificationType.SHELF_ADD: (
+        "Your Book found a place on someone's Shelf.",
+        "Your Book found a place on a few Shelves."
+    ),
+    NotificationType.BTL_REPLY: (
+        "There's a quiet reply between the lines.",
+        "There are a few quiet replies between the lines."
+    ),
+    NotificationType.BOOKMARK: (
+        "Someone bookmarked your chapter.",
+        "A few people bookmarked your chapter."
+    ),
+}
+
+# Each of these is its own notification, never folded into another
+_NOT_COALESCED = {
+    NotificationType.BTL_INVITE: "{actor} sent you an invitation between the lines.",
+}
+
+
+def notification_message(type: NotificationType, count: int = 1, actor: str = None) -> str:
+    """The message for `count` events of one type about the same thing"""
+    if type in _NOT_COALESCED:
+        return _NOT_COALESCED[type].format(actor=actor)
+    single, several = _MESSAGES[type]
+    return (single if count == 1 else several).format(actor=actor)
+
+
+def _queue(user_id: int, type: NotificationType, actor_id: int, **targets) -> None:
+    """
+    Buffer an event; written (and coalesced) by write_notifications.
     
-    message = f"Someone lingered in the margins of your chapter."
+    Events for the same user, type and target - chapter_id, btl_thread_id
+    or btl_invite_id - become one notification.
+    """
+    if user_id == actor_id:
+        return  # Don't notify yourself
     
-    create_notification(
-        db=db,
-        user_id=chapter.author_id,
-        type=NotificationType.MARGIN,
-        message=message,
-        chapter_id=chapter.id,
-        margin_id=margin.id,
-        actor_id=actor.id
-    )
+    queue_notification({"user_id": user_id, "type": type.value, "actor_id": actor_id, **targets})
 
 
-def notify_shelf_add(db: Session, book_owner_id: int, adder_id: int):
+def notify_margin_added(margin: Margin, chapter: Chapter):
+    """Someone left a margin on your chapter"""
+    _queue(chapter.author_id, NotificationType.MARGIN, margin.author_id, chapter_id=chapter.id, margin_id=margin.id)
+
+
+def notify_shelf_add(book_owner_id: int, adder_id: int):
     """Someone added your Book to their Shelf"""
-    if book_owner_id == adder_id:
-        return  # Don't notify yourself
-    
-    message = "Your Book found a place on someone's Shelf."
-    
-    create_notification(
-        db=db,
-        user_id=book_owner_id,
-        type=NotificationType.SHELF_ADD,
-        message=message,
-        actor_id=adder_id
-    )
+    _queue(book_owner_id, NotificationType.SHELF_ADD, adder_id)
 
 
-def notify_btl_reply(db: Session, thread_id: int, sender_id: int, recipient_id: int):
+def notify_btl_reply(thread_id: int, sender_id: int, recipient_id: int):
     """Someone replied Between the Lines"""
-    if sender_id == recipient_id:
-        return  # Don't notify yourself
-    
-    message = "There's a quiet reply between the lines."
-    
-    create_notification(
-        db=db,
-        user_id=recipient_id,
-        type=NotificationType.BTL_REPLY,
-        message=message,
-        btl_thread_id=thread_id,
-        actor_id=sender_id
-    )
+    _queue(recipient_id, NotificationType.BTL_REPLY, sender_id, btl_thread_id=thread_id)
 
 
-def notify_btl_invite(db: Session, invite_id: int, sender_id: int, recipient_id: int):
+def notify_btl_invite(invite_id: int, sender_id: int, recipient_id: int):
     """Someone sent you a BTL invitation"""
-    if sender_id == recipient_id:
-        return  # Don't notify yourself
-    
-    actor = db.query(User).filter(User.id == sender_id).first()
-    if not actor:
-        return
-    
-    message = f"{actor.username} sent you an invitation between the lines."
-    
-    create_notification(
-        db=db,
-        user_id=recipient_id,
-        type=NotificationType.BTL_INVITE,
-        message=message,
-        btl_invite_id=invite_id,
-        actor_id=sender_id
-    )
+    _queue(recipient_id, NotificationType.BTL_INVITE, sender_id, btl_invite_id=invite_id)
 
 
-def notify_bookmark(db: Session, chapter_id: int, bookmarker_id: int, author_id: int):
+def notify_bookmark(chapter_id: int, bookmarker_id: int, author_id: int):
     """Someone bookmarked your chapter (optional, maybe later)"""
-    if bookmarker_id == author_id:
-        return  # Don't notify yourself
+    _queue(author_id, NotificationType.BOOKMARK, bookmarker_id, chapter_id=chapter_id)
+
+
+def _existing_ids(db: Session, column, ids: Set[int]) -> Set[int]:
+    if not ids:
+        return set()
+    return set(db.scalars(select(column).where(column.in_(ids))))
+
+
+def write_notifications(db: Session, events: List[Dict[str, Any]]) -> int:
+    """
+    Write buffered notification events as few notifications as possible.
     
-    message = "Someone bookmarked your chapter."
+    Events for the same user, type and target are coalesced into one
+    notification (except invitations, which always stand alone). If the
+    user still has an unread one for the same thing
+    from the last `notification_coalesce_window` seconds, it is updated
+    to say so instead of adding another. New notifications go in one
+    multi-row INSERT, and unread counters in one UPDATE. Events whose
+    people or objects have since been deleted are dropped.
     
-    create_notification(
-        db=db,
-        user_id=author_id,
-        type=NotificationType.BOOKMARK,
-        message=message,
-        chapter_id=chapter_id,
-        actor_id=bookmarker_id
-    )
+    Commits, then pushes to open streams (unless in Quiet Mode).
+    
+    Returns:
+        Number of notifications created or updated
+    """
+    def referenced(field):
+        return {e[field] for e in events if e.get(field) is not None}
+    
+    # Load everything the events refer to, once per batch
+    users = {
+        user.id: user
+        for user in db.query(User).filter(User.id.in_(referenced("user_id") | referenced("actor_id")))
+    }
+    # Loaded so notification_response finds titles without a query each
+    chapter_ids = referenced("chapter_id")
+    chapters = {
+        chapter.id: chapter
+        for chapter in (db.query(Chapter).filter(Chapter.id.in_(chapter_ids)) if chapter_ids else [])
+    }
+    known = {
+        "user_id": users.keys(),
+        "actor_id": users.keys(),
+        "chapter_id": chapters.keys(),
+        "margin_id": _existing_ids(db, Margin.id, referenced("margin_id")),
+        "btl_thread_id": _existing_ids(db, BetweenTheLinesThread.id, referenced("btl_thread_id")),
+        "btl_invite_id": _existing_ids(db, BetweenTheLinesInvite.id, referenced("btl_invite_id")),
+    }
+    
+    def still_exists(event):
+        return all(
+            event.get(field) is None or event[field] in ids
+            for field, ids in known.items()
+        )
+    
+    def key(user_id, type, chapter_id, btl_thread_id, btl_invite_id):
+        return (user_id, NotificationType(type), chapter_id, btl_thread_id, btl_invite_id)
+    
+    # Grouped by (key, n): n tells apart events that are not coalesced
+    groups: Dict[tuple, List[Dict[str, Any]]] = {}
+    for n, event in enumerate(filter(still_exists, events)):
+        event_key = key(
+            event["user_id"], event["type"],
+            event.get("chapter_id"), event.get("btl_thread_id"), event.get("btl_invite_id")
+        )
+        groups.setdefault((event_key, n if event_key[1] in _NOT_COALESCED else None), []).append(event)
+    if not groups:
+        return 0
+    
+    # Unread notifications to fold new events into; locked so a
+    # concurrent mark-as-read cannot slip in between
+    now = datetime.now(timezone.utc)
+    recent = db.query(Notification).filter(
+        Notification.user_id.in_({event_key[0] for event_key, _ in groups}),
+        Notification.type.notin_(list(_NOT_COALESCED)),
+        Notification.read == False,
+        Notification.created_at >= now - timedelta(seconds=settings.notification_coalesce_window)
+    ).order_by(Notification.created_at).with_for_update().all()
+    # Later rows win, so each key maps to its newest notification
+    unread = {
+        key(n.user_id, n.type, n.chapter_id, n.btl_thread_id, n.btl_invite_id): n
+        for n in recent
+    }
+    
+    rows = []
+    updated = []
+    for (group_key, _), group in groups.items():
+        latest = group[-1]
+        type = group_key[1]
+        existing = unread.get(group_key)
+        if existing is not None:
+            existing.message = notification_message(type, 2, users[latest["actor_id"]].username)
+            existing.actor_id = latest["actor_id"]
+            existing.margin_id = latest.get("margin_id")
+            existing.created_at = now
+            updated.append(existing)
+        else:
+            rows.append({
+                "user_id": latest["user_id"],
+                "type": type,
+                "message": notification_message(type, len(group), users[latest["actor_id"]].username),
+                "chapter_id": latest.get("chapter_id"),
+                "margin_id": latest.get("margin_id"),
+                "btl_thread_id": latest.get("btl_thread_id"),
+                "btl_invite_id": latest.get("btl_invite_id"),
+                "actor_id": latest["actor_id"],
+                "created_at": now
+            })
+    
+    created = db.scalars(insert(Notification).returning(Notification), rows).all() if rows else []
+    db.flush()
+    
+    new_per_user = Counter(n.user_id for n in created)
+    if new_per_user:
+        db.execute(_ADD_UNREAD_SQL, {
+            "user_ids": list(new_per_user.keys()),
+            "counts": list(new_per_user.values())
+        })
+        for user_id in new_per_user:
+            mark_principal_stale(db, user_id)
+    
+    # Built before commit expires the objects
+    to_push = [
+        (n.user_id, notification_response(n))
+        for n in created + updated
+        if not users[n.user_id].quiet_mode
+    ]
+    db.commit()
+    
+    for user_id, response in to_push:
+        publish_notification(user_id, response)
+    
+    return len(created) + len(updated)
 
 
 def get_unread_count(db: Session, user_id: int) -> int:
     """Get count of unread notifications"""
-    return db.query(Notification).filter(
-        Notification.user_id == user_id,
-        Notification.read == False
-    ).count()
+    return db.query(User.unread_notification_count).filter(User.id == user_id).scalar() or 0
 
 
 def mark_as_read(db: Session, notification_id: int, user_id: int) -> bool:
     """Mark a notification as read"""
-    notification = db.query(Notification).filter(
+    # Only a notification that was unread moves the counter
+    marked = db.query(Notification).filter(
         Notification.id == notification_id,
-        Notification.user_id == user_id
-    ).first()
+        Notification.user_id == user_id,
+        Notification.read == False
+    ).update({"read": True}, synchronize_session=False)
     
-    if not notification:
-        return False
+    if not marked:
+        return db.query(Notification.id).filter(
+            Notification.id == notification_id,
+            Notification.user_id == user_id
+        ).first() is not None
     
-    notification.read = True
+    _adjust_unread(db, user_id, -1)
     db.commit()
     return True
 
@@ -172,5 +346,21 @@ def mark_all_as_read(db: Session, user_id: int, type: NotificationType = None):
     if type:
         query = query.filter(Notification.type == type)
     
-    query.update({"read": True})
+    marked = query.update({"read": True}, synchronize_session=False)
+    if marked:
+        _adjust_unread(db, user_id, -marked)
     db.commit()
+
+
+def reconcile_unread_counts(db: Session) -> int:
+    """
+    Recompute every user's unread counter from the notifications table.
+    Caller commits.
+    
+    Returns:
+        Number of users whose counter was corrected
+    """
+    user_ids = db.execute(_RECONCILE_SQL).scalars().all()
+    for user_id in user_ids:
+        mark_principal_stale(db, user_id)
+    return len(user_ids)
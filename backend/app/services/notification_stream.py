@@ -0,0 +1,236 @@
+"""
+Notification stream - push notifications to connected clients
+
+create_notification publishes each new notification to the recipient's
+Redis channel (`notifications:{user_id}`), so every API process sees it
+whichever process or worker created it. Each process holds one pub/sub
+connection (NotificationHub), subscribed to the channels of users with
+an open stream, and fans messages out to their streams.
+
+While a user's Quiet Mode is on nothing is published. Turning it off
+publishes a "resume" message, and open streams then deliver what was
+created in the meantime from the database - the same catch-up a client
+gets by reconnecting with Last-Event-ID.
+"""
+import asyncio
+import json
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+import redis
+import redis.asyncio
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.logging_config import logger
+from app.models import Notification, User
+from app.notifications.schemas import NotificationResponse, notification_response
+from app.redis_client import redis_client
+from app.sse import sse_event
+
+HEARTBEAT = ": keepalive\n\n"
+
+
+def notification_channel(user_id: int) -> str:
+    """Redis channel carrying one user's notifications"""
+    return f"notifications:{user_id}"
+
+
+def _publish(user_id: int, message: dict) -> None:
+    try:
+        redis_client.publish(notification_channel(user_id), json.dumps(message))
+    except redis.RedisError as e:
+        # Clients catch up from the database when they reconnect
+        logger.warning(f"Failed to publish notification event for user {user_id}: {e}")
+
+
+def publish_notification(user_id: int, response: NotificationResponse) -> None:
+    """Push a committed (new or updated) notification to the user's open streams"""
+    _publish(user_id, {
+        "type": "notification",
+        "notification": response.model_dump(mode="json")
+    })
+
+
+def publish_resume(user_id: int) -> None:
+    """Tell the user's open streams to deliver notifications deferred by Quiet Mode"""
+    _publish(user_id, {"type": "resume"})
+
+
+class NotificationHub:
+    """One pub/sub connection per process, fanned out to local streams"""
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self._client = redis.asyncio.Redis.from_url(settings.redis_url)
+        self._pubsub = self._client.pubsub()
+        self._queues: Dict[int, Set[asyncio.Queue]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    async def subscribe(self, user_id: int) -> asyncio.Queue:
+        """A queue receiving the user's messages until unsubscribe()"""
+        queue = asyncio.Queue()
+        queues = self._queues.setdefault(user_id, set())
+        if not queues:
+            await self._pubsub.subscribe(notification_channel(user_id))
+        queues.add(queue)
+
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        """
+        Stop delivering to `queue`. Synchronous, so it is safe in a
+        stream's finally block while the stream is being cancelled.
+        """
+        queues = self._queues.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._queues[user_id]
+            asyncio.ensure_future(self._unsubscribe(user_id))
+
+    async def _unsubscribe(self, user_id: int) -> None:
+        # A stream may have reopened for the user in the meantime
+        if user_id in self._queues:
+            return
+        try:
+            await self._pubsub.unsubscribe(notification_channel(user_id))
+        except redis.RedisError as e:
+            logger.warning(f"Failed to unsubscribe notifications for user {user_id}: {e}")
+
+    async def _listen(self) -> None:
+        recovering = False
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except redis.RedisError as e:
+                logger.warning(f"Notification pub/sub connection lost: {e}")
+                recovering = True
+                await asyncio.sleep(1)
+                continue
+
+            if recovering:
+                # Messages may have been published while disconnected
+                recovering = False
+                self._broadcast({"type": "resume"})
+
+            if message is None:
+                continue
+
+            user_id = int(message["channel"].rsplit(b":", 1)[1])
+            data = json.loads(message["data"])
+            for queue in self._queues.get(user_id, ()):
+                queue.put_nowait(data)
+
+    def _broadcast(self, data: dict) -> None:
+        for queues in self._queues.values():
+            for queue in queues:
+                queue.put_nowait(data)
+
+    async def aclose(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+        await self._pubsub.aclose()
+        await self._client.aclose()
+
+
+_hub: Optional[NotificationHub] = None
+
+
+def get_notification_hub() -> NotificationHub:
+    """The process-wide hub, bound to the running event loop"""
+    global _hub
+    if _hub is None or _hub.loop is not asyncio.get_running_loop():
+        _hub = NotificationHub()
+    return _hub
+
+
+async def close_notification_hub() -> None:
+    """Close the hub's Redis connection on shutdown"""
+    global _hub
+    if _hub is not None:
+        await _hub.aclose()
+        _hub = None
+
+
+async def _missed(user_id: int, after_id: int) -> List[Notification]:
+    """Notifications created after `after_id`, oldest first"""
+    async with AsyncSessionLocal() as db:
+        return list(await db.scalars(
+            select(Notification).where(
+                Notification.user_id == user_id,
+                Notification.id > after_id
+            ).options(
+                joinedload(Notification.actor),
+                joinedload(Notification.chapter)
+            ).order_by(Notification.id).limit(settings.notification_replay_limit)
+        ))
+
+
+async def notification_events(user_id: int, last_event_id: Optional[int] = None) -> AsyncIterator[str]:
+    """
+    A user's notification stream as SSE messages.
+
+    Opens with `event: unread` (the unread count), then one
+    `event: notification` per new or updated notification, its id as
+    the SSE id.
+    Given `last_event_id` it first delivers what was created after it.
+    A comment is sent after `notification_heartbeat_seconds` of silence.
+    """
+    hub = get_notification_hub()
+    # Subscribe before reading the database so nothing falls in between
+    queue = await hub.subscribe(user_id)
+    try:
+        async with AsyncSessionLocal() as db:
+            quiet_mode, unread, latest_id = (await db.execute(
+                select(
+                    User.quiet_mode,
+                    User.unread_notification_count,
+                    select(func.max(Notification.id)).where(
+                        Notification.user_id == user_id
+                    ).scalar_subquery()
+                ).where(User.id == user_id)
+            )).one()
+
+        yield sse_event({"count": unread}, event="unread")
+
+        last_id = last_event_id if last_event_id is not None else (latest_id or 0)
+        pending = [] if quiet_mode else await _missed(user_id, last_id)
+
+        # Ids the catch-up sent that may also arrive live (subscribed first)
+        caught_up: Set[int] = set()
+        while True:
+            for notification in pending:
+                if notification.id > last_id:
+                    last_id = notification.id
+                    caught_up.add(notification.id)
+                    yield sse_event(
+                        notification_response(notification).model_dump(mode="json"),
+                        event="notification",
+                        id=str(notification.id)
+                    )
+            pending = []
+
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=settings.notification_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield HEARTBEAT
+                continue
+
+            if message["type"] == "notification":
+                data = message["notification"]
+                if data["id"] in caught_up:
+                    caught_up.discard(data["id"])
+                    continue
+                # Coalescing updates an older notification in place; the
+                # client replaces it by id
+                last_id = max(last_id, data["id"])
+                yield sse_event(data, event="notification", id=str(data["id"]))
+            elif message["type"] == "resume":
+                pending = await _missed(user_id, last_id)
+    finally:
+        hub.unsubscribe(user_id, queue)
@@ -1,9 +1,13 @@
 """Open Pages business logic"""
 from datetime import datetime, timezone, timedelta
+from typing import Optional
+from sqlalchemy import func, or_, select, update
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
+from app.config import settings
 from app.models import User
+from app.auth.principals import mark_principal_stale
 
 
 def check_open_pages(user: User) -> int:
@@ -37,14 +41,22 @@ def consume_open_page(user: User, db: Session) -> None:
     Raises:
         HTTPException: If user has no Open Pages available
     """
-    if user.open_pages <= 0:
+    # Decrement in the database, so a stale (e.g. cached) count can
+    # neither overspend nor overwrite a concurrent change
+    consumed = db.query(User).filter(
+        User.id == user.id,
+        User.open_pages > 0
+    ).update({User.open_pages: User.open_pages - 1}, synchronize_session=False)
+    
+    if not consumed:
+        db.refresh(user)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"No Open Pages available. You have {user.open_pages} Open Pages. "
                    f"Open Pages are granted daily (max 3 stored)."
         )
     
-    user.open_pages -= 1
+    mark_principal_stale(db, user.id)
     db.commit()
     db.refresh(user)
 
@@ -87,29 +99,55 @@ def grant_daily_open_page(user: User, db: Session) -> bool:
     return True
 
 
-def grant_open_pages_to_all_users(db: Session) -> dict:
+def grant_open_pages_to_all_users(db: Session, chunk_size: Optional[int] = None) -> dict:
     """
     Grant Open Pages to all eligible users (background job).
     
-    This should be run daily by a background worker.
+    Same rules as grant_daily_open_page, applied set-based: one
+    UPDATE ... RETURNING per chunk of user ids, committed per chunk so
+    row locks stay short. Run daily with
+    `python -m app.jobs.worker --grant-open-pages`.
     
     Returns:
         dict: Statistics about the grant operation
     """
-    users = db.query(User).all()
+    chunk_size = chunk_size or settings.open_page_grant_chunk_size
+    now = datetime.now(timezone.utc)
     
     granted_count = 0
-    skipped_count = 0
+    last_id = 0
+    max_id = db.scalar(select(func.max(User.id))) or 0
+    
+    # Walk the id space in fixed ranges; gaps only make a chunk smaller
+    while last_id < max_id:
+        granted_ids = db.scalars(
+            update(User)
+            .where(
+                User.id > last_id,
+                User.id <= last_id + chunk_size,
+                User.open_pages < 3,
+                or_(
+                    User.last_open_page_grant.is_(None),
+                    User.last_open_page_grant <= now - timedelta(hours=24)
+                )
+            )
+            .values(open_pages=User.open_pages + 1, last_open_page_grant=now)
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        
+        for user_id in granted_ids:
+            mark_principal_stale(db, user_id)
+        db.commit()
+        
+        granted_count += len(granted_ids)
+        last_id += chunk_size
     
-    for user in users:
-        if grant_daily_open_page(user, db):
-            granted_count += 1
-        else:
-            skipped_count += 1
+    total_users = db.scalar(select(func.count(User.id))) or 0
     
     return {
-        "total_users": len(users),
+        "total_users": total_users,
         "granted": granted_count,
-        "skipped": skipped_count,
-        "timestamp": datetime.now(timezone.utc).isoformat()
+        "skipped": total_users - granted_count,
+        "timestamp": now.isoformat()
     }
@@ -0,0 +1,140 @@
+"""
+Quiet Picks - taste-ranked chapters from followed Books
+
+Candidates (followed authors, last 7 days) are ranked in Postgres by
+cosine distance between each chapter embedding and the reader's taste
+vector, with the per-Book diversity cap applied by a window function.
+The picked ids are cached per reader and invalidated when a followed
+author's chapter is (re-)embedded, the follow graph changes or the
+taste profile moves. Publishing alone does not invalidate: a chapter
+only becomes a candidate once its embedding is committed.
+"""
+import json
+from datetime import datetime, timezone, timedelta
+from typing import List
+import redis
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import func
+
+from app.config import settings
+from app.logging_config import logger
+from app.redis_client import redis_client
+from app.models import Chapter, ChapterEmbedding, UserTasteProfile, Follow
+
+
+QUIET_PICKS_LIMIT = 5
+MAX_PICKS_PER_BOOK = 2
+CANDIDATE_WINDOW_DAYS = 7
+
+
+def quiet_picks_key(user_id: int) -> str:
+    """Redis key of a reader's cached Quiet Picks"""
+    return f"quiet_picks:{user_id}"
+
+
+def invalidate_quiet_picks(*user_ids: int) -> None:
+    """Drop cached picks so they are re-ranked on the next read"""
+    if not user_ids:
+        return
+    try:
+        redis_client.delete(*[quiet_picks_key(user_id) for user_id in user_ids])
+    except redis.RedisError as e:
+        logger.warning(f"Quiet Picks invalidation failed: {e}")
+
+
+def invalidate_followers_quiet_picks(db: Session, author_ids: List[int]) -> None:
+    """Drop the cached picks of everyone following any of these authors"""
+    if not author_ids:
+        return
+    follower_ids = {
+        row[0] for row in db.query(Follow.follower_id).filter(
+            Follow.followed_id.in_(author_ids)
+        ).all()
+    }
+    invalidate_quiet_picks(*follower_ids)
+
+
+def _rank_quiet_picks(db: Session, user_id: int) -> List[Chapter]:
+    """Rank candidates against the taste vector in a single query"""
+    since = datetime.now(timezone.utc) - timedelta(days=CANDIDATE_WINDOW_DAYS)
+    followed_ids = db.query(Follow.followed_id).filter(Follow.follower_id == user_id)
+    distance = ChapterEmbedding.embedding.cosine_distance(UserTasteProfile.embedding)
+
+    ranked = db.query(
+        Chapter.id.label("chapter_id"),
+        distance.label("distance"),
+        func.row_number().over(
+            partition_by=Chapter.author_id,
+            order_by=(distance, Chapter.id)
+        ).label("book_rank")
+    ).join(
+        ChapterEmbedding, ChapterEmbedding.chapter_id == Chapter.id
+    ).join(
+        UserTasteProfile, UserTasteProfile.user_id == user_id
+    ).filter(
+        Chapter.author_id.in_(followed_ids),
+        Chapter.published_at >= since
+    ).subquery()
+
+    return db.query(Chapter).join(
+        ranked, ranked.c.chapter_id == Chapter.id
+    ).filter(
+        ranked.c.book_rank <= MAX_PICKS_PER_BOOK
+    ).options(
+        joinedload(Chapter.author),
+        selectinload(Chapter.blocks)
+    ).order_by(
+        ranked.c.distance, Chapter.id
+    ).limit(QUIET_PICKS_LIMIT).all()
+
+
+def _load_chapters(db: Session, chapter_ids: List[int]) -> List[Chapter]:
+    """Load cached picks in their ranked order"""
+    if not chapter_ids:
+        return []
+
+    chapters = db.query(Chapter).filter(
+        Chapter.id.in_(chapter_ids)
+    ).options(
+        joinedload(Chapter.author),
+        selectinload(Chapter.blocks)
+    ).all()
+
+    by_id = {chapter.id: chapter for chapter in chapters}
+    return [by_id[cid] for cid in chapter_ids if cid in by_id]
+
+
+def get_quiet_picks(db: Session, user_id: int) -> List[Chapter]:
+    """
+    Get a reader's Quiet Picks, from cache when possible.
+
+    Readers without a taste profile or embedded candidates get no picks.
+
+    Args:
+        db: Database session
+        user_id: The reader
+
+    Returns:
+        Up to 5 chapters, closest to the reader's taste first
+    """
+    key = quiet_picks_key(user_id)
+
+    try:
+        cached = redis_client.get(key)
+        if cached is not None:
+            return _load_chapters(db, json.loads(cached))
+    except redis.RedisError as e:
+        logger.warning(f"Quiet Picks cache read failed for user {user_id}: {e}")
+
+    picks = _rank_quiet_picks(db, user_id)
+
+    try:
+        redis_client.setex(
+            key,
+            settings.quiet_picks_cache_ttl,
+            json.dumps([chapter.id for chapter in picks])
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Quiet Picks cache write failed for user {user_id}: {e}")
+
+    return picks
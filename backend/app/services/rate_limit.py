@@ -0,0 +1,147 @@
+"""
+Rate limiting - atomic, single round trip limits in Redis
+
+Each check is one Lua script call, so the read-modify-write happens
+inside Redis and concurrent requests cannot overshoot the limit.
+Scripts are sent once and then invoked by SHA (EVALSHA).
+
+Three strategies:
+
+- FIXED_WINDOW: INCR a counter that expires `window` seconds after the
+  first hit. Cheapest; allows up to 2x the limit across a window edge.
+- SLIDING_WINDOW: a sorted set of hit timestamps over the last `window`
+  seconds. Exact; memory grows with the limit.
+- TOKEN_BUCKET: `limit` tokens refilled evenly over `window` seconds.
+  Allows short bursts up to `limit`, then a steady rate.
+
+Every check returns a RateLimitResult whose `retry_after` feeds the
+Retry-After header on 429 responses. If Redis is unavailable requests
+are allowed through rather than failing.
+"""
+from typing import NamedTuple
+
+import redis
+from fastapi import HTTPException, status
+
+from app.logging_config import logger
+from app.redis_client import redis_client
+
+FIXED_WINDOW = "fixed"
+SLIDING_WINDOW = "sliding"
+TOKEN_BUCKET = "bucket"
+
+# KEYS[1] counter; ARGV limit, window_ms
+# Returns {allowed, remaining, retry_after_ms}
+_FIXED_WINDOW_LUA = """
+local count = redis.call('INCR', KEYS[1])
+local ttl = redis.call('PTTL', KEYS[1])
+if ttl < 0 then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    ttl = tonumber(ARGV[2])
+end
+local limit = tonumber(ARGV[1])
+if count > limit then
+    return {0, 0, ttl}
+end
+return {1, limit - count, 0}
+"""
+
+# KEYS[1] sorted set of hit times (us); ARGV limit, window_ms
+# Returns {allowed, remaining, retry_after_ms}
+_SLIDING_WINDOW_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2]) * 1000
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+if count >= limit then
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    return {0, 0, math.ceil((tonumber(oldest[2]) + window - now) / 1000)}
+end
+redis.call('ZADD', KEYS[1], now, t[1] .. '.' .. t[2] .. ':' .. count)
+redis.call('PEXPIRE', KEYS[1], ARGV[2])
+return {1, limit - count - 1, 0}
+"""
+
+# KEYS[1] hash {tokens, ts (us)}; ARGV limit, window_ms
+# Returns {allowed, remaining, retry_after_ms}
+_TOKEN_BUCKET_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local limit = tonumber(ARGV[1])
+local rate = limit / (tonumber(ARGV[2]) * 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or limit
+local ts = tonumber(state[2]) or now
+tokens = math.min(limit, tokens + (now - ts) * rate)
+if tokens < 1 then
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return {0, 0, math.ceil((1 - tokens) / rate / 1000)}
+end
+tokens = tokens - 1
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], ARGV[2])
+return {1, math.floor(tokens), 0}
+"""
+
+_scripts = {
+    FIXED_WINDOW: redis_client.register_script(_FIXED_WINDOW_LUA),
+    SLIDING_WINDOW: redis_client.register_script(_SLIDING_WINDOW_LUA),
+    TOKEN_BUCKET: redis_client.register_script(_TOKEN_BUCKET_LUA),
+}
+
+
+class RateLimitResult(NamedTuple):
+    """Outcome of one rate limit check"""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int  # seconds until a retry can succeed (0 when allowed)
+
+
+def rate_limit_key(scope: str, identity, strategy: str) -> str:
+    """Redis key for one identity's limit on one scope"""
+    return f"rate_limit:{strategy}:{scope}:{identity}"
+
+
+def hit(scope: str, identity, limit: int, window: int, strategy: str = FIXED_WINDOW) -> RateLimitResult:
+    """
+    Count one request against a limit.
+
+    Args:
+        scope: What is being limited (e.g. 'margins', 'muse_rewrite')
+        identity: Who is being limited (usually a user id)
+        limit: Requests allowed per window
+        window: Window length in seconds
+        strategy: FIXED_WINDOW, SLIDING_WINDOW or TOKEN_BUCKET
+
+    Returns:
+        RateLimitResult - denied requests are not counted for the
+        sliding window or token bucket
+    """
+    key = rate_limit_key(scope, identity, strategy)
+    try:
+        allowed, remaining, retry_after_ms = _scripts[strategy](
+            keys=[key], args=[limit, window * 1000]
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Rate limit check failed open for {key}: {e}")
+        return RateLimitResult(True, limit, limit, 0)
+
+    retry_after = max(1, -(-int(retry_after_ms) // 1000)) if not allowed else 0
+    return RateLimitResult(bool(allowed), limit, int(remaining), retry_after)
+
+
+def rate_limit_exceeded(result: RateLimitResult, detail: str) -> HTTPException:
+    """429 carrying Retry-After and X-RateLimit-* headers for a denied check"""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={
+            "Retry-After": str(result.retry_after),
+            "X-RateLimit-Limit": str(result.limit),
+            "X-RateLimit-Remaining": str(result.remaining),
+        }
+    )
@@ -0,0 +1,132 @@
+"""
+Read cursor buffer - chapter views advance read cursors off the request path
+
+Viewing a chapter moves the reader's cursor for the author's Book
+forward (see spines.py). Doing that in the request put an upsert and a
+commit on the primary for the most common read in the app, and the
+commit pinned the reader to the primary. Instead each view records the
+position in a Redis sorted set (member `{reader_id}:{book_id}`, score
+the read position in microseconds; ZADD GT keeps the furthest) and makes
+sure one flush job is scheduled. The flush applies every pending cursor
+in one upsert, so spines' unread counts lag views by up to
+`read_cursor_flush_delay` seconds.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Tuple
+
+import redis
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.logging_config import logger
+from app.models import Book, ReadCursor, User
+from app.redis_client import redis_client
+
+
+PENDING_KEY = "read_cursors:pending"
+FLUSH_SCHEDULED_KEY = "read_cursors:flush_scheduled"
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+# (reader_id, book_id) -> read everything up to this moment
+PendingReads = Dict[Tuple[int, int], datetime]
+
+
+def _score(read_at: datetime) -> int:
+    # Whole microseconds are exact in a sorted-set score (a double), so a
+    # cursor at a chapter's published_at never lands just before it
+    return (read_at - _EPOCH) // _MICROSECOND
+
+
+def record_read(reader_id: int, book_id: int, read_at: datetime) -> None:
+    """
+    Advance the reader's cursor for a Book to read_at (never backwards).
+
+    Never raises - a lost read only leaves a chapter counted as unread.
+    """
+    from app.jobs import enqueue_in
+
+    try:
+        redis_client.zadd(PENDING_KEY, {f"{reader_id}:{book_id}": _score(read_at)}, gt=True)
+
+        # Only the first caller in a window schedules the flush; the flag
+        # is released if scheduling fails, and expires on its own in case
+        # the flush job is lost later
+        if redis_client.set(FLUSH_SCHEDULED_KEY, 1, nx=True, ex=settings.read_cursor_flush_delay * 10):
+            if not enqueue_in(settings.read_cursor_flush_delay, "app.jobs.tasks.flush_read_cursors"):
+                clear_flush_scheduled()
+    except redis.RedisError as e:
+        logger.error(f"Failed to record read of book {book_id} by user {reader_id}: {e}")
+
+
+def take_pending() -> PendingReads:
+    """Atomically take every pending cursor off the set"""
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.zrange(PENDING_KEY, 0, -1, withscores=True)
+    pipe.delete(PENDING_KEY)
+    pending, _ = pipe.execute()
+
+    reads = {}
+    for member, score in pending:
+        reader_id, book_id = member.decode().split(":")
+        reads[(int(reader_id), int(book_id))] = _EPOCH + int(score) * _MICROSECOND
+    return reads
+
+
+def restore_pending(reads: PendingReads) -> None:
+    """Put cursors back after a failed flush so the retry applies them"""
+    if reads:
+        redis_client.zadd(PENDING_KEY, {
+            f"{reader_id}:{book_id}": _score(read_at)
+            for (reader_id, book_id), read_at in reads.items()
+        }, gt=True)
+
+
+def clear_flush_scheduled() -> None:
+    """Allow the next chapter view to schedule a new flush"""
+    redis_client.delete(FLUSH_SCHEDULED_KEY)
+
+
+def apply_reads(db: Session, reads: PendingReads) -> int:
+    """
+    Upsert every pending cursor in one statement. Caller commits.
+
+    Cursors of readers or Books deleted since the view are dropped.
+
+    Returns:
+        Number of cursors written
+    """
+    readers = {reader_id for reader_id, _ in reads}
+    books = {book_id for _, book_id in reads}
+    readers &= set(db.scalars(select(User.id).where(User.id.in_(readers))))
+    books &= set(db.scalars(select(Book.id).where(Book.id.in_(books))))
+    reads = {
+        key: read_at for key, read_at in reads.items()
+        if key[0] in readers and key[1] in books
+    }
+    if not reads:
+        return 0
+
+    now = datetime.now(timezone.utc)
+    stmt = insert(ReadCursor).values([
+        {
+            "reader_id": reader_id,
+            "book_id": book_id,
+            "last_read_at": read_at,
+            "created_at": now,
+            "updated_at": now
+        }
+        for (reader_id, book_id), read_at in reads.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_read_cursor_reader_book",
+        set_={
+            "last_read_at": func.greatest(ReadCursor.last_read_at, stmt.excluded.last_read_at),
+            "updated_at": now
+        }
+    )
+    db.execute(stmt)
+    return len(reads)
@@ -0,0 +1,100 @@
+"""
+Chapter search index - maintained tsvector documents
+
+Each chapter carries a weighted full-text document:
+    A - title
+    B - mood, theme, curated theme names
+    C - text and quote block content
+
+It is rebuilt in SQL whenever the chapter's content or themes change,
+so searches only ever touch the GIN index on chapters.search_vector.
+"""
+from typing import Dict, List
+from sqlalchemy.orm import Session
+from sqlalchemy import func, cast, text, literal_column
+from sqlalchemy.dialects.postgresql import REGCONFIG, aggregate_order_by
+
+from app.models import ChapterBlock
+from app.models.chapter import BlockType
+
+# Text search configuration used for documents, queries and headlines
+SEARCH_CONFIG = "english"
+
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2"
+
+_REFRESH_SQL = text("""
+    UPDATE chapters c SET search_vector =
+        setweight(to_tsvector(CAST(:config AS regconfig), coalesce(c.title, '')), 'A') ||
+        setweight(to_tsvector(CAST(:config AS regconfig),
+            coalesce(c.mood, '') || ' ' || coalesce(c.theme, '') || ' ' || coalesce((
+                SELECT string_agg(t.name, ' ')
+                FROM chapter_themes ct JOIN themes t ON t.id = ct.theme_id
+                WHERE ct.chapter_id = c.id
+            ), '')), 'B') ||
+        setweight(to_tsvector(CAST(:config AS regconfig), coalesce((
+                SELECT string_agg(b.content->>'text', ' ' ORDER BY b.position)
+                FROM chapter_blocks b
+                WHERE b.chapter_id = c.id AND b.block_type::text IN ('TEXT', 'QUOTE')
+            ), '')), 'C')
+    WHERE c.id = :chapter_id
+""")
+
+
+def search_config():
+    """The text search configuration as a regconfig expression"""
+    return cast(SEARCH_CONFIG, REGCONFIG)
+
+
+def to_query(q: str):
+    """Parse user input into a tsquery (quotes, OR and -negation supported)"""
+    return func.websearch_to_tsquery(search_config(), q)
+
+
+def refresh_search_document(db: Session, chapter_id: int) -> None:
+    """
+    Rebuild a chapter's search document from its current content.
+
+    Call after the chapter's blocks/themes are flushed; caller commits.
+
+    Args:
+        db: Database session
+        chapter_id: The chapter to reindex
+    """
+    db.execute(_REFRESH_SQL, {"config": SEARCH_CONFIG, "chapter_id": chapter_id})
+
+
+def get_headlines(db: Session, chapter_ids: List[int], q: str) -> Dict[int, str]:
+    """
+    Highlighted excerpts for a page of search results.
+
+    Block text is aggregated and passed through ts_headline in the
+    database, for the page's chapters only.
+
+    Args:
+        db: Database session
+        chapter_ids: Chapters on the current page
+        q: The user's search input
+
+    Returns:
+        Map of chapter id to excerpt, with matches wrapped in <mark>
+    """
+    if not chapter_ids:
+        return {}
+
+    body = db.query(
+        ChapterBlock.chapter_id.label("chapter_id"),
+        func.string_agg(
+            ChapterBlock.content["text"].as_string(),
+            aggregate_order_by(literal_column("' '"), ChapterBlock.position)
+        ).label("body")
+    ).filter(
+        ChapterBlock.chapter_id.in_(chapter_ids),
+        ChapterBlock.block_type.in_([BlockType.TEXT, BlockType.QUOTE])
+    ).group_by(ChapterBlock.chapter_id).subquery()
+
+    rows = db.query(
+        body.c.chapter_id,
+        func.ts_headline(search_config(), body.c.body, to_query(q), HEADLINE_OPTIONS)
+    ).all()
+
+    return {chapter_id: headline for chapter_id, headline in rows if headline}
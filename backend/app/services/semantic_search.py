@@ -0,0 +1,131 @@
+"""
+Semantic chapter search - nearest neighbours over chapter embeddings
+
+Queries run as a cosine-distance ORDER BY ... LIMIT k against the HNSW
+index on chapter_embeddings, so cost grows with log(corpus), not corpus.
+Hybrid mode fuses the vector ranking with the full-text ranking using
+reciprocal rank fusion (RRF), which needs no score normalisation.
+"""
+from typing import List, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, literal
+
+from app.models import Chapter, ChapterEmbedding
+from app.services.search_index import to_query
+
+# RRF damping constant - the value from the original RRF paper
+RRF_K = 60
+
+# Candidates taken from each ranking before fusion, as a multiple of k
+HYBRID_CANDIDATES = 4
+
+
+def set_ef_search(db: Session, ef_search: int) -> None:
+    """
+    Set the HNSW query-time candidate list for the current transaction.
+
+    Larger values improve recall at the cost of latency; it must be at
+    least k for the index to return k rows.
+    """
+    db.execute(select(func.set_config("hnsw.ef_search", str(ef_search), True)))
+
+
+def _semantic_candidates(embedding: List[float], limit: int):
+    """Nearest chapters by cosine distance, ranked 1..limit"""
+    distance = ChapterEmbedding.embedding.cosine_distance(embedding)
+    nearest = select(
+        ChapterEmbedding.chapter_id.label("chapter_id"),
+        distance.label("distance")
+    ).order_by(distance).limit(limit).subquery()
+
+    return select(
+        nearest.c.chapter_id,
+        nearest.c.distance,
+        func.row_number().over(order_by=nearest.c.distance).label("rank")
+    ).subquery()
+
+
+def semantic_ranking(
+    db: Session,
+    embedding: List[float],
+    k: int,
+    ef_search: int
+) -> List[Tuple[int, float]]:
+    """
+    Rank chapters by similarity to a query embedding.
+
+    Args:
+        db: Database session
+        embedding: Query embedding
+        k: Number of results
+        ef_search: HNSW candidate list size for this query
+
+    Returns:
+        (chapter_id, similarity) pairs, most similar first
+    """
+    set_ef_search(db, max(ef_search, k))
+
+    distance = ChapterEmbedding.embedding.cosine_distance(embedding)
+    rows = db.execute(
+        select(ChapterEmbedding.chapter_id, distance).order_by(distance).limit(k)
+    ).all()
+
+    return [(chapter_id, 1 - float(dist)) for chapter_id, dist in rows]
+
+
+def hybrid_ranking(
+    db: Session,
+    q: str,
+    embedding: List[float],
+    k: int,
+    ef_search: int
+) -> List[Tuple[int, float]]:
+    """
+    Rank chapters by fusing vector and full-text rankings.
+
+    Each side contributes 1 / (RRF_K + rank) for the chapters it
+    returns; chapters found by both rise to the top.
+
+    Args:
+        db: Database session
+        q: The user's search input
+        embedding: Query embedding
+        k: Number of results
+        ef_search: HNSW candidate list size for this query
+
+    Returns:
+        (chapter_id, fused score) pairs, best first
+    """
+    candidates = k * HYBRID_CANDIDATES
+    set_ef_search(db, max(ef_search, candidates))
+
+    semantic = _semantic_candidates(embedding, candidates)
+
+    tsquery = to_query(q)
+    text_rank = func.ts_rank(Chapter.search_vector, tsquery)
+    matches = select(
+        Chapter.id.label("chapter_id"),
+        text_rank.label("text_rank")
+    ).where(
+        Chapter.search_vector.op("@@")(tsquery)
+    ).order_by(text_rank.desc(), Chapter.id.desc()).limit(candidates).subquery()
+    lexical = select(
+        matches.c.chapter_id,
+        func.row_number().over(
+            order_by=(matches.c.text_rank.desc(), matches.c.chapter_id.desc())
+        ).label("rank")
+    ).subquery()
+
+    def rrf(rank):
+        return func.coalesce(literal(1.0) / (RRF_K + rank), 0.0)
+
+    score = (rrf(semantic.c.rank) + rrf(lexical.c.rank)).label("score")
+    chapter_id = func.coalesce(semantic.c.chapter_id, lexical.c.chapter_id).label("chapter_id")
+
+    rows = db.execute(
+        select(chapter_id, score).select_from(
+            semantic.join(lexical, semantic.c.chapter_id == lexical.c.chapter_id, full=True)
+        ).order_by(score.desc(), chapter_id.desc()).limit(k)
+    ).all()
+
+    return [(cid, float(s)) for cid, s in rows]
@@ -0,0 +1,97 @@
+"""Bookshelf spines - followed Books with per-reader unread counts"""
+from datetime import datetime, timezone
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import func, and_, or_, desc
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models import User, Book, Chapter, Follow, ReadCursor
+
+
+def get_spines(db: Session, reader_id: int) -> List:
+    """
+    Get every followed Book with its unread count and last chapter time.
+
+    One grouped query: follows -> followed user's Book -> their chapters,
+    with the reader's cursor outer-joined so unread chapters are counted
+    in the database. Sorted by most recent chapter first.
+
+    Args:
+        db: Database session
+        reader_id: The reader whose bookshelf to build
+
+    Returns:
+        Rows with book_id, user_id, username, display_name,
+        unread_count and last_chapter_at
+    """
+    last_chapter_at = func.max(Chapter.published_at).label("last_chapter_at")
+    unread_count = func.count(Chapter.id).filter(
+        or_(
+            ReadCursor.last_read_at.is_(None),
+            Chapter.published_at > ReadCursor.last_read_at
+        )
+    ).label("unread_count")
+
+    return db.query(
+        Book.id.label("book_id"),
+        User.id.label("user_id"),
+        User.username,
+        Book.display_name,
+        unread_count,
+        last_chapter_at
+    ).select_from(Follow).join(
+        User, User.id == Follow.followed_id
+    ).join(
+        Book, Book.user_id == Follow.followed_id
+    ).outerjoin(
+        Chapter, Chapter.author_id == Follow.followed_id
+    ).outerjoin(
+        ReadCursor, and_(
+            ReadCursor.reader_id == Follow.follower_id,
+            ReadCursor.book_id == Book.id
+        )
+    ).filter(
+        Follow.follower_id == reader_id
+    ).group_by(
+        Book.id, User.id, User.username, Book.display_name, ReadCursor.last_read_at
+    ).order_by(
+        desc(last_chapter_at).nulls_last(), Book.id
+    ).all()
+
+
+def advance_read_cursor(
+    db: Session,
+    reader_id: int,
+    book_id: int,
+    read_at: Optional[datetime] = None
+) -> None:
+    """
+    Move a reader's cursor for a Book forward to read_at.
+
+    The cursor never moves backwards, so reading an older chapter
+    does not resurrect newer ones as unread. Caller commits.
+
+    Args:
+        db: Database session
+        reader_id: The reader
+        book_id: The Book being read
+        read_at: Read everything up to this moment (defaults to now)
+    """
+    now = datetime.now(timezone.utc)
+    read_at = read_at or now
+
+    stmt = insert(ReadCursor).values(
+        reader_id=reader_id,
+        book_id=book_id,
+        last_read_at=read_at,
+        created_at=now,
+        updated_at=now
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_read_cursor_reader_book",
+        set_={
+            "last_read_at": func.greatest(ReadCursor.last_read_at, stmt.excluded.last_read_at),
+            "updated_at": now
+        }
+    )
+    db.execute(stmt)
@@ -0,0 +1,24 @@
+"""Server-Sent Events helpers"""
+import json
+from typing import Any, Optional
+
+# Keep proxies from buffering or caching event streams
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse_event(data: Any, event: Optional[str] = None, id: Optional[str] = None) -> str:
+    """
+    Format one SSE message.
+
+    `data` is JSON-encoded, so it always fits on a single data line.
+    """
+    lines = []
+    if id is not None:
+        lines.append(f"id: {id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
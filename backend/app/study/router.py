@@ -13,6 +13,9 @@ from app.study.schemas import (
 )
 from app.services.open_pages import consume_open_page, can_publish
 from app.services.muse_progression import award_xp
+from app.services.feed import push_chapter
+from app.services.search_index import refresh_search_document
+from app.services.embedding_queue import queue_chapter_embedding
 
 router = APIRouter(prefix="/study", tags=["Study"])
 
@@ -228,9 +231,17 @@ async def promote_draft(
     # Award XP for publishing
     xp_result = award_xp(db, current_user, "publish_chapter")
     
+    db.flush()
+    refresh_search_document(db, chapter.id)
     db.commit()
     db.refresh(chapter)
     
+    # Push into followers' New Chapters feeds
+    push_chapter(db, chapter)
+    
+    # Queue embedding generation (batched by the job worker)
+    queue_chapter_embedding(chapter.id)
+    
     return chapter
 
 
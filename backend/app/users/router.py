@@ -5,7 +5,7 @@ from typing import Optional
 
 from app.database import get_db
 from app.models import User, Book
-from app.auth.security import get_current_user, get_password_hash, verify_password
+from app.auth.security import get_current_user, get_password_hash_async, verify_password_async
 from app.users.schemas import PasswordUpdate, BookProfileUpdate, BookProfileResponse
 from app.media.service import (
     validate_content_type, generate_media_key,
@@ -28,14 +28,14 @@ async def update_password(
     - Updates to new password
     """
     # Verify current password
-    if not verify_password(password_data.current_password, current_user.password_hash):
+    if not await verify_password_async(password_data.current_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
     
     # Update password
-    current_user.password_hash = get_password_hash(password_data.new_password)
+    current_user.password_hash = await get_password_hash_async(password_data.new_password)
     db.commit()
     
     return {"message": "Password updated successfully"}
@@ -0,0 +1,82 @@
+"""
+Backfill chapter embeddings.
+
+Walks every chapter in id order and embeds the ones whose text hash is
+missing or out of date, in batched embedding requests. Progress is
+checkpointed after each page, so an interrupted run resumes where it
+stopped.
+
+Run with: poetry run python scripts/backfill_embeddings.py
+Or in Docker: docker exec chapters-backend python scripts/backfill_embeddings.py
+
+Options:
+    --page-size N       Chapters per page (default 500)
+    --checkpoint PATH   Checkpoint file (default .backfill_embeddings.checkpoint)
+    --restart           Ignore the checkpoint and start from the first chapter
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from app.database import SessionLocal
+from app.models.chapter import Chapter
+from app.muse.embeddings import embed_chapters
+
+
+def read_checkpoint(path: Path) -> int:
+    """Last chapter id fully processed (0 if none)"""
+    try:
+        return int(path.read_text().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def write_checkpoint(path: Path, last_id: int) -> None:
+    """Atomically record the last chapter id fully processed"""
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(str(last_id))
+    tmp.replace(path)
+
+
+def backfill(page_size: int, checkpoint: Path, restart: bool) -> None:
+    last_id = 0 if restart else read_checkpoint(checkpoint)
+    db = SessionLocal()
+
+    try:
+        remaining = db.query(Chapter).filter(Chapter.id > last_id).count()
+        print(f"🔄 Backfilling embeddings for {remaining} chapter(s) after id {last_id}...")
+
+        seen = embedded = 0
+        started = time.monotonic()
+
+        while True:
+            chapter_ids = [
+                row[0] for row in db.query(Chapter.id).filter(
+                    Chapter.id > last_id
+                ).order_by(Chapter.id).limit(page_size).all()
+            ]
+            if not chapter_ids:
+                break
+
+            embedded += embed_chapters(db, chapter_ids)
+            seen += len(chapter_ids)
+            last_id = chapter_ids[-1]
+            write_checkpoint(checkpoint, last_id)
+
+            elapsed = time.monotonic() - started
+            print(f"   {seen}/{remaining} checked, {embedded} embedded (last id {last_id}, {elapsed:.0f}s)")
+
+        print(f"✅ Done: {embedded} of {seen} chapter(s) embedded")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill chapter embeddings")
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--checkpoint", type=Path, default=Path(".backfill_embeddings.checkpoint"))
+    parser.add_argument("--restart", action="store_true")
+    args = parser.parse_args()
+
+    backfill(args.page_size, args.checkpoint, args.restart)
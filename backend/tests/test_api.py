@@ -32,19 +32,20 @@ def test_health_endpoint():
     print(f"   Response: {data}")
 
 if __name__ == "__main__":
-    print("🧪 Testing API endpoints...\n")
-    
-    try:
-        test_root_endpoint()
-        test_health_endpoint()
+    with client:
+        print("🧪 Testing API endpoints...\n")
         
-        print("\n🎉 All API tests passed!")
-        print("\n📝 API is ready! You can start it with:")
-        print("   cd backend")
-        print("   python -m uvicorn app.main:app --reload")
-        print("\n   Then visit: http://localhost:8000/docs")
-        
-    except Exception as e:
-        print(f"\n❌ Test failed: {e}")
-        import traceback
-        traceback.print_exc()
+        try:
+            test_root_endpoint()
+            test_health_endpoint()
+            
+            print("\n🎉 All API tests passed!")
+            print("\n📝 API is ready! You can start it with:")
+            print("   cd backend")
+            print("   python -m uvicorn app.main:app --reload")
+            print("\n   Then visit: http://localhost:8000/docs")
+            
+        except Exception as e:
+            print(f"\n❌ Test failed: {e}")
+            import traceback
+            traceback.print_exc()
@@ -204,46 +204,76 @@ def test_password_hashing():
         db.close()
 
 
-if __name__ == "__main__":
-    print("🧪 Running authentication tests...\n")
-    print("=" * 60)
+def test_password_rehash_on_login():
+    """Test that a hash at an outdated bcrypt cost is upgraded on login"""
+    print("\n🧪 Testing password cost upgrade...")
+    
+    import bcrypt
+    from app.config import settings
     
+    db = SessionLocal()
     try:
-        # Run tests in order
-        access_token = test_user_registration()
-        test_duplicate_registration()
-        access_token, refresh_token = test_user_login()  # Use token from login
-        test_get_current_user(access_token)
-        test_token_refresh(refresh_token)
-        test_invalid_token()
-        test_password_hashing()
+        user = db.query(User).filter(User.email == "testuser@example.com").first()
+        user.password_hash = bcrypt.hashpw(b"SecurePassword123!", bcrypt.gensalt(rounds=4)).decode("utf-8")
+        db.commit()
         
-        print("\n" + "=" * 60)
-        print("🎉 All authentication tests passed!")
-        print("\n📝 Authentication system is ready!")
-        print("\nYou can now:")
-        print("  1. Register users: POST /auth/register")
-        print("  2. Login: POST /auth/login")
-        print("  3. Get user info: GET /auth/me")
-        print("  4. Refresh tokens: POST /auth/refresh")
+        response = client.post("/auth/login", json={
+            "email": "testuser@example.com",
+            "password": "SecurePassword123!"
+        })
+        assert response.status_code == 200
         
-        # Clean up
-        print("\n🧹 Cleaning up test data...")
-        cleanup_test_user("testuser@example.com")
-        print("✅ Cleanup complete!")
+        db.expire_all()
+        user = db.query(User).filter(User.email == "testuser@example.com").first()
+        assert user.password_hash.startswith(f"$2b${settings.bcrypt_rounds:02d}$")
         
-    except AssertionError as e:
-        print(f"\n❌ Test failed: {e}")
-        import traceback
-        traceback.print_exc()
+        print("✅ Outdated hash upgraded on login!")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    with client:
+        print("🧪 Running authentication tests...\n")
+        print("=" * 60)
         
-        # Clean up on failure too
-        cleanup_test_user("testuser@example.com")
-    
-    except Exception as e:
-        print(f"\n❌ Unexpected error: {e}")
-        import traceback
-        traceback.print_exc()
+        try:
+            # Run tests in order
+            access_token = test_user_registration()
+            test_duplicate_registration()
+            access_token, refresh_token = test_user_login()  # Use token from login
+            test_get_current_user(access_token)
+            test_token_refresh(refresh_token)
+            test_invalid_token()
+            test_password_hashing()
+            test_password_rehash_on_login()
+            
+            print("\n" + "=" * 60)
+            print("🎉 All authentication tests passed!")
+            print("\n📝 Authentication system is ready!")
+            print("\nYou can now:")
+            print("  1. Register users: POST /auth/register")
+            print("  2. Login: POST /auth/login")
+            print("  3. Get user info: GET /auth/me")
+            print("  4. Refresh tokens: POST /auth/refresh")
+            
+            # Clean up
+            print("\n🧹 Cleaning up test data...")
+            cleanup_test_user("testuser@example.com")
+            print("✅ Cleanup complete!")
+            
+        except AssertionError as e:
+            print(f"\n❌ Test failed: {e}")
+            import traceback
+            traceback.print_exc()
+            
+            # Clean up on failure too
+            cleanup_test_user("testuser@example.com")
         
-        # Clean up on failure too
-        cleanup_test_user("testuser@example.com")
+        except Exception as e:
+            print(f"\n❌ Unexpected error: {e}")
+            import traceback
+            traceback.print_exc()
+            
+            # Clean up on failure too
+            cleanup_test_user("testuser@example.com")
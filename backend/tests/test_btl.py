@@ -117,6 +117,8 @@ def test_btl_eligibility():
     )
     assert response.status_code == 400
     assert "follow each other" in response.json()["detail"]
+    # Every failing requirement is reported at once
+    assert "3 published chapters" in response.json()["detail"]
     
     print("✅ Mutual follow requirement enforced")
     
@@ -130,6 +132,8 @@ def test_btl_eligibility():
         headers={"Authorization": f"Bearer {token1}"}
     )
     assert response.status_code == 400
+    # The follows invalidated the cached edges from the first attempt
+    assert "follow each other" not in response.json()["detail"]
     assert "3 published chapters" in response.json()["detail"]
     
     print("✅ Chapter minimum requirement enforced")
@@ -138,6 +142,15 @@ def test_btl_eligibility():
     create_chapters_for_user(token1, 3)
     create_chapters_for_user(token2, 3)
     
+    db = SessionLocal()
+    try:
+        user2 = db.get(User, user2_id)
+        assert user2.published_chapter_count == 3
+    finally:
+        db.close()
+    
+    print("✅ Published chapter counts maintained")
+    
     print("✅ BTL eligibility requirements working!")
     
     return token1, token2, user2_id
@@ -294,6 +307,98 @@ def test_send_messages(token1: str, token2: str, thread_id: int):
     print(f"✅ Retrieved {len(messages)} message(s)")
 
 
+def test_message_sync(token1: str, token2: str, thread_id: int):
+    """Test thread summaries, message paging and delta sync"""
+    print("\n🧪 Testing message paging and sync...")
+    
+    # User 2 sends five more; user 1 read up to the first two
+    for i in range(5):
+        response = client.post(
+            f"/between-the-lines/threads/{thread_id}/messages",
+            json={"content": f"Follow-up {i + 1}"},
+            headers={"Authorization": f"Bearer {token2}"}
+        )
+        assert response.status_code == 201
+    
+    response = client.get(
+        "/between-the-lines/threads",
+        headers={"Authorization": f"Bearer {token1}"}
+    )
+    assert response.status_code == 200
+    thread = response.json()[0]
+    assert thread["unread_count"] == 5
+    assert thread["last_message"]["content"] == "Follow-up 5"
+    assert thread["last_message_at"] == thread["last_message"]["created_at"]
+    
+    print("✅ Thread list shows last message and unread count")
+    
+    # Latest page, oldest first, with a cursor to page back
+    response = client.get(
+        f"/between-the-lines/threads/{thread_id}/messages?limit=3",
+        headers={"Authorization": f"Bearer {token1}"}
+    )
+    assert response.status_code == 200
+    latest = response.json()
+    assert [m["content"] for m in latest] == ["Follow-up 3", "Follow-up 4", "Follow-up 5"]
+    cursor = response.headers["X-Next-Cursor"]
+    assert cursor == str(latest[0]["id"])
+    
+    response = client.get(
+        f"/between-the-lines/threads/{thread_id}/messages?limit=3&before={cursor}",
+        headers={"Authorization": f"Bearer {token1}"}
+    )
+    older = response.json()
+    assert [m["content"] for m in older] == [
+        "Thank you! I really enjoyed your latest chapter too.", "Follow-up 1", "Follow-up 2"
+    ]
+    assert "X-Next-Cursor" in response.headers
+    
+    # Forward from a known message
+    response = client.get(
+        f"/between-the-lines/threads/{thread_id}/messages?after={older[-1]['id']}",
+        headers={"Authorization": f"Bearer {token1}"}
+    )
+    assert [m["id"] for m in response.json()] == [m["id"] for m in latest]
+    assert "X-Next-Cursor" not in response.headers
+    
+    # A cursor that is not a message in this thread is rejected
+    response = client.get(
+        f"/between-the-lines/threads/{thread_id}/messages?before=999999999",
+        headers={"Authorization": f"Bearer {token1}"}
+    )
+    assert response.status_code == 400
+    
+    print("✅ Cursor paging works both ways")
+    
+    # Reading the latest page cleared the unread count
+    response = client.get(
+        "/between-the-lines/threads",
+        headers={"Authorization": f"Bearer {token1}"}
+    )
+    assert response.json()[0]["unread_count"] == 0
+    
+    # Delta sync from the last message seen
+    response = client.post(
+        f"/between-the-lines/threads/{thread_id}/messages",
+        json={"content": "One more thing"},
+        headers={"Authorization": f"Bearer {token2}"}
+    )
+    response = client.get(
+        f"/between-the-lines/threads/{thread_id}/messages",
+        params={"since": latest[-1]["created_at"]},
+        headers={"Authorization": f"Bearer {token1}"}
+    )
+    assert [m["content"] for m in response.json()] == ["One more thing"]
+    
+    response = client.get(
+        f"/between-the-lines/threads/{thread_id}/messages?before=1&after=1",
+        headers={"Authorization": f"Bearer {token1}"}
+    )
+    assert response.status_code == 400
+    
+    print("✅ Delta sync returns only new messages")
+
+
 def test_pin_chapter(token1: str, thread_id: int):
     """Test pinning a chapter"""
     print("\n🧪 Testing chapter pinning...")
@@ -359,44 +464,47 @@ def test_close_thread(token1: str, thread_id: int):
 
 
 if __name__ == "__main__":
-    print("🧪 Running Between the Lines tests...\n")
-    print("=" * 60)
-    
-    try:
-        token1, token2, user2_id = test_btl_eligibility()
-        invite_id = test_btl_invite(token1, token2, user2_id)
-        test_list_invites(token2)
-        thread_id = test_accept_invite(token2, invite_id)
-        test_list_threads(token1, token2)
-        test_send_messages(token1, token2, thread_id)
-        test_pin_chapter(token1, thread_id)
-        test_close_thread(token1, thread_id)
-        
-        print("\n" + "=" * 60)
-        print("🎉 All tests passed!")
-        print("\n📝 Between the Lines ready!")
-        print("\nFeatures working:")
-        print("  ✅ Eligibility checks (mutual follow, 3+ chapters)")
-        print("  ✅ BTL invites with note/quoted line")
-        print("  ✅ Invite acceptance creates thread")
-        print("  ✅ Private messaging between participants")
-        print("  ✅ Chapter pinning in threads")
-        print("  ✅ Thread closure")
-        print("  ✅ Closed thread message prevention")
-        print("  ✅ Rate limiting (3 invites/day)")
+    with client:
+        print("🧪 Running Between the Lines tests...\n")
+        print("=" * 60)
         
-        print("\n🧹 Cleaning up test data...")
-        cleanup_test_data()
-        print("✅ Cleanup complete!")
+        try:
+            token1, token2, user2_id = test_btl_eligibility()
+            invite_id = test_btl_invite(token1, token2, user2_id)
+            test_list_invites(token2)
+            thread_id = test_accept_invite(token2, invite_id)
+            test_list_threads(token1, token2)
+            test_send_messages(token1, token2, thread_id)
+            test_message_sync(token1, token2, thread_id)
+            test_pin_chapter(token1, thread_id)
+            test_close_thread(token1, thread_id)
+            
+            print("\n" + "=" * 60)
+            print("🎉 All tests passed!")
+            print("\n📝 Between the Lines ready!")
+            print("\nFeatures working:")
+            print("  ✅ Eligibility checks (mutual follow, 3+ chapters)")
+            print("  ✅ BTL invites with note/quoted line")
+            print("  ✅ Invite acceptance creates thread")
+            print("  ✅ Private messaging between participants")
+            print("  ✅ Message paging, delta sync and unread counts")
+            print("  ✅ Chapter pinning in threads")
+            print("  ✅ Thread closure")
+            print("  ✅ Closed thread message prevention")
+            print("  ✅ Rate limiting (3 invites/day)")
+            
+            print("\n🧹 Cleaning up test data...")
+            cleanup_test_data()
+            print("✅ Cleanup complete!")
+            
+        except AssertionError as e:
+            print(f"\n❌ Test failed: {e}")
+            import traceback
+            traceback.print_exc()
+            cleanup_test_data()
         
-    except AssertionError as e:
-        print(f"\n❌ Test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        cleanup_test_data()
-    
-    except Exception as e:
-        print(f"\n❌ Unexpected error: {e}")
-        import traceback
-        traceback.print_exc()
-        cleanup_test_data()
+        except Exception as e:
+            print(f"\n❌ Unexpected error: {e}")
+            import traceback
+            traceback.print_exc()
+            cleanup_test_data()
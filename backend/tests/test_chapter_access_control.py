@@ -2,17 +2,18 @@
 import sys
 import os
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, AsyncMock
 from fastapi.testclient import TestClient
 from datetime import datetime, timezone
+from types import SimpleNamespace
 
 backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, backend_dir)
 
 from app.main import app
-from app.database import get_db
-from app.auth.security import get_current_user
-from app.models import User, Book, Follow, Chapter, ChapterBlock, Heart, Bookmark
+from app.database import get_async_db
+from app.auth.security import get_current_user_async, get_read_db, get_current_principal
+from app.models import User, Chapter
 
 client = TestClient(app)
 
@@ -24,7 +25,31 @@ CHAPTER_ID = 500
 
 @pytest.fixture
 def mock_db():
-    return MagicMock()
+    db = MagicMock()
+
+    # get_chapter reads one overlay row (version, counters, the viewer's
+    # flags), then the chapter itself on a cache miss. Privacy is resolved
+    # in SQL, so each test sets the row the query would return for its
+    # viewer.
+    db.view = None
+    db.chapter = None
+
+    async def execute(stmt):
+        result = MagicMock()
+        result.first.return_value = db.view
+        result.unique.return_value.scalar_one_or_none.return_value = db.chapter
+        return result
+
+    db.execute = execute
+    db.commit = AsyncMock()
+    return db
+
+@pytest.fixture
+def record_read(monkeypatch):
+    """Read cursor writes are buffered in Redis; capture them instead"""
+    record = MagicMock()
+    monkeypatch.setattr("app.chapters.router.record_read", record)
+    return record
 
 @pytest.fixture
 def mock_current_user():
@@ -45,6 +70,7 @@ def mock_chapter():
     chapter.heart_count = 0
     chapter.published_at = datetime.now(timezone.utc)
     chapter.edit_window_expires = datetime.now(timezone.utc)
+    chapter.updated_at = chapter.published_at
     chapter.blocks = []
 
     chapter.author.username = "author"
@@ -54,102 +80,65 @@ def mock_chapter():
 
 @pytest.fixture
 def setup_overrides(mock_db, mock_current_user):
-    app.dependency_overrides[get_db] = lambda: mock_db
-    app.dependency_overrides[get_current_user] = lambda: mock_current_user
+    app.dependency_overrides[get_async_db] = lambda: mock_db
+    app.dependency_overrides[get_current_user_async] = lambda: mock_current_user
+    app.dependency_overrides[get_read_db] = lambda: mock_db
+    app.dependency_overrides[get_current_principal] = lambda: mock_current_user
     yield
     app.dependency_overrides = {}
 
-def test_access_own_private_chapter(mock_db, mock_current_user, mock_chapter, setup_overrides):
+def _view(chapter, is_hearted=False, readable=True, follows_author=False):
+    """The overlay row the query returns"""
+    return SimpleNamespace(
+        updated_at=chapter.updated_at,
+        heart_count=chapter.heart_count,
+        author_id=chapter.author_id,
+        published_at=chapter.published_at,
+        book_id=1,
+        is_hearted=is_hearted,
+        is_bookmarked=False,
+        readable=readable,
+        follows_author=follows_author
+    )
+
+def test_access_own_private_chapter(mock_db, mock_current_user, mock_chapter, record_read, setup_overrides):
     """Test that author can access their own private chapter"""
     mock_current_user.id = AUTHOR_ID
-
-    # Mock Book Query
-    mock_book = MagicMock(spec=Book)
-    mock_book.user_id = AUTHOR_ID
-    mock_book.is_private = True
-
-    # Define query side effects
-    def query_side_effect(model):
-        query = MagicMock()
-        if model == Chapter:
-            # Return chapter if ID matches
-            query.filter.return_value.first.return_value = mock_chapter
-        elif model == Book:
-            query.filter.return_value.first.return_value = mock_book
-        elif model == Heart:
-             query.filter.return_value.first.return_value = None
-        elif model == Bookmark:
-             query.filter.return_value.first.return_value = None
-        else:
-            query.filter.return_value.first.return_value = None
-        return query
-
-    mock_db.query.side_effect = query_side_effect
+    mock_db.view, mock_db.chapter = _view(mock_chapter), mock_chapter
 
     response = client.get(f"/chapters/{CHAPTER_ID}")
 
     assert response.status_code == 200
     assert response.json()["id"] == CHAPTER_ID
+    # Authors do not move their own read cursor
+    record_read.assert_not_called()
 
-def test_access_private_chapter_as_follower(mock_db, mock_current_user, mock_chapter, setup_overrides):
+def test_access_private_chapter_as_follower(mock_db, mock_current_user, mock_chapter, record_read, setup_overrides):
     """Test that follower can access private chapter"""
     mock_current_user.id = FOLLOWER_ID
-
-    # Mock Book (Private)
-    mock_book = MagicMock(spec=Book)
-    mock_book.user_id = AUTHOR_ID
-    mock_book.is_private = True
-
-    # Mock Follow (Exists)
-    mock_follow = MagicMock(spec=Follow)
-
-    def query_side_effect(model):
-        query = MagicMock()
-        if model == Chapter:
-            query.filter.return_value.first.return_value = mock_chapter
-        elif model == Book:
-            query.filter.return_value.first.return_value = mock_book
-        elif model == Follow:
-            query.filter.return_value.first.return_value = mock_follow # Follow exists
-        elif model == Heart:
-             query.filter.return_value.first.return_value = None
-        elif model == Bookmark:
-             query.filter.return_value.first.return_value = None
-        return query
-
-    mock_db.query.side_effect = query_side_effect
+    mock_db.view, mock_db.chapter = _view(mock_chapter, is_hearted=True, follows_author=True), mock_chapter
 
     response = client.get(f"/chapters/{CHAPTER_ID}")
 
     assert response.status_code == 200
+    assert response.json()["is_hearted"] is True
+    record_read.assert_called_once()
 
-def test_access_private_chapter_as_stranger(mock_db, mock_current_user, mock_chapter, setup_overrides):
+def test_access_private_chapter_as_stranger(mock_db, mock_current_user, mock_chapter, record_read, setup_overrides):
     """Test that stranger cannot access private chapter"""
     mock_current_user.id = STRANGER_ID
-
-    # Mock Book (Private)
-    mock_book = MagicMock(spec=Book)
-    mock_book.user_id = AUTHOR_ID
-    mock_book.is_private = True
-
-    def query_side_effect(model):
-        query = MagicMock()
-        if model == Chapter:
-            query.filter.return_value.first.return_value = mock_chapter
-        elif model == Book:
-            query.filter.return_value.first.return_value = mock_book
-        elif model == Follow:
-            # Ensure follow query returns nothing
-            query.filter.return_value.first.return_value = None
-        elif model == Heart:
-             query.filter.return_value.first.return_value = None
-        elif model == Bookmark:
-             query.filter.return_value.first.return_value = None
-        return query
-
-    mock_db.query.side_effect = query_side_effect
+    mock_db.view, mock_db.chapter = _view(mock_chapter, readable=False), mock_chapter
 
     response = client.get(f"/chapters/{CHAPTER_ID}")
 
     # Expect 403 Forbidden
     assert response.status_code == 403, f"Expected 403, got {response.status_code}"
+    record_read.assert_not_called()
+
+def test_missing_chapter(mock_db, mock_current_user, setup_overrides):
+    """Test that an unknown chapter is a 404"""
+    mock_db.view = None
+
+    response = client.get(f"/chapters/{CHAPTER_ID}")
+
+    assert response.status_code == 404
@@ -127,6 +127,77 @@ def test_heart_chapter():
     return token1, token2
 
 
+def test_heart_count_flush(token1: str, token2: str):
+    """Test write-behind heart counts: idempotent hearts, clamping, reconciliation"""
+    print("\n🧪 Testing heart count flush and reconciliation...")
+    
+    from app.models import Chapter
+    from app.redis_client import redis_client
+    from app.services.heart_counts import DELTAS_KEY, apply_deltas, reconcile
+    
+    chapter_id = create_chapter(token2, "Counted Chapter")
+    
+    def heart_count():
+        db = SessionLocal()
+        try:
+            return db.get(Chapter, chapter_id).heart_count
+        finally:
+            db.close()
+    
+    # Hearting twice returns the existing heart and counts it once
+    first = client.post(
+        f"/engagement/chapters/{chapter_id}/heart",
+        headers={"Authorization": f"Bearer {token1}"}
+    )
+    second = client.post(
+        f"/engagement/chapters/{chapter_id}/heart",
+        headers={"Authorization": f"Bearer {token1}"}
+    )
+    assert first.status_code == second.status_code == 201
+    assert second.json()["id"] == first.json()["id"]
+    assert redis_client.hget(DELTAS_KEY, chapter_id) in (None, b"0")
+    assert heart_count() == 1
+    
+    print("✅ Double heart counted once")
+    
+    # A decrement past zero is clamped and reported for reconciliation
+    db = SessionLocal()
+    try:
+        assert apply_deltas(db, {chapter_id: -5}) == [chapter_id]
+        assert apply_deltas(db, {chapter_id: 2}) == []
+        assert apply_deltas(db, {chapter_id: -2}) == [chapter_id]
+        db.commit()
+    finally:
+        db.close()
+    assert heart_count() == 0
+    
+    print("✅ Flush clamps at zero and returns suspect chapters")
+    
+    # Reconciliation recounts hearts, less deltas still pending in Redis
+    db = SessionLocal()
+    try:
+        assert reconcile(db, [chapter_id]) == 1
+        db.commit()
+        assert heart_count() == 1
+        
+        redis_client.hincrby(DELTAS_KEY, chapter_id, 1)
+        try:
+            assert reconcile(db, [chapter_id]) == 1
+            db.commit()
+            assert heart_count() == 0
+        finally:
+            redis_client.hincrby(DELTAS_KEY, chapter_id, -1)
+        
+        assert reconcile(db, [chapter_id]) == 1
+        assert reconcile(db, [chapter_id]) == 0
+        db.commit()
+    finally:
+        db.close()
+    assert heart_count() == 1
+    
+    print("✅ Reconcile counts hearts net of pending deltas")
+
+
 def test_follow_book(token1: str, token2: str):
     """Test following a book"""
     print("\n🧪 Testing follow functionality...")
@@ -216,6 +287,84 @@ def test_bookmark_chapter(token1: str, token2: str):
     print("✅ Bookmark deleted successfully!")
 
 
+def test_shelf_and_batch_status(token1: str, token2: str):
+    """Test the paginated shelf and batch status endpoints"""
+    print("\n🧪 Testing shelf and batch status...")
+    
+    book2_id = get_book_id(token2)
+    chapter_id = create_chapter(token2, "Status Chapter")
+    
+    # User 1 shelves User 2's book and hearts the chapter
+    response = client.post(
+        f"/engagement/books/{book2_id}/shelf",
+        headers={"Authorization": f"Bearer {token1}"}
+    )
+    assert response.status_code == 201
+    response = client.post(
+        f"/engagement/chapters/{chapter_id}/heart",
+        headers={"Authorization": f"Bearer {token1}"}
+    )
+    assert response.status_code == 201
+    
+    response = client.get(
+        "/engagement/shelf?per_page=1",
+        headers={"Authorization": f"Bearer {token1}"}
+    )
+    assert response.status_code == 200
+    shelf = response.json()
+    assert len(shelf) == 1
+    assert shelf[0]["id"] == book2_id
+    assert shelf[0]["username"] == "engage2"
+    assert "X-Next-Cursor" not in response.headers
+    
+    print("✅ Shelf listed with Book and owner")
+    
+    book1_id = get_book_id(token1)
+    response = client.get(
+        f"/engagement/shelf/status?book_ids={book1_id},{book2_id},999999999",
+        headers={"Authorization": f"Bearer {token1}"}
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        str(book1_id): {"on_shelf": False},
+        str(book2_id): {"on_shelf": True}
+    }
+    
+    print("✅ Batch shelf status")
+    
+    response = client.get(
+        f"/engagement/status?chapter_ids={chapter_id},999999999",
+        headers={"Authorization": f"Bearer {token1}"}
+    )
+    assert response.status_code == 200
+    assert response.json() == {str(chapter_id): {"is_hearted": True, "is_bookmarked": False}}
+    
+    response = client.post(
+        f"/engagement/chapters/{chapter_id}/bookmark",
+        headers={"Authorization": f"Bearer {token1}"}
+    )
+    assert response.status_code == 201
+    response = client.get(
+        f"/engagement/status?chapter_ids={chapter_id}",
+        headers={"Authorization": f"Bearer {token1}"}
+    )
+    assert response.json() == {str(chapter_id): {"is_hearted": True, "is_bookmarked": True}}
+    
+    response = client.get(
+        "/engagement/status?chapter_ids=1,two",
+        headers={"Authorization": f"Bearer {token1}"}
+    )
+    assert response.status_code == 400
+    
+    print("✅ Batch heart/bookmark status")
+    
+    response = client.delete(
+        f"/engagement/books/{book2_id}/shelf",
+        headers={"Authorization": f"Bearer {token1}"}
+    )
+    assert response.status_code == 204
+
+
 def test_margins(token1: str, token2: str):
     """Test margin (comment) functionality"""
     print("\n🧪 Testing margin functionality...")
@@ -300,48 +449,188 @@ def test_margin_rate_limit(token1: str, token2: str):
     )
     assert response.status_code == 429
     assert "Rate limit exceeded" in response.json()["detail"]
+    assert int(response.headers["Retry-After"]) > 0
     
     print("✅ Rate limit enforced (21st margin blocked)!")
 
 
-if __name__ == "__main__":
-    print("🧪 Running Engagement System tests...\n")
-    print("=" * 60)
+def test_notification_stream(token1: str, token2: str):
+    """Test notifications are pushed to an open stream and replayed on reconnect"""
+    print("\n🧪 Testing notification stream...")
+    
+    import asyncio
+    from app.models import NotificationType
+    from app.services.notification_service import create_notification
+    from app.services.notification_stream import notification_events
+    
+    user1_id = client.get("/auth/me", headers={"Authorization": f"Bearer {token1}"}).json()["id"]
+    user2_id = client.get("/auth/me", headers={"Authorization": f"Bearer {token2}"}).json()["id"]
+    
+    def notify():
+        db = SessionLocal()
+        try:
+            return create_notification(
+                db, user1_id, NotificationType.SHELF_ADD, "Your Book found a place on someone's Shelf.",
+                actor_id=user2_id
+            ).id
+        finally:
+            db.close()
+    
+    async def next_event(events):
+        return await asyncio.wait_for(events.__anext__(), timeout=5)
+    
+    async def run():
+        # Live delivery
+        events = notification_events(user1_id)
+        assert "event: unread" in await next_event(events)
+        notification_id = await asyncio.to_thread(notify)
+        event = await next_event(events)
+        assert f"id: {notification_id}" in event and "event: notification" in event
+        await events.aclose()
+        
+        # Resume from the event before it
+        events = notification_events(user1_id, last_event_id=notification_id - 1)
+        await next_event(events)
+        assert f"id: {notification_id}" in await next_event(events)
+        await events.aclose()
+    
+    asyncio.run(run())
+    
+    print("✅ Notification pushed live and replayed from Last-Event-ID!")
+
+
+def test_unread_count(token1: str, token2: str):
+    """Test the unread badge follows creates and reads, and reconciles"""
+    print("\n🧪 Testing unread notification count...")
+    
+    from app.models import NotificationType
+    from app.services.notification_service import create_notification, reconcile_unread_counts
+    
+    headers = {"Authorization": f"Bearer {token1}"}
+    user1_id = client.get("/auth/me", headers=headers).json()["id"]
+    user2_id = client.get("/auth/me", headers={"Authorization": f"Bearer {token2}"}).json()["id"]
     
+    client.post("/notifications/mark-all-read", headers=headers)
+    db = SessionLocal()
+    try:
+        ids = [
+            create_notification(db, user1_id, NotificationType.SHELF_ADD, "Your Book found a place on someone's Shelf.", actor_id=user2_id).id
+            for _ in range(3)
+        ]
+    finally:
+        db.close()
+    
+    assert client.get("/notifications/unread-count", headers=headers).json()["count"] == 3
+    
+    # Marking the same notification twice counts once
+    client.post(f"/notifications/{ids[0]}/read", headers=headers)
+    client.post(f"/notifications/{ids[0]}/read", headers=headers)
+    assert client.get("/notifications/unread-count", headers=headers).json()["count"] == 2
+    
+    print("✅ Unread count follows new and read notifications!")
+    
+    # Drift is repaired by reconciliation
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.id == user1_id).update({User.unread_notification_count: 40})
+        db.commit()
+        assert reconcile_unread_counts(db) >= 1
+        db.commit()
+    finally:
+        db.close()
+    assert client.get("/notifications/unread-count", headers=headers).json()["count"] == 2
+    
+    client.post("/notifications/mark-all-read", headers=headers)
+    assert client.get("/notifications/unread-count", headers=headers).json()["count"] == 0
+    
+    print("✅ Drifted unread count reconciled!")
+
+
+def test_notification_coalescing(token1: str, token2: str):
+    """Test buffered events about the same thing become one notification"""
+    print("\n🧪 Testing notification coalescing...")
+    
+    from app.models import Notification
+    from app.services.notification_service import write_notifications
+    
+    headers = {"Authorization": f"Bearer {token1}"}
+    user1_id = client.get("/auth/me", headers=headers).json()["id"]
+    user2_id = client.get("/auth/me", headers={"Authorization": f"Bearer {token2}"}).json()["id"]
+    chapter_id = create_chapter(token1, "Much Discussed Chapter")
+    
+    client.post("/notifications/mark-all-read", headers=headers)
+    margin_event = {"user_id": user1_id, "type": "margin", "actor_id": user2_id, "chapter_id": chapter_id}
+    db = SessionLocal()
     try:
-        token1, token2 = test_heart_chapter()
-        test_follow_book(token1, token2)
-        test_bookmark_chapter(token1, token2)
-        test_margins(token1, token2)
-        test_margin_rate_limit(token1, token2)
+        # Three events in one batch, then one more while still unread
+        assert write_notifications(db, [margin_event] * 3) == 1
+        assert write_notifications(db, [margin_event]) == 1
+        # Events about deleted things are dropped
+        assert write_notifications(db, [{**margin_event, "chapter_id": 0}]) == 0
         
-        print("\n" + "=" * 60)
-        print("🎉 All tests passed!")
-        print("\n📝 Engagement System ready!")
-        print("\nFeatures working:")
-        print("  ✅ Heart chapters (toggle on/off)")
-        print("  ✅ Heart count tracking")
-        print("  ✅ Follow books")
-        print("  ✅ Self-follow prevention")
-        print("  ✅ Follower listing")
-        print("  ✅ Bookmark chapters (cross-follow)")
-        print("  ✅ Bookmark listing")
-        print("  ✅ Margins (comments) on chapters")
-        print("  ✅ Margin listing")
-        print("  ✅ Margin rate limiting (20/hour)")
+        notifications = db.query(Notification).filter(
+            Notification.user_id == user1_id,
+            Notification.chapter_id == chapter_id
+        ).all()
+    finally:
+        db.close()
+    
+    assert len(notifications) == 1
+    assert notifications[0].message == "Several people lingered in the margins of your chapter."
+    assert client.get("/notifications/unread-count", headers=headers).json()["count"] == 1
+    
+    print("✅ Four margin events became one notification!")
+
+
+if __name__ == "__main__":
+    with client:
+        print("🧪 Running Engagement System tests...\n")
+        print("=" * 60)
         
-        print("\n🧹 Cleaning up test data...")
-        cleanup_test_data()
-        print("✅ Cleanup complete!")
+        try:
+            token1, token2 = test_heart_chapter()
+            test_heart_count_flush(token1, token2)
+            test_follow_book(token1, token2)
+            test_bookmark_chapter(token1, token2)
+            test_shelf_and_batch_status(token1, token2)
+            test_margins(token1, token2)
+            test_margin_rate_limit(token1, token2)
+            test_notification_stream(token1, token2)
+            test_unread_count(token1, token2)
+            test_notification_coalescing(token1, token2)
+            
+            print("\n" + "=" * 60)
+            print("🎉 All tests passed!")
+            print("\n📝 Engagement System ready!")
+            print("\nFeatures working:")
+            print("  ✅ Heart chapters (toggle on/off)")
+            print("  ✅ Heart count tracking")
+            print("  ✅ Heart count flush and reconciliation")
+            print("  ✅ Follow books")
+            print("  ✅ Self-follow prevention")
+            print("  ✅ Follower listing")
+            print("  ✅ Bookmark chapters (cross-follow)")
+            print("  ✅ Bookmark listing")
+            print("  ✅ Shelf listing and batch status checks")
+            print("  ✅ Margins (comments) on chapters")
+            print("  ✅ Margin listing")
+            print("  ✅ Margin rate limiting (20/hour)")
+            print("  ✅ Notification stream (SSE)")
+            print("  ✅ Unread notification count")
+            print("  ✅ Notification coalescing")
+            
+            print("\n🧹 Cleaning up test data...")
+            cleanup_test_data()
+            print("✅ Cleanup complete!")
+            
+        except AssertionError as e:
+            print(f"\n❌ Test failed: {e}")
+            import traceback
+            traceback.print_exc()
+            cleanup_test_data()
         
-    except AssertionError as e:
-        print(f"\n❌ Test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        cleanup_test_data()
-    
-    except Exception as e:
-        print(f"\n❌ Unexpected error: {e}")
-        import traceback
-        traceback.print_exc()
-        cleanup_test_data()
+        except Exception as e:
+            print(f"\n❌ Unexpected error: {e}")
+            import traceback
+            traceback.print_exc()
+            cleanup_test_data()
@@ -133,6 +133,61 @@ def test_new_chapters_feed(token1: str, token2: str):
     print(f"   Found {len(feed['chapters'])} chapter(s)")
     print(f"   Total: {feed['pagination']['total']}")
     print(f"   Has more: {feed['pagination']['has_more']}")
+    
+    # User 1 follows nobody: the empty feed is built once, not on every read
+    import app.services.feed as feed_service
+    from app.redis_client import redis_client
+    
+    user1_id = client.get("/auth/me", headers={"Authorization": f"Bearer {token1}"}).json()["id"]
+    redis_client.delete(feed_service.feed_key(user1_id), feed_service.empty_feed_key(user1_id))
+    
+    rebuilds = []
+    rebuild_feed = feed_service.rebuild_feed
+    feed_service.rebuild_feed = lambda db, reader_id: (rebuilds.append(reader_id), rebuild_feed(db, reader_id))
+    try:
+        for _ in range(2):
+            response = client.get("/library/new", headers={"Authorization": f"Bearer {token1}"})
+            assert response.status_code == 200
+            assert response.json()["chapters"] == []
+    finally:
+        feed_service.rebuild_feed = rebuild_feed
+    assert rebuilds == [user1_id]
+    
+    print("✅ Empty feed rebuilt once")
+
+
+def test_feed_pull_to_push(token1: str, token2: str):
+    """Test an author leaving fan-out on read backfills their chapters"""
+    print("\n🧪 Testing pull-to-push feed transition...")
+    
+    import app.services.feed as feed_service
+    from app.models import Chapter
+    from app.redis_client import redis_client
+    
+    user1_id = client.get("/auth/me", headers={"Authorization": f"Bearer {token1}"}).json()["id"]
+    user2_id = client.get("/auth/me", headers={"Authorization": f"Bearer {token2}"}).json()["id"]
+    
+    db = SessionLocal()
+    try:
+        chapters = db.query(Chapter).filter(
+            Chapter.author_id == user1_id
+        ).order_by(Chapter.published_at).all()
+        assert len(chapters) >= 2
+        older, newest = chapters[0], chapters[-1]
+        
+        # User 1 was a pull author when the older chapter came out, so it
+        # never reached user 2's feed
+        redis_client.sadd(feed_service.PULL_AUTHORS_KEY, user1_id)
+        redis_client.zrem(feed_service.feed_key(user2_id), older.id)
+        
+        feed_service.push_chapter(db, newest)
+        
+        assert not redis_client.sismember(feed_service.PULL_AUTHORS_KEY, user1_id)
+        assert redis_client.zscore(feed_service.feed_key(user2_id), older.id) is not None
+    finally:
+        db.close()
+    
+    print("✅ Chapters from pull mode pushed when the author returns to push!")
 
 
 def test_feed_pagination(token1: str, token2: str):
@@ -168,6 +223,45 @@ def test_feed_pagination(token1: str, token2: str):
     print("✅ Feed pagination working!")
 
 
+def test_feed_cursor_pagination(token1: str, token2: str):
+    """Test feed keyset pagination via next_cursor"""
+    print("\n🧪 Testing feed cursor pagination...")
+    
+    response = client.get(
+        "/library/new?per_page=1",
+        headers={"Authorization": f"Bearer {token2}"}
+    )
+    assert response.status_code == 200
+    page1 = response.json()
+    
+    assert page1["pagination"]["has_more"] is True
+    cursor = page1["pagination"]["next_cursor"]
+    assert cursor
+    
+    # Next page by cursor - no total is counted
+    response = client.get(
+        f"/library/new?per_page=1&cursor={cursor}",
+        headers={"Authorization": f"Bearer {token2}"}
+    )
+    assert response.status_code == 200
+    page2 = response.json()
+    
+    assert len(page2["chapters"]) == 1
+    assert page2["pagination"]["total"] is None
+    assert page2["pagination"]["has_more"] is False
+    assert page2["pagination"]["next_cursor"] is None
+    assert page1["chapters"][0]["id"] != page2["chapters"][0]["id"]
+    
+    # Malformed cursors are rejected
+    response = client.get(
+        "/library/new?cursor=not-a-cursor",
+        headers={"Authorization": f"Bearer {token2}"}
+    )
+    assert response.status_code == 400
+    
+    print("✅ Feed cursor pagination working!")
+
+
 def test_book_chapters(token1: str, token2: str):
     """Test book chapters endpoint"""
     print("\n🧪 Testing book chapters endpoint...")
@@ -188,37 +282,134 @@ def test_book_chapters(token1: str, token2: str):
     print(f"   Found {len(chapters)} chapter(s)")
 
 
-if __name__ == "__main__":
-    print("🧪 Running Library and Feed tests...\n")
-    print("=" * 60)
+def test_read_cursor(token1: str, token2: str):
+    """Test unread counts follow the reader's cursor"""
+    print("\n🧪 Testing read cursor...")
+    
+    chapter_id = create_chapter(token1, "Chapter 3")
+    
+    response = client.get(
+        "/library/spines",
+        headers={"Authorization": f"Bearer {token2}"}
+    )
+    assert response.status_code == 200
+    assert response.json()[0]["unread_count"] == 3
+    
+    # Reading the newest chapter reads everything before it. The cursor
+    # write is buffered, so it must not pin the reader to the primary
+    # (pinning only happens with a replica - pretend there is one)
+    import app.database as database
+    from app.redis_client import redis_client
+    
+    user2_id = client.get("/auth/me", headers={"Authorization": f"Bearer {token2}"}).json()["id"]
+    redis_client.delete(database.primary_pin_key(user2_id))
+    database.replica_configured = True
+    try:
+        response = client.get(
+            f"/chapters/{chapter_id}",
+            headers={"Authorization": f"Bearer {token2}"}
+        )
+    finally:
+        database.replica_configured = False
+    assert response.status_code == 200
+    assert not redis_client.exists(database.primary_pin_key(user2_id))
+    
+    print("✅ Chapter view leaves the reader on the replica")
+    
+    response = client.get(
+        "/library/spines",
+        headers={"Authorization": f"Bearer {token2}"}
+    )
+    assert response.status_code == 200
+    assert response.json()[0]["unread_count"] == 0
+    
+    # Viewing a Book the reader does not follow leaves no cursor
+    from app.models import ReadCursor
+    unfollowed_chapter_id = create_chapter(token2, "Unfollowed Chapter")
+    response = client.get(
+        f"/chapters/{unfollowed_chapter_id}",
+        headers={"Authorization": f"Bearer {token1}"}
+    )
+    assert response.status_code == 200
     
+    db = SessionLocal()
     try:
-        token1, token2 = test_bookshelf_spines()
-        test_new_chapters_feed(token1, token2)
-        test_feed_pagination(token1, token2)
-        test_book_chapters(token1, token2)
+        assert db.query(ReadCursor).filter(ReadCursor.book_id == get_book_id(token2)).count() == 0
+    finally:
+        db.close()
+    
+    print("✅ Read cursor working!")
+
+
+def test_quiet_picks_invalidated_on_embed(token1: str, token2: str):
+    """Test embedding a followed author's chapter drops the follower's cached picks"""
+    print("\n🧪 Testing Quiet Picks invalidation...")
+    
+    from app.models import Chapter, ChapterEmbedding
+    from app.muse.embeddings import embed_chapters
+    from app.redis_client import redis_client
+    from app.services.quiet_picks import quiet_picks_key
+    
+    # User 2 follows user 1 and has picks cached from before the chapter
+    # could be ranked
+    user1_id = client.get("/auth/me", headers={"Authorization": f"Bearer {token1}"}).json()["id"]
+    user2_id = client.get("/auth/me", headers={"Authorization": f"Bearer {token2}"}).json()["id"]
+    
+    db = SessionLocal()
+    try:
+        chapter_id = db.query(Chapter.id).filter(Chapter.author_id == user1_id).first()[0]
+        db.query(ChapterEmbedding).filter(ChapterEmbedding.chapter_id == chapter_id).delete()
+        db.commit()
+        redis_client.set(quiet_picks_key(user2_id), "[]")
         
-        print("\n" + "=" * 60)
-        print("🎉 All tests passed!")
-        print("\n📝 Library System ready!")
-        print("\nFeatures working:")
-        print("  ✅ Bookshelf spines with unread counts")
-        print("  ✅ New chapters feed")
-        print("  ✅ Feed pagination (bounded to 100)")
-        print("  ✅ Book chapters listing")
+        assert embed_chapters(db, [chapter_id]) == 1
+        assert not redis_client.exists(quiet_picks_key(user2_id))
+    finally:
+        db.close()
+    
+    print("✅ Cached picks dropped once the new chapter is embedded!")
+
+
+if __name__ == "__main__":
+    with client:
+        print("🧪 Running Library and Feed tests...\n")
+        print("=" * 60)
         
-        print("\n🧹 Cleaning up test data...")
-        cleanup_test_data()
-        print("✅ Cleanup complete!")
+        try:
+            token1, token2 = test_bookshelf_spines()
+            test_new_chapters_feed(token1, token2)
+            test_feed_pull_to_push(token1, token2)
+            test_feed_pagination(token1, token2)
+            test_feed_cursor_pagination(token1, token2)
+            test_book_chapters(token1, token2)
+            test_read_cursor(token1, token2)
+            test_quiet_picks_invalidated_on_embed(token1, token2)
+            
+            print("\n" + "=" * 60)
+            print("🎉 All tests passed!")
+            print("\n📝 Library System ready!")
+            print("\nFeatures working:")
+            print("  ✅ Bookshelf spines with unread counts")
+            print("  ✅ New chapters feed")
+            print("  ✅ Pull-to-push fan-out transition")
+            print("  ✅ Feed pagination (bounded to 100)")
+            print("  ✅ Cursor pagination")
+            print("  ✅ Book chapters listing")
+            print("  ✅ Read cursors")
+            print("  ✅ Quiet Picks invalidated when new chapters are embedded")
+            
+            print("\n🧹 Cleaning up test data...")
+            cleanup_test_data()
+            print("✅ Cleanup complete!")
+            
+        except AssertionError as e:
+            print(f"\n❌ Test failed: {e}")
+            import traceback
+            traceback.print_exc()
+            cleanup_test_data()
         
-    except AssertionError as e:
-        print(f"\n❌ Test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        cleanup_test_data()
-    
-    except Exception as e:
-        print(f"\n❌ Unexpected error: {e}")
-        import traceback
-        traceback.print_exc()
-        cleanup_test_data()
+        except Exception as e:
+            print(f"\n❌ Unexpected error: {e}")
+            import traceback
+            traceback.print_exc()
+            cleanup_test_data()
@@ -298,42 +298,43 @@ def test_privacy_settings():
 
 
 if __name__ == "__main__":
-    print("🧪 Running Moderation and Privacy tests...\n")
-    print("=" * 60)
-    
-    try:
-        token1, token2, user2_id = test_blocking()
-        test_block_removes_follows(token1, token2)
-        test_block_prevents_margins(token1, token2)
-        test_unblock(token1, user2_id)
-        test_reporting()
-        test_privacy_settings()
-        
-        print("\n" + "=" * 60)
-        print("🎉 All tests passed!")
-        print("\n📝 Moderation and Privacy ready!")
-        print("\nFeatures working:")
-        print("  ✅ User blocking")
-        print("  ✅ Block removes follow relationships")
-        print("  ✅ Block prevents margin creation")
-        print("  ✅ User unblocking")
-        print("  ✅ User reporting")
-        print("  ✅ Chapter reporting")
-        print("  ✅ Book privacy settings (public/private)")
-        print("  ✅ Privacy changes take effect immediately")
+    with client:
+        print("🧪 Running Moderation and Privacy tests...\n")
+        print("=" * 60)
         
-        print("\n🧹 Cleaning up test data...")
-        cleanup_test_data()
-        print("✅ Cleanup complete!")
+        try:
+            token1, token2, user2_id = test_blocking()
+            test_block_removes_follows(token1, token2)
+            test_block_prevents_margins(token1, token2)
+            test_unblock(token1, user2_id)
+            test_reporting()
+            test_privacy_settings()
+            
+            print("\n" + "=" * 60)
+            print("🎉 All tests passed!")
+            print("\n📝 Moderation and Privacy ready!")
+            print("\nFeatures working:")
+            print("  ✅ User blocking")
+            print("  ✅ Block removes follow relationships")
+            print("  ✅ Block prevents margin creation")
+            print("  ✅ User unblocking")
+            print("  ✅ User reporting")
+            print("  ✅ Chapter reporting")
+            print("  ✅ Book privacy settings (public/private)")
+            print("  ✅ Privacy changes take effect immediately")
+            
+            print("\n🧹 Cleaning up test data...")
+            cleanup_test_data()
+            print("✅ Cleanup complete!")
+            
+        except AssertionError as e:
+            print(f"\n❌ Test failed: {e}")
+            import traceback
+            traceback.print_exc()
+            cleanup_test_data()
         
-    except AssertionError as e:
-        print(f"\n❌ Test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        cleanup_test_data()
-    
-    except Exception as e:
-        print(f"\n❌ Unexpected error: {e}")
-        import traceback
-        traceback.print_exc()
-        cleanup_test_data()
+        except Exception as e:
+            print(f"\n❌ Unexpected error: {e}")
+            import traceback
+            traceback.print_exc()
+            cleanup_test_data()
@@ -338,51 +338,52 @@ def test_delete_draft(token: str, draft_id: int):
 
 
 if __name__ == "__main__":
-    print("🧪 Running Study System tests...\n")
-    print("=" * 60)
-    
-    try:
-        token = register_and_login()
-        draft_id = test_create_draft(token)
-        test_list_drafts(token)
-        test_get_draft(token, draft_id)
-        test_update_draft(token, draft_id)
-        note_id = test_create_note(token)
-        test_list_notes(token)
-        test_list_notes_by_tag(token)
-        test_update_note(token, note_id)
-        chapter_id = test_promote_draft(token, draft_id)
-        test_draft_still_exists(token, draft_id)
-        test_delete_note(token, note_id)
-        test_delete_draft(token, draft_id)
-        
-        print("\n" + "=" * 60)
-        print("🎉 All tests passed!")
-        print("\n📝 Study System ready!")
-        print("\nFeatures working:")
-        print("  ✅ Draft creation and management")
-        print("  ✅ Draft listing and retrieval")
-        print("  ✅ Draft updates")
-        print("  ✅ Note creation with tags")
-        print("  ✅ Note filtering by tag")
-        print("  ✅ Note updates")
-        print("  ✅ Draft promotion to chapter")
-        print("  ✅ Open Page consumption on promotion")
-        print("  ✅ Draft persistence after promotion")
-        print("  ✅ Draft and note deletion")
+    with client:
+        print("🧪 Running Study System tests...\n")
+        print("=" * 60)
         
-        print("\n🧹 Cleaning up test data...")
-        cleanup_test_data()
-        print("✅ Cleanup complete!")
+        try:
+            token = register_and_login()
+            draft_id = test_create_draft(token)
+            test_list_drafts(token)
+            test_get_draft(token, draft_id)
+            test_update_draft(token, draft_id)
+            note_id = test_create_note(token)
+            test_list_notes(token)
+            test_list_notes_by_tag(token)
+            test_update_note(token, note_id)
+            chapter_id = test_promote_draft(token, draft_id)
+            test_draft_still_exists(token, draft_id)
+            test_delete_note(token, note_id)
+            test_delete_draft(token, draft_id)
+            
+            print("\n" + "=" * 60)
+            print("🎉 All tests passed!")
+            print("\n📝 Study System ready!")
+            print("\nFeatures working:")
+            print("  ✅ Draft creation and management")
+            print("  ✅ Draft listing and retrieval")
+            print("  ✅ Draft updates")
+            print("  ✅ Note creation with tags")
+            print("  ✅ Note filtering by tag")
+            print("  ✅ Note updates")
+            print("  ✅ Draft promotion to chapter")
+            print("  ✅ Open Page consumption on promotion")
+            print("  ✅ Draft persistence after promotion")
+            print("  ✅ Draft and note deletion")
+            
+            print("\n🧹 Cleaning up test data...")
+            cleanup_test_data()
+            print("✅ Cleanup complete!")
+            
+        except AssertionError as e:
+            print(f"\n❌ Test failed: {e}")
+            import traceback
+            traceback.print_exc()
+            cleanup_test_data()
         
-    except AssertionError as e:
-        print(f"\n❌ Test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        cleanup_test_data()
-    
-    except Exception as e:
-        print(f"\n❌ Unexpected error: {e}")
-        import traceback
-        traceback.print_exc()
-        cleanup_test_data()
+        except Exception as e:
+            print(f"\n❌ Unexpected error: {e}")
+            import traceback
+            traceback.print_exc()
+            cleanup_test_data()
@@ -118,18 +118,69 @@ def test_update_custom_avatar():
         cleanup_test_user(email)
 
 
-if __name__ == "__main__":
-    print("🧪 Running user profile tests...\n")
-    print("=" * 60)
+def test_user_writes_visible_immediately():
+    """Test that writes to the user row are not hidden by the principal cache"""
+    print("\n🧪 Testing user row writes through the principal cache...")
+
+    from app import database
+    from app.redis_client import redis_client
+
+    access_token, email = setup_test_user()
+    headers = {"Authorization": f"Bearer {access_token}"}
 
     try:
-        test_update_cover_image()
-        test_update_custom_avatar()
+        # Warm the cache
+        user_id = client.get("/auth/me", headers=headers).json()["id"]
+        client.get("/notifications/quiet-mode", headers=headers)
+
+        # With a replica, the write pins the user's reads to the primary
+        redis_client.delete(database.primary_pin_key(user_id))
+        database.replica_configured = True
+        try:
+            client.post("/notifications/quiet-mode", headers=headers, params={"enabled": True})
+            assert redis_client.exists(database.primary_pin_key(user_id))
+            response = client.get("/notifications/quiet-mode", headers=headers)
+        finally:
+            database.replica_configured = False
+        assert response.status_code == 200, response.text
+        assert response.json()["quiet_mode"] is True
+        print("✅ Quiet Mode toggle visible on the next request")
+
+        response = client.put("/users/password", headers=headers, json={
+            "current_password": "SecurePassword123!",
+            "new_password": "NewSecurePassword456!"
+        })
+        assert response.status_code == 200, response.text
+        response = client.put("/users/password", headers=headers, json={
+            "current_password": "NewSecurePassword456!",
+            "new_password": "SecurePassword123!"
+        })
+        assert response.status_code == 200, response.text
+        print("✅ Changed password verified on the next request")
+
+        response = client.delete("/users/me", headers=headers)
+        response = client.get("/notifications/unread-count", headers=headers)
+        assert response.status_code == 401, response.text
+        print("✅ Deleted account rejected immediately")
 
-        print("\n" + "=" * 60)
-        print("🎉 Verification complete")
+    finally:
+        cleanup_test_user(email)
 
-    except Exception as e:
-        print(f"\n❌ Unexpected error: {e}")
-        import traceback
-        traceback.print_exc()
+
+if __name__ == "__main__":
+    with client:
+        print("🧪 Running user profile tests...\n")
+        print("=" * 60)
+
+        try:
+            test_update_cover_image()
+            test_update_custom_avatar()
+            test_user_writes_visible_immediately()
+
+            print("\n" + "=" * 60)
+            print("🎉 Verification complete")
+
+        except Exception as e:
+            print(f"\n❌ Unexpected error: {e}")
+            import traceback
+            traceback.print_exc()
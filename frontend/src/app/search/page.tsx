@@ -11,6 +11,23 @@ import { motion } from "framer-motion"
 import { Footer } from "@/components/Footer"
 import { AuthenticatedHeader } from "@/components/AuthenticatedHeader"
 
+// Search excerpts wrap matched terms in <mark>...</mark>
+function HighlightedExcerpt({ text }: { text: string }) {
+  return (
+    <>
+      {text.split(/(<mark>.*?<\/mark>)/g).map((part, i) =>
+        part.startsWith("<mark>") && part.endsWith("</mark>") ? (
+          <mark key={i} className="bg-transparent font-semibold text-foreground">
+            {part.slice(6, -7)}
+          </mark>
+        ) : (
+          part
+        )
+      )}
+    </>
+  )
+}
+
 function SearchContent() {
   const router = useRouter()
   const searchParams = useSearchParams()
@@ -88,7 +105,7 @@ function SearchContent() {
                     {/* Excerpt */}
                     {chapter.excerpt && (
                       <p className="text-foreground leading-relaxed mb-4 line-clamp-3">
-                        {chapter.excerpt}
+                        <HighlightedExcerpt text={chapter.excerpt} />
                       </p>
                     )}
 
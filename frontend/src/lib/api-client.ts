@@ -38,6 +38,20 @@ class APIClient {
     endpoint: string,
     options: RequestOptions = {}
   ): Promise<T> {
+    const response = await this.send(endpoint, options)
+
+    // Return JSON if response has content
+    if (response.status === 204 || response.headers.get('content-length') === '0') {
+      return {} as T
+    }
+
+    return response.json()
+  }
+
+  private async send(
+    endpoint: string,
+    options: RequestOptions = {}
+  ): Promise<Response> {
     const { params, ...fetchOptions } = options
 
     // Build URL with query params
@@ -110,18 +124,28 @@ class APIClient {
       )
     }
 
-    // Return JSON if response has content
-    if (response.status === 204 || response.headers.get('content-length') === '0') {
-      return {} as T
-    }
-
-    return response.json()
+    return response
   }
 
   async get<T>(endpoint: string, options?: RequestOptions): Promise<T> {
     return this.request<T>(endpoint, { ...options, method: 'GET' })
   }
 
+  /**
+   * GET one page of a cursor-paged list, along with the cursor for the
+   * next page (from the X-Next-Cursor header), or null on the last page
+   */
+  async getPage<T>(
+    endpoint: string,
+    options?: RequestOptions
+  ): Promise<{ items: T[]; nextCursor: string | null }> {
+    const response = await this.send(endpoint, { ...options, method: 'GET' })
+    return {
+      items: await response.json(),
+      nextCursor: response.headers.get('X-Next-Cursor'),
+    }
+  }
+
   async post<T>(endpoint: string, data?: any, options?: RequestOptions): Promise<T> {
     return this.request<T>(endpoint, {
       ...options,
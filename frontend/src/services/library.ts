@@ -169,6 +169,15 @@ export const libraryService = {
     await apiClient.delete(`/engagement/chapters/${chapterId}/bookmark`)
   },
 
+  /**
+   * Heart/bookmark status for many chapters in one request (up to 100)
+   */
+  async getChapterStatuses(
+    chapterIds: Array<string | number>
+  ): Promise<Record<string, { is_hearted: boolean; is_bookmarked: boolean }>> {
+    return apiClient.get(`/engagement/status?chapter_ids=${chapterIds.join(',')}`)
+  },
+
   /**
    * Follow a Book
    */
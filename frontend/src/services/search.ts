@@ -23,7 +23,7 @@ export interface ChapterSearchResult {
   author_id: number
   author_username: string
   author_book_id: number
-  excerpt?: string
+  excerpt?: string // search results: matches wrapped in <mark>
   themes: string[]
 }
 
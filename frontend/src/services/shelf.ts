@@ -32,10 +32,21 @@ export const shelfService = {
   },
 
   /**
-   * Get user's Shelf
+   * Get user's whole Shelf, most recent first, following the cursor
+   * page by page
    */
   async getShelf(): Promise<ShelfBook[]> {
-    return apiClient.get('/engagement/shelf')
+    const shelf: ShelfBook[] = []
+    let cursor: string | null = null
+    do {
+      const params: Record<string, string | number> = { per_page: 100 }
+      if (cursor) params.cursor = cursor
+      const page: { items: ShelfBook[]; nextCursor: string | null } =
+        await apiClient.getPage<ShelfBook>('/engagement/shelf', { params })
+      shelf.push(...page.items)
+      cursor = page.nextCursor
+    } while (cursor)
+    return shelf
   },
 
   /**
@@ -44,4 +55,11 @@ export const shelfService = {
   async checkShelfStatus(bookId: number): Promise<{ on_shelf: boolean }> {
     return apiClient.get(`/engagement/books/${bookId}/shelf/status`)
   },
+
+  /**
+   * Check which of many Books are on user's Shelf (up to 100)
+   */
+  async checkShelfStatuses(bookIds: number[]): Promise<Record<string, { on_shelf: boolean }>> {
+    return apiClient.get(`/engagement/shelf/status?book_ids=${bookIds.join(',')}`)
+  },
 }